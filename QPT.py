@@ -8,28 +8,23 @@
 #Gather our code in a main() function.
 def main() :
   import argparse
-  import serial
   import QPTFunctions as QPTF
+  import QPTSession as QPTS
   import getParams as gP
 #  from geopy.geocoders import Nominatim
   
-  #Set up the serial port.
+  #Set up the serial port.  The session owns the port and only resyncs with the
+  #controller when it has to.
   port = '/dev/ttyUSB1'
   baudRate = 9600  #Standard baud rate for the controller.
-  byteSize = serial.EIGHTBITS  #Set the size of the byte to be written.
-  parity = serial.PARITY_NONE #Took this from the manual under the Autobaud section.
   timeout = 1  #Not sure what is the best value for this.  I might want to set this to some
   #floating point value.
 
-  ser = serial.Serial(
-    port = port,
-    baudrate = baudRate,
-    bytesize = byteSize,
-    parity = parity,
-    timeout = timeout)
+  session = QPTS.QPTSession(port = port, baudRate = baudRate, timeout = timeout)
    
   #Fill the PARAMS dataclass.
   PARAMS = gP.getParams(QPTF.getArgs(argparse.ArgumentParser()))
+  session.PARAMS = PARAMS  #Write the position in every reply to the telemetry file.
   
   #Get the latitude and longitude.
 #  locator = Nominatim(user_agent = 'QPT')
@@ -52,33 +47,33 @@ def main() :
 #  breakpoint()
   
   if(PARAMS.command == 'send status jog') :
-    QPTF.sendStatusJog(PARAMS, ser)
+    QPTF.sendStatusJog(PARAMS, session)
   #End of if statement - if(PARAMS.command == 'SendStatusJog') :
 
   if(PARAMS.command == 'read pointing') :
-    QPTF.readPointing(PARAMS, ser)
+    QPTF.readPointing(PARAMS, session)
   if(PARAMS.command == 'send stop') :
-    QPTF.sendStop(PARAMS, ser)
+    QPTF.sendStop(PARAMS, session)
   #End of if statement- if(PARAMS.command == 'SendStatusJog') :
     
   if(PARAMS.command == 'move to zero zero') :
-    QPTF.moveToZeroZero(PARAMS, ser)
+    QPTF.moveToZeroZero(PARAMS, session)
   #End of if statement - if(PARAMS.command == 'SendStatusJog') :
 
   if(PARAMS.command == 'move to entered coordinates') :
-    QPTF.moveToEnteredCoords(PARAMS, ser)
+    QPTF.moveToEnteredCoords(PARAMS, session)
   #End of if statement - if(PARAMS.command == 'SendStatusJog') :
     
   if(PARAMS.command == 'move to delta coords') :
-    QPTF.moveToDeltaCoords(PARAMS, ser)
+    QPTF.moveToDeltaCoords(PARAMS, session)
   #End of if statement - if(PARAMS.command == 'SendStatusJog') :
 
   if(PARAMS.command == 'move to home') :
-    QPTF.moveToHome(PARAMS, ser)
+    QPTF.moveToHome(PARAMS, session)
   #End of if statement -  if(PARAMS.command == 'MoveToHome')
 
   #Close the serial port.
-  ser.close()
+  session.close()
   
 # Standard boilerplate to call the main() function to begin
 # the program.
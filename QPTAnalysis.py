@@ -0,0 +1,224 @@
+#This module holds the offline analysis of logged telemetry.  The status bytes of a whole log
+#are checked at once with NumPy, one flag at a time, so tens of millions of records take a few
+#seconds.
+
+import numpy as np
+
+from QPTFunctions import maskCWHL, maskCCWHL, maskUHL, maskDHL
+from QPTFunctions import maskTO, maskDE, maskOL, maskPRF, maskTRF
+
+#The flags looked at by default, as (name, status byte, mask).  The status byte is 'pan',
+#'tilt' or 'gen'.
+faultFlags = [('panCWHL', 'pan', maskCWHL),
+              ('panCCWHL', 'pan', maskCCWHL),
+              ('panTO', 'pan', maskTO),
+              ('panDE', 'pan', maskDE),
+              ('panOL', 'pan', maskOL),
+              ('PRF', 'pan', maskPRF),
+              ('tiltUHL', 'tilt', maskUHL),
+              ('tiltDHL', 'tilt', maskDHL),
+              ('tiltTO', 'tilt', maskTO),
+              ('tiltDE', 'tilt', maskDE),
+              ('tiltOL', 'tilt', maskOL),
+              ('TRF', 'tilt', maskTRF)]
+
+#################################################################################
+
+#################################################################################
+
+def getFlagRuns(active) :
+  """
+
+   NAME: getFlagRuns(active)
+
+   PURPOSE:  Find the runs of records in which a flag is set.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by analyzeFaults.
+
+   INPUTS:
+           active : A boolean array, True where the flag is set.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: [starts, ends] where starts holds the index of the first record of each run
+   and ends holds the index of the record just after it(len(active) for a run that
+   lasts to the end).
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: starts, ends = getFlagRuns(panStatus & maskOL != 0)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  #Every place the flag changes is the start or the end of a run.  Runs alternate, so the
+  #changes are starts and ends in turn, beginning with a start unless the first record
+  #already has the flag set.
+  changes = np.flatnonzero(active[1:] != active[:-1]) + 1
+  if(active[0]) :
+    changes = np.concatenate(([0], changes))
+  #End of if statement - if(active[0]) :
+  if(len(changes) % 2 == 1) :
+    changes = np.concatenate((changes, [len(active)]))
+  #End of if statement - if(len(changes) % 2 == 1) :
+
+  return [changes[0::2], changes[1::2]]
+
+#End of the function getFlagRuns.py
+
+#################################################################################
+
+#################################################################################
+
+def analyzeFaults(panStatus, tiltStatus, genStatus, times = None, flags = faultFlags) :
+  """
+
+   NAME: analyzeFaults(panStatus, tiltStatus, genStatus, times = None,
+                       flags = faultFlags)
+
+   PURPOSE:  Count how often each status flag was set, for how long and when it was
+   first and last seen.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by analyzeTelemetry and the fleet report programs.
+
+   INPUTS:
+           panStatus, tiltStatus, genStatus : Arrays of the pan, tilt and general
+           status bytes, one entry per record, in time order.
+
+   OPTIONAL INPUTS:
+           times : An array of the record times.  Without it the record numbers are
+           used as the times.
+           flags : A list of (name, status byte, mask) for the flags to report, where
+           status byte is 'pan', 'tilt' or 'gen'.  Defaults to the hard limit,
+           TO, DE, OL and resolver fault flags.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A dictionary of flag name to a dictionary holding
+           count : The number of times the flag went from clear to set.
+           records : The number of records with the flag set.
+           duration : The total time the flag was set, in the units of times.  A
+           run lasts from its first record to the first record after it.  A run
+           still going at the end of the log lasts to the last record.
+           first, last : The times of the first and last record with the flag set,
+           or None if it was never set.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: report = analyzeFaults(records['panStatus'], records['tiltStatus'],
+                                   records['generalStatus'], records['wallTime'])
+            print(report['panOL']['count'])
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  statusBytes = {'pan' : np.asarray(panStatus, dtype = np.uint8),
+                 'tilt' : np.asarray(tiltStatus, dtype = np.uint8),
+                 'gen' : np.asarray(genStatus, dtype = np.uint8)}
+  numRecords = len(statusBytes['pan'])
+  if(times is None) :
+    times = np.arange(numRecords)
+  else :
+    times = np.asarray(times)
+  #End of if-else clause.
+
+  report = {}
+  for name, byteName, mask in flags :
+    if(numRecords == 0) :
+      report[name] = {'count' : 0, 'records' : 0, 'duration' : 0, 'first' : None,
+                      'last' : None}
+      continue
+    #End of if statement - if(numRecords == 0) :
+
+    active = (statusBytes[byteName] & mask) != 0
+    starts, ends = getFlagRuns(active)
+    if(len(starts) == 0) :
+      report[name] = {'count' : 0, 'records' : 0, 'duration' : 0, 'first' : None,
+                      'last' : None}
+      continue
+    #End of if statement - if(len(starts) == 0) :
+
+    endTimes = times[np.minimum(ends, numRecords - 1)]
+    report[name] = {'count' : len(starts),
+                    'records' : int(np.count_nonzero(active)),
+                    'duration' : (endTimes - times[starts]).sum().item(),
+                    'first' : times[starts[0]].item(),
+                    'last' : times[ends[-1] - 1].item()}
+  #End of for loop - for name, byteName, mask in flags :
+
+  return report
+
+#End of the function analyzeFaults.py
+
+#################################################################################
+
+#################################################################################
+
+def analyzeTelemetry(records, flags = faultFlags) :
+  """
+
+   NAME: analyzeTelemetry(records, flags = faultFlags)
+
+   PURPOSE:  Run analyzeFaults on binary telemetry records.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by the fleet report programs.
+
+   INPUTS:
+           records : An array of QPTTelemetry.telemetryDtype records, for example from
+           QPTTelemetry.readTelemetry or TelemetryIndex.query.
+
+   OPTIONAL INPUTS:
+           flags : As for analyzeFaults.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The analyzeFaults report with the durations in seconds and first and last
+   as wall clock nanoseconds.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: header, records = QPTT.readTelemetry('/data/afa20261018.qpt')
+            report = analyzeTelemetry(records)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  report = analyzeFaults(records['panStatus'], records['tiltStatus'],
+                         records['generalStatus'], records['wallTime'], flags)
+  for entry in report.values() :
+    entry['duration'] = entry['duration']*1.0e-9
+  #End of for loop - for entry in report.values() :
+
+  return report
+
+#End of the function analyzeTelemetry.py
+
+#################################################################################
+
+#################################################################################
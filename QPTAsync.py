@@ -0,0 +1,524 @@
+#This module lets an asyncio program talk to the QPT controller.  The serial port is driven by
+#the event loop through pyserial-asyncio, so waiting on the controller never blocks the other
+#tasks in the program.  The coroutines at the bottom of the file are the async versions of the
+#command functions in QPTFunctions.
+#
+#The pyserial-asyncio package is only needed to open the port.  It is imported inside
+#openConnection, so QPTProtocol and the coroutines work on any asyncio transport without it.
+
+import asyncio
+import collections
+
+import QPTEncoder as QPTE
+from QPTFunctions import replyTimeout, defaultReplyTimeout
+
+#################################################################################
+
+#################################################################################
+
+class QPTProtocol(asyncio.Protocol) :
+  """
+
+   NAME: QPTProtocol(controllerTimeout = 1.0, maxRetries = 5)
+
+   PURPOSE:  An asyncio protocol for the controller's serial port.  Bytes are
+   decoded into frames as the event loop hands them over and each reply is given
+   to the coroutine waiting on it.  Like QPTSession, it only resyncs with a Get
+   Status/Jog command after an error, a NAK or an idle gap.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by openConnection.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           controllerTimeout : The controller's communication timeout in seconds.
+           maxRetries : The number of times a command is sent before giving up.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.  lastStatus holds the last Get Status/Jog reply.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Commands are sent one at a time.  Coroutines that send at the same
+   time are queued up in the order they asked.
+
+   EXAMPLE: transport, protocol = await openConnection('/dev/ttyUSB1')
+            reply = await moveToHome(PARAMS, protocol)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self, controllerTimeout = 1.0, maxRetries = 5) :
+    import QPTDecoder as QPTD
+
+    self.decoder = QPTD.FrameDecoder()
+    self.transport = None
+    self.waiters = collections.deque()
+    self.lock = asyncio.Lock()
+    self.closed = None
+    self.controllerTimeout = controllerTimeout
+    self.maxRetries = maxRetries
+    self.synced = False
+    self.lastReplyTime = 0.0
+    self.lastStatus = None
+
+  def connection_made(self, transport) :
+    self.transport = transport
+    self.closed = asyncio.get_running_loop().create_future()
+
+  def data_received(self, data) :
+    #Hand each frame to the oldest coroutine waiting on that command.  Anything else
+    #is a stale reply and is thrown away.
+    for frame in self.decoder.feed(data) :
+      while(len(self.waiters) > 0) :
+        CommandNumber, future = self.waiters[0]
+        if(future.done()) :
+          self.waiters.popleft()
+          continue
+        #End of if statement - if(future.done()) :
+        if(CommandNumber == frame.command) :
+          self.waiters.popleft()
+          future.set_result(frame)
+        #End of if statement - if(CommandNumber == frame.command) :
+        break
+      #End of while loop - while(len(self.waiters) > 0) :
+    #End of for loop - for frame in self.decoder.feed(data) :
+
+  def connection_lost(self, exc) :
+    for CommandNumber, future in self.waiters :
+      if(not future.done()) :
+        future.set_exception(ConnectionError('The serial port was closed.'))
+      #End of if statement - if(not future.done()) :
+    #End of for loop - for CommandNumber, future in self.waiters :
+    self.waiters.clear()
+    if((self.closed is not None) and (not self.closed.done())) :
+      self.closed.set_result(exc)
+    #End of if statement.
+
+  async def exchange(self, Command) :
+    """Write one command and wait for its reply.  Returns the reply as a
+    QPTDecoder.Frame or None if it did not show up in time."""
+    loop = asyncio.get_running_loop()
+    CommandNumber = Command[1]
+    future = loop.create_future()
+    self.waiters.append((CommandNumber, future))
+    self.transport.write(Command)
+
+    try :
+      reply = await asyncio.wait_for(future, replyTimeout.get(CommandNumber,
+                                                              defaultReplyTimeout))
+    except asyncio.TimeoutError :
+      reply = None
+    #End of try-except clause.
+
+    if((reply is None) or reply.isNak()) :
+      self.synced = False
+      self.decoder.reset()
+    else :
+      self.synced = True
+      self.lastReplyTime = loop.time()
+      if(CommandNumber == QPTE.statusJogNumber) :
+        self.lastStatus = reply
+      #End of if statement - if(CommandNumber == QPTE.statusJogNumber) :
+    #End of if-else clause.
+
+    return reply
+
+  def needsSync(self) :
+    """Return True if the controller has to be resynched before the next command."""
+    loop = asyncio.get_running_loop()
+    return((not self.synced) or (loop.time() - self.lastReplyTime > self.controllerTimeout))
+
+  async def sendCommand(self, Command) :
+    """Send a command, synching first only if needed.  The command is repeated until it
+    is acknowledged or maxRetries is reached.  Returns the last reply."""
+    async with self.lock :
+      reply = None
+      for attempt in range(self.maxRetries) :
+        if((Command[1] != QPTE.statusJogNumber) and self.needsSync()) :
+          status = await self.exchange(QPTE.getStatusJogFrame())
+          if((status is None) or status.isNak()) :
+            continue
+          #End of if statement.
+        #End of if statement.
+
+        reply = await self.exchange(Command)
+        if((reply is not None) and reply.isAck()) :
+          return reply
+        #End of if statement.
+      #End of for loop - for attempt in range(self.maxRetries) :
+
+      return reply
+
+#End of the class QPTProtocol.py
+
+#################################################################################
+
+#################################################################################
+
+async def openConnection(port = '/dev/ttyUSB1', baudRate = 9600, controllerTimeout = 1.0) :
+  """
+
+   NAME: openConnection(port = '/dev/ttyUSB1', baudRate = 9600, controllerTimeout = 1.0)
+
+   PURPOSE:  Open the serial port on the running event loop.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by any asyncio program that talks to the controller.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           port : The name of the serial port.
+           baudRate : The baud rate.  9600 is the standard rate for the controller.
+           controllerTimeout : The controller's communication timeout in seconds.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A two element list [transport, protocol].
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The serial port is opened.
+
+   RESTRICTIONS: Needs the pyserial-asyncio package(pip install pyserial-asyncio).
+   Raises ImportError saying so if it is not installed.
+
+   EXAMPLE: transport, protocol = await openConnection('/dev/ttyUSB1')
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Changed to say which package is missing if pyserial-asyncio is not
+             installed on October 18, 2026
+
+  """
+
+  import serial
+  try :
+    import serial_asyncio
+  except ImportError as error :
+    raise ImportError('openConnection needs the pyserial-asyncio package.  Install it ' +
+                      'with pip install pyserial-asyncio.') from error
+  #End of try-except clause.
+
+  loop = asyncio.get_running_loop()
+
+  #Took the byte size and parity from the manual under the Autobaud section.
+  transport, protocol = await serial_asyncio.create_serial_connection(
+    loop, lambda : QPTProtocol(controllerTimeout), port,
+    baudrate = baudRate,
+    bytesize = serial.EIGHTBITS,
+    parity = serial.PARITY_NONE)
+
+  return [transport, protocol]
+
+#End of the function openConnection.py
+
+#################################################################################
+
+#################################################################################
+
+async def moveToHome(PARAMS, protocol) :
+  """
+
+   NAME: moveToHome(PARAMS, protocol)
+
+   PURPOSE:  Send the move to home(0x36) command to the controller.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by asyncio programs.
+
+   INPUTS:
+           PARAMS : The parameter data class.
+           protocol : The QPTProtocol from openConnection.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The reply as a QPTDecoder.Frame or None.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The controller gets the home command.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: reply = await moveToHome(PARAMS, protocol)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  return await protocol.sendCommand(QPTE.getFrame(0x36))
+
+#End of the function moveToHome.py
+
+#################################################################################
+
+#################################################################################
+
+async def moveToZeroZero(PARAMS, protocol) :
+  """
+
+   NAME: moveToZeroZero(PARAMS, protocol)
+
+   PURPOSE:  Send the move to absolute 0/0(0x35) command to the controller.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by asyncio programs.
+
+   INPUTS:
+           PARAMS : The parameter data class.
+           protocol : The QPTProtocol from openConnection.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The reply as a QPTDecoder.Frame or None.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The controller moves to zero pan and zero tilt.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: reply = await moveToZeroZero(PARAMS, protocol)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  return await protocol.sendCommand(QPTE.getFrame(0x35))
+
+#End of the function moveToZeroZero.py
+
+#################################################################################
+
+#################################################################################
+
+async def moveToEnteredCoords(PARAMS, protocol, limits = None) :
+  """
+
+   NAME: moveToEnteredCoords(PARAMS, protocol, limits = None)
+
+   PURPOSE:  Send the move to entered coordinates(0x33) command for PARAMS.Azimuth
+   and PARAMS.Elevation(in degrees) to the controller.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by asyncio programs.
+
+   INPUTS:
+           PARAMS : The parameter data class.
+           protocol : The QPTProtocol from openConnection.
+
+   OPTIONAL INPUTS:
+           limits : A QPTTrajectory.TrajectoryLimits holding the soft limits to check
+           the coordinates against.  Defaults to the controller's range only.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The reply as a QPTDecoder.Frame or None.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The controller moves to the entered coordinates.
+
+   RESTRICTIONS: Raises QPTTrajectory.TrajectoryError if the coordinates are out of
+   range, the same as QPTFunctions.moveToEnteredCoords.  The soft limits are not
+   checked if PARAMS.overrideSoftLimits is set.
+
+   EXAMPLE: reply = await moveToEnteredCoords(PARAMS, protocol)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Changed to check the coordinates with QPTTrajectory.validateTrajectory and
+             raise TrajectoryError like the blocking version on October 18, 2026
+
+  """
+
+  import QPTTrajectory as QPTTr
+
+  #Convert to tenths of a degree.
+  Az = int(PARAMS.Azimuth*10.0)
+  El = int(PARAMS.Elevation*10.0)
+
+  report = QPTTr.validateTrajectory([Az], [El], limits = limits,
+                                    checkSoftLimits = not PARAMS.overrideSoftLimits)
+  if(not report.isValid()) :
+    raise QPTTr.TrajectoryError(report)
+  #End of if statement - if(not report.isValid()) :
+
+  return await protocol.sendCommand(QPTE.getPositionFrame(Az, El))
+
+#End of the function moveToEnteredCoords.py
+
+#################################################################################
+
+#################################################################################
+
+async def sendStatusJog(PARAMS, protocol) :
+  """
+
+   NAME: sendStatusJog(PARAMS, protocol)
+
+   PURPOSE:  Send a Get Status/Jog command built from the PARAMS flags and jog
+   speeds.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by asyncio programs.
+
+   INPUTS:
+           PARAMS : The parameter data class.  resolverUnits, overrideSoftLimits,
+           stop, reset, panJogSpeed and tiltJogSpeed are used.
+           protocol : The QPTProtocol from openConnection.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The reply as a QPTDecoder.Frame or None.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The controller may start or stop jogging.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: reply = await sendStatusJog(PARAMS, protocol)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  commandBits = ((QPTE.statusJogRU if PARAMS.resolverUnits else 0) |
+                 (QPTE.statusJogOSL if PARAMS.overrideSoftLimits else 0) |
+                 (QPTE.statusJogSTOP if PARAMS.stop else 0) |
+                 (QPTE.statusJogRES if PARAMS.reset else 0))
+
+  return await protocol.sendCommand(QPTE.getStatusJogFrame(commandBits,
+                                                           PARAMS.panJogSpeed,
+                                                           PARAMS.tiltJogSpeed))
+
+#End of the function sendStatusJog.py
+
+#################################################################################
+
+#################################################################################
+
+async def sendStop(PARAMS, protocol) :
+  """
+
+   NAME: sendStop(PARAMS, protocol)
+
+   PURPOSE:  Stop the controller.  The STOP bit is set with both jog speeds at zero
+   and, once the controller has acknowledged it, cleared again so that the
+   controller will take the next command.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by asyncio programs.
+
+   INPUTS:
+           PARAMS : The parameter data class.
+           protocol : The QPTProtocol from openConnection.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The reply to the STOP command as a QPTDecoder.Frame or None.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The controller motion is stopped.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: reply = await sendStop(PARAMS, protocol)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  reply = await protocol.sendCommand(QPTE.getStatusJogFrame(QPTE.statusJogSTOP))
+  if((reply is not None) and reply.isAck()) :
+    await protocol.sendCommand(QPTE.getStatusJogFrame())
+  #End of if statement.
+
+  return reply
+
+#End of the function sendStop.py
+
+#################################################################################
+
+#################################################################################
+
+async def sendTimeout(PARAMS, protocol, timeLength, Query = 0) :
+  """
+
+   NAME: sendTimeout(PARAMS, protocol, timeLength, Query = 0)
+
+   PURPOSE:  Set(or query) the controller's communication timeout.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by asyncio programs.
+
+   INPUTS:
+           PARAMS : The parameter data class.
+           protocol : The QPTProtocol from openConnection.
+           timeLength : The timeout in seconds(0-120).  0 turns the timeout off.
+
+   OPTIONAL INPUTS:
+           Query : If set, the controller returns the current timeout without
+           changing it.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The reply as a QPTDecoder.Frame or None.  The timeout is reply.data[0].
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The timeout value is set on the controller.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: reply = await sendTimeout(PARAMS, protocol, 2)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  reply = await protocol.sendCommand(QPTE.getTimeoutFrame(timeLength, Query))
+
+  #Keep the resync check in step with the controller.
+  if((reply is not None) and reply.isAck() and (not Query) and (timeLength > 0)) :
+    protocol.controllerTimeout = timeLength
+  #End of if statement.
+
+  return reply
+
+#End of the function sendTimeout.py
+
+#################################################################################
+
+#################################################################################
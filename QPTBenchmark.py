@@ -0,0 +1,186 @@
+#! /usr/bin/env python3
+
+#A program to time the pieces of the QPT command path that run once per command.  None of
+#these benchmarks need the controller to be connected.
+
+
+def getCheckSumNumpy(Values) :
+  """
+
+   NAME: getCheckSumNumpy(Values)
+
+   PURPOSE:  The original NumPy version of QPTFunctions.getCheckSum.  It is kept here
+   only so that the integer version can be timed against it.
+
+   CATEGORY: Benchmark.
+
+   CALLING SEQUENCE:  Called by benchmarkCheckSum.
+
+   INPUTS:
+           Values : A list of bytes that are components of the command.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS:  The XOR of all of the value items as a np.int16.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS:  None
+
+   RESTRICTIONS: None
+
+   EXAMPLE:   LRC = getCheckSumNumpy(Values)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import numpy as np
+
+  n = len(Values)
+  result = np.int16(Values[0])
+  for i in range(n - 1) :
+    result ^= np.int16(Values[i + 1])
+  #End of for loop; For i in range(n - 1) :
+
+  return result
+
+#End of the function getCheckSumNumpy.py
+
+#################################################################################
+
+#################################################################################
+
+def timeCall(function, numCalls) :
+  """
+
+   NAME: timeCall(function, numCalls)
+
+   PURPOSE:  Time a function that takes no arguments and return the best time per
+   call in microseconds.
+
+   CATEGORY: Benchmark.
+
+   CALLING SEQUENCE:  Called by every benchmark in this file.
+
+   INPUTS:
+           function : The function to time.
+           numCalls : The number of calls in each timing run.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The best of five runs in microseconds per call.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: usPerCall = timeCall(lambda : getCheckSum(Values), 100000)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import timeit
+
+  return min(timeit.repeat(function, number = numCalls, repeat = 5))*1.0e6/numCalls
+
+#End of the function timeCall.py
+
+#################################################################################
+
+#################################################################################
+
+def benchmarkCheckSum(numCalls = 100000) :
+  """
+
+   NAME: benchmarkCheckSum(numCalls = 100000)
+
+   PURPOSE:  Time the NumPy LRC against the integer LRC and the incremental
+   CheckSum object for a Move To Home command and a Move To Entered Coordinates
+   command.
+
+   CATEGORY: Benchmark.
+
+   CALLING SEQUENCE:  Called by main.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           numCalls : The number of calls in each timing run.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: None.  The results are printed to the screen.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: benchmarkCheckSum()
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import QPTFunctions as QPTF
+
+  #A Move To Home command and a Move To Entered Coordinates command to 90.0, -15.0.
+  commands = {'Move To Home' : [0x36],
+              'Move To Entered Coordinates' : [0x33, 0x84, 0x03, 0x6A, 0xFF]}
+
+  for name, Values in commands.items() :
+    #Make sure that all three give the same answer before timing them.
+    lrc = QPTF.CheckSum()
+    lrc.update(Values)
+    if(int(getCheckSumNumpy(Values)) != QPTF.getCheckSum(Values) or
+       lrc.LRC != QPTF.getCheckSum(Values)) :
+      raise ValueError('The check sums disagree for the ' + name + ' command.')
+    #End of if statement.
+
+    def incremental() :
+      lrc = QPTF.CheckSum()
+      for value in Values :
+        lrc.add(value)
+      return lrc.LRC
+
+    numpyTime = timeCall(lambda : getCheckSumNumpy(Values), numCalls)
+    integerTime = timeCall(lambda : QPTF.getCheckSum(Values), numCalls)
+    incrementalTime = timeCall(incremental, numCalls)
+
+    print(name + ' (' + str(len(Values)) + ' bytes)')
+    print('  NumPy getCheckSum       : {0:8.3f} us'.format(numpyTime))
+    print('  Integer getCheckSum     : {0:8.3f} us  ({1:.1f}x)'.format(integerTime,
+                                                                     numpyTime/integerTime))
+    print('  Incremental CheckSum    : {0:8.3f} us  ({1:.1f}x)'.format(incrementalTime,
+                                                                     numpyTime/incrementalTime))
+  #End of for loop - for name, Values in commands.items() :
+
+  return
+
+#End of the function benchmarkCheckSum.py
+
+#################################################################################
+
+#################################################################################
+
+#Gather our code in a main() function.
+def main() :
+
+  benchmarkCheckSum()
+
+# Standard boilerplate to call the main() function to begin
+# the program.
+if __name__ == '__main__':
+  main()
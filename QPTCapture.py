@@ -0,0 +1,325 @@
+#! /usr/bin/env python3
+
+#This module records everything that goes over the serial port to the controller and plays it
+#back.  CaptureSerial wraps the serial port object and writes every chunk written to or read
+#from the port to a capture file, with a nanosecond time stamp and its direction.  The replay
+#functions feed a capture file back through the frame decoder and the status decoder, either
+#as fast as they will go or in(scaled) real time, so problems seen in the field can be looked
+#at and the decoding can be benchmarked without any hardware.
+
+import struct
+import threading
+
+#The capture file starts with a magic string and a version number.  Each chunk is then a
+#chunk header(time.monotonic_ns(), direction and length) followed by the bytes themselves.
+captureMagic = b'QPTC'
+captureVersion = 1
+captureHeader = struct.Struct('<4sH')
+chunkHeader = struct.Struct('<qBH')
+
+#The chunk directions.
+directionWrite = 0  #Written to the controller.
+directionRead = 1   #Read from the controller.
+
+#################################################################################
+
+#################################################################################
+
+class CaptureSerial :
+  """
+
+   NAME: CaptureSerial(ser, filename)
+
+   PURPOSE:  Wrap a serial port object and record every chunk written to it and read
+   from it.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by QPTSession when it is given a capture filename.
+
+   INPUTS:
+           ser : The serial port object to wrap.
+           filename : The capture file.  A new file is started if it does not exist,
+           otherwise the chunks are added to the end of it.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.  It can be used anywhere the serial port object is.  Anything
+   other than read, write and close is passed straight through to ser.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The capture file is written.  It is buffered and flushed when the
+   port is closed or flush is called.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: ser = CaptureSerial(serial.Serial('/dev/ttyUSB1', 9600), '/data/run.qptc')
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self, ser, filename) :
+    import os
+
+    #Set these directly since __setattr__ passes everything else on to ser.
+    object.__setattr__(self, 'ser', ser)
+    object.__setattr__(self, 'filename', filename)
+    object.__setattr__(self, 'lock', threading.Lock())
+
+    newFile = (not os.path.exists(filename)) or (os.path.getsize(filename) == 0)
+    captureFile = open(filename, mode = 'ab', buffering = 65536)
+    if(newFile) :
+      captureFile.write(captureHeader.pack(captureMagic, captureVersion))
+    #End of if statement - if(newFile) :
+    object.__setattr__(self, 'captureFile', captureFile)
+
+  def __getattr__(self, name) :
+    return getattr(self.ser, name)
+
+  def __setattr__(self, name, value) :
+    setattr(self.ser, name, value)
+
+  def record(self, direction, data) :
+    """Add one chunk to the capture file."""
+    import time
+
+    with self.lock :
+      if(not self.captureFile.closed) :
+        self.captureFile.write(chunkHeader.pack(time.monotonic_ns(), direction, len(data)))
+        self.captureFile.write(data)
+      #End of if statement - if(not self.captureFile.closed) :
+    #End of with statement - with self.lock :
+
+  def write(self, data) :
+    """Write to the port and record what was written."""
+    numBytes = self.ser.write(data)
+    self.record(directionWrite, bytes(data))
+    return numBytes
+
+  def read(self, size = 1) :
+    """Read from the port and record what was read."""
+    data = self.ser.read(size)
+    if(len(data) > 0) :
+      self.record(directionRead, data)
+    #End of if statement - if(len(data) > 0) :
+    return data
+
+  def flush(self) :
+    """Flush the port and the capture file."""
+    self.ser.flush()
+    with self.lock :
+      if(not self.captureFile.closed) :
+        self.captureFile.flush()
+      #End of if statement - if(not self.captureFile.closed) :
+    #End of with statement - with self.lock :
+
+  def close(self) :
+    """Close the port and the capture file."""
+    self.ser.close()
+    with self.lock :
+      self.captureFile.close()
+    #End of with statement - with self.lock :
+
+#End of the class CaptureSerial.py
+
+#################################################################################
+
+#################################################################################
+
+def readCapture(filename) :
+  """
+
+   NAME: readCapture(filename)
+
+   PURPOSE:  Read the chunks from a capture file.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by replayCapture.
+
+   INPUTS:
+           filename : The capture file written by CaptureSerial.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A list of (time, direction, data) tuples in the order they were recorded,
+   where time is time.monotonic_ns() when the chunk was recorded.  A chunk cut off at
+   the end of the file is left out.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Raises ValueError if the file is not a capture file.
+
+   EXAMPLE: for chunkTime, direction, data in readCapture('/data/run.qptc') :
+              print(chunkTime, direction, data.hex())
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  with open(filename, mode = 'rb') as f :
+    contents = f.read()
+  #End of with statement - with open(filename, mode = 'rb') as f :
+
+  if((len(contents) < captureHeader.size) or
+     (captureHeader.unpack_from(contents)[0] != captureMagic)) :
+    raise ValueError(filename + ' is not a capture file.')
+  #End of if statement.
+  if(captureHeader.unpack_from(contents)[1] != captureVersion) :
+    raise ValueError(filename + ' was written with a different capture version.')
+  #End of if statement.
+
+  chunks = []
+  offset = captureHeader.size
+  while(offset + chunkHeader.size <= len(contents)) :
+    chunkTime, direction, length = chunkHeader.unpack_from(contents, offset)
+    offset += chunkHeader.size
+    if(offset + length > len(contents)) :
+      break
+    #End of if statement - if(offset + length > len(contents)) :
+    chunks.append((chunkTime, direction, contents[offset:offset + length]))
+    offset += length
+  #End of while loop - while(offset + chunkHeader.size <= len(contents)) :
+
+  return chunks
+
+#End of the function readCapture.py
+
+#################################################################################
+
+#################################################################################
+
+def replayCapture(filename, speed = None, onStatus = None, PARAMS = None) :
+  """
+
+   NAME: replayCapture(filename, speed = None, onStatus = None, PARAMS = None)
+
+   PURPOSE:  Feed the bytes read from the controller in a capture file back through
+   the frame decoder and the status decoder.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by main and by the benchmarks.
+
+   INPUTS:
+           filename : The capture file written by CaptureSerial.
+
+   OPTIONAL INPUTS:
+           speed : None to replay as fast as possible, or how many times faster than
+           real time to replay, so 1.0 is real time and 0.5 is half speed.
+           onStatus : A function called as onStatus(status) with the
+           QPTStatus.StatusRecord of every status reply.
+           PARAMS : The parameter data class.  If this is given every status is also
+           written to the telemetry file, as parseControllerOutput does.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A dictionary holding numChunks, numBytes, numFrames, numStatus,
+   numLRCErrors and numDiscarded for the bytes read from the controller,
+   numWritten for the bytes written to it and elapsed, the replay time in seconds.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None unless PARAMS is given.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: summary = replayCapture('/data/run.qptc', speed = 1.0)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import time
+  import QPTDecoder as QPTD
+  import QPTStatus as QPTSt
+  from QPTFunctions import writePanTiltValues
+
+  chunks = readCapture(filename)
+  decoder = QPTD.FrameDecoder()
+  summary = {'numChunks' : 0, 'numBytes' : 0, 'numWritten' : 0, 'numStatus' : 0}
+
+  startTime = time.perf_counter()
+  firstChunkTime = chunks[0][0] if len(chunks) > 0 else 0
+  for chunkTime, direction, data in chunks :
+    if(speed is not None) :
+      delay = (chunkTime - firstChunkTime)*1.0e-9/speed - (time.perf_counter() - startTime)
+      if(delay > 0) :
+        time.sleep(delay)
+      #End of if statement - if(delay > 0) :
+    #End of if statement - if(speed is not None) :
+
+    if(direction != directionRead) :
+      summary['numWritten'] += len(data)
+      continue
+    #End of if statement - if(direction != directionRead) :
+
+    summary['numChunks'] += 1
+    summary['numBytes'] += len(data)
+    for frame in decoder.feed(data) :
+      status = QPTSt.decodeStatus(frame)
+      if(status is None) :
+        continue
+      #End of if statement - if(status is None) :
+
+      summary['numStatus'] += 1
+      if(onStatus is not None) :
+        onStatus(status)
+      #End of if statement - if(onStatus is not None) :
+      if(PARAMS is not None) :
+        writePanTiltValues(PARAMS, status.pan, status.tilt, int(status.panFlags),
+                           int(status.tiltFlags), int(status.generalFlags), status.command)
+      #End of if statement - if(PARAMS is not None) :
+    #End of for loop - for frame in decoder.feed(data) :
+  #End of for loop - for chunkTime, direction, data in chunks :
+
+  summary['elapsed'] = time.perf_counter() - startTime
+  summary['numFrames'] = decoder.numFrames
+  summary['numLRCErrors'] = decoder.numLRCErrors
+  summary['numDiscarded'] = decoder.numDiscarded
+
+  return summary
+
+#End of the function replayCapture.py
+
+#################################################################################
+
+#################################################################################
+
+def main() :
+  import argparse
+
+  parser = argparse.ArgumentParser(description = 'Replay a controller capture file.')
+  parser.add_argument('filename', help = 'The capture file.')
+  parser.add_argument('--speed', type = float, default = None,
+                      help = 'Times faster than real time to replay.  Leave this out to ' +
+                      'replay as fast as possible.')
+  parser.add_argument('--verbose', action = 'store_true',
+                      help = 'Print every status reply.')
+  args = parser.parse_args()
+
+  summary = replayCapture(args.filename, speed = args.speed,
+                          onStatus = print if args.verbose else None)
+  for key, value in summary.items() :
+    print(key, ' : ', value)
+  #End of for loop - for key, value in summary.items() :
+
+  if(summary['elapsed'] > 0) :
+    print('Status replies per second : ', summary['numStatus']/summary['elapsed'])
+  #End of if statement - if(summary['elapsed'] > 0) :
+
+# Standard boilerplate to call the main() function to begin
+# the program.
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,250 @@
+#This module decodes the byte stream coming back from the QPT controller into frames.  The
+#decoder can be fed chunks of any size as they are read from the serial port.  It keeps any
+#partial frame between reads, removes the ESC sequences, checks the LRC and throws away any
+#garbage between frames.
+
+import re
+
+from QPTFunctions import STX, ETX, ACK, NAK, ESC, getCheckSum
+
+#A frame starts on an ACK or NAK from the controller(or an STX when decoding the commands
+#that we sent) and ends on an ETX.  Since every data byte that matches a control character
+#is escaped, none of the control characters can show up inside of a good frame.
+framePattern = re.compile(b'[\\x02\\x06\\x15]([^\\x02\\x03\\x06\\x15]*)\\x03')
+startPattern = re.compile(b'[\\x02\\x06\\x15]')
+
+#The longest frame we will hold on to while waiting for its ETX.  Nothing the controller
+#sends comes close to this so anything longer is garbage.
+maxFrameLength = 256
+
+#################################################################################
+
+#################################################################################
+
+class Frame :
+  """
+
+   NAME: Frame(start, command, data)
+
+   PURPOSE:  Hold one decoded frame.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by FrameDecoder.
+
+   INPUTS:
+           start : The start character of the frame.  This is ACK or NAK for frames
+           sent by the controller and STX for frames sent to it.
+           command : The (echoed) command number.
+           data : The unescaped data bytes between the command number and the LRC.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: frame = Frame(ACK, 0x31, data)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  __slots__ = ('start', 'command', 'data')
+
+  def __init__(self, start, command, data) :
+    self.start = start
+    self.command = command
+    self.data = data
+
+  def isAck(self) :
+    """Return True if the controller acknowledged the command."""
+    return self.start == ACK
+
+  def isNak(self) :
+    """Return True if the controller did not acknowledge the command."""
+    return self.start == NAK
+
+  def __repr__(self) :
+    return 'Frame(start=0x{0:02X}, command=0x{1:02X}, data={2!r})'.format(
+      self.start, self.command, self.data)
+
+#End of the class Frame.py
+
+#################################################################################
+
+#################################################################################
+
+def unescape(body) :
+  """
+
+   NAME: unescape(body)
+
+   PURPOSE:  Remove the ESC characters from the body of a frame.  The ESC is tossed
+   and bit 7 of the byte after it is cleared.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by FrameDecoder.feed.
+
+   INPUTS:
+           body : The escaped bytes between the start character and the ETX.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The unescaped bytes or None if the body ends on an ESC.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: body = unescape(b'\\x31\\x1b\\x82\\x00')  #Returns b'\\x31\\x02\\x00'
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  #Most frames have no escapes at all.
+  if(ESC not in body) :
+    return bytes(body)
+  #End of if statement - if(ESC not in body) :
+
+  parts = body.split(bytes((ESC,)))
+  unescaped = bytearray(parts[0])
+  for part in parts[1:] :
+    if(len(part) == 0) :
+      #Either two ESC's in a row or an ESC right before the ETX.
+      return None
+    #End of if statement - if(len(part) == 0) :
+    unescaped.append(part[0] & 0x7F)
+    unescaped += part[1:]
+  #End of for loop - for part in parts[1:] :
+
+  return bytes(unescaped)
+
+#End of the function unescape.py
+
+#################################################################################
+
+#################################################################################
+
+class FrameDecoder :
+  """
+
+   NAME: FrameDecoder()
+
+   PURPOSE:  Turn chunks of bytes read from the serial port into complete, unescaped
+   and LRC checked frames.  Any partial frame is kept until the rest of it is fed in.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by anything that reads from the controller.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.  The counters numFrames, numLRCErrors and numDiscarded
+   keep track of the good frames, the frames that failed the LRC(or had a bad
+   escape) and the garbage bytes that were thrown away.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: decoder = FrameDecoder()
+            for frame in decoder.feed(ser.read(ser.in_waiting or 1)) :
+              print(frame)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self) :
+    self.buffer = b''
+    self.pending = []
+    self.numFrames = 0
+    self.numLRCErrors = 0
+    self.numDiscarded = 0
+
+  def reset(self) :
+    """Throw away any partial frame and any frames that have not been used yet."""
+    self.numDiscarded += len(self.buffer)
+    self.buffer = b''
+    self.pending = []
+
+  def unread(self, frames) :
+    """Hand back frames that were not used yet.  They come out first on the next feed."""
+    self.pending = list(frames) + self.pending
+
+  def hasPartialFrame(self) :
+    """Return True if part of a frame has been fed in without its ETX."""
+    return len(self.buffer) > 0
+
+  def feed(self, chunk) :
+    """Feed in the next chunk of bytes and return a list of the complete frames."""
+
+    buffer = self.buffer + bytes(chunk) if self.buffer else bytes(chunk)
+    frames = self.pending
+    numPending = len(frames)
+    self.pending = []
+    end = 0
+
+    for match in framePattern.finditer(buffer) :
+      #Everything between the last frame and this one is garbage.
+      self.numDiscarded += match.start() - end
+      end = match.end()
+
+      body = unescape(match.group(1))
+
+      #The XOR of the command number, the data and the LRC should be zero.
+      if((body is None) or (len(body) < 2) or (getCheckSum(body) != 0)) :
+        self.numLRCErrors += 1
+        continue
+      #End of if statement.
+
+      frames.append(Frame(buffer[match.start()], body[0], body[1:-1]))
+    #End of for loop - for match in framePattern.finditer(buffer) :
+
+    #Hold on to the last start character after the last frame since the rest of that
+    #frame has not shown up yet.  Anything before it can never be part of a frame.
+    tail = buffer[end:]
+    lastStart = -1
+    for match in startPattern.finditer(tail) :
+      lastStart = match.start()
+    #End of for loop - for match in startPattern.finditer(tail) :
+
+    if((lastStart < 0) or (len(tail) - lastStart > maxFrameLength)) :
+      self.numDiscarded += len(tail)
+      self.buffer = b''
+    else :
+      self.numDiscarded += lastStart
+      self.buffer = tail[lastStart:]
+    #End of if-else clause.
+
+    self.numFrames += len(frames) - numPending
+
+    return frames
+
+#End of the class FrameDecoder.py
+
+#################################################################################
+
+#################################################################################
@@ -0,0 +1,556 @@
+#This module builds the escaped command frames that are sent to the QPT controller.  All of
+#the work of splitting a 16-bit coordinate into its little endian bytes and escaping any byte
+#that matches a control character is done once, when the module is imported, and stored in
+#lookup tables.  A command frame is then put together from a few table lookups and a join.
+
+from QPTFunctions import STX, ETX, ACK, NAK, ESC
+
+#The set of byte values that have to be escaped when they show up in the data or the LRC.
+controlCharacters = (STX, ETX, ACK, NAK, ESC)
+
+#The command number for Move To Entered Coordinates.
+moveToEnteredCoordsNumber = 0x33
+
+#The command numbers for Get Status/Jog and Get/Set Communication Timeout.
+statusJogNumber = 0x31
+timeoutNumber = 0x96
+
+#The bits of the Get Status/Jog command bitset, from the protocol manual.
+statusJogRES = 0x1   #Reset.  Clears all hard faults.
+statusJogSTOP = 0x2  #Stop all motors.
+statusJogOSL = 0x4   #Override the soft limits during jog.
+statusJogRU = 0x8    #Return coordinates in resolver units instead of angles.
+
+#################################################################################
+
+#################################################################################
+
+def getEscapedByte(value) :
+  """
+
+   NAME: getEscapedByte(value)
+
+   PURPOSE:  Escape a single byte.  If the byte matches one of the control characters
+   then an ESC character is inserted in front of it and bit 7 of the byte is set.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by buildByteTable and buildInt16Table.
+
+   INPUTS:
+           value : An integer between 0 and 255.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A bytes object holding either the byte or the ESC byte pair.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: escaped = getEscapedByte(0x02)  #Returns b'\\x1b\\x82'
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  if(value in controlCharacters) :
+    return bytes((ESC, value | 0x80))
+  else :
+    return bytes((value,))
+  #End of if-else clause.
+
+#End of the function getEscapedByte.py
+
+#################################################################################
+
+#################################################################################
+
+def buildByteTable() :
+  """
+
+   NAME: buildByteTable()
+
+   PURPOSE:  Build a 256 entry table holding the escaped form of every byte value.
+   This table is used for the command number, single byte data values and the LRC.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called once when this module is imported.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A tuple of 256 bytes objects indexed by the byte value.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: byteTable = buildByteTable()
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  return tuple(getEscapedByte(value) for value in range(256))
+
+#End of the function buildByteTable.py
+
+#################################################################################
+
+#################################################################################
+
+def buildInt16Table() :
+  """
+
+   NAME: buildInt16Table()
+
+   PURPOSE:  Build the two 65,536 entry tables used to encode 16-bit signed two's
+   complement integers.  The first table holds the escaped little endian bytes of
+   each value and the second holds the XOR of its two unescaped bytes, which is the
+   value's contribution to the LRC.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called once when this module is imported.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A two element list [int16Table, int16XorTable].  Both are indexed by
+   value & 0xFFFF, so negative values index the same entry as their two's
+   complement.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: int16Table, int16XorTable = buildInt16Table()
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  #The index is the unsigned 16-bit value, so the low byte changes fastest.  Build each
+  #table entry from the two single byte escapes.
+  int16Table = tuple(byteTable[lowByte] + byteTable[highByte]
+                     for highByte in range(256) for lowByte in range(256))
+  int16XorTable = bytes(lowByte ^ highByte
+                        for highByte in range(256) for lowByte in range(256))
+
+  return [int16Table, int16XorTable]
+
+#End of the function buildInt16Table.py
+
+#################################################################################
+
+#################################################################################
+
+#Build the lookup tables.
+byteTable = buildByteTable()
+int16Table, int16XorTable = buildInt16Table()
+
+#The frame start and end never change so keep them as bytes.
+stxBytes = bytes((STX,))
+etxBytes = bytes((ETX,))
+
+#################################################################################
+
+#################################################################################
+
+def encodeInt16(value) :
+  """
+
+   NAME: encodeInt16(value)
+
+   PURPOSE:  Return the escaped little endian bytes of a 16-bit signed integer.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by any function that needs to put an integer into a
+   command.
+
+   INPUTS:
+           value : An integer between -32768 and 32767.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A bytes object of two to four bytes.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Values outside of the 16-bit range wrap around.
+
+   EXAMPLE: AzBytes = encodeInt16(-2)  #Returns b'\\xfe\\xff'
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  return int16Table[int(value) & 0xFFFF]
+
+#End of the function encodeInt16.py
+
+#################################################################################
+
+#################################################################################
+
+def getFrame(CommandNumber, data = b'') :
+  """
+
+   NAME: getFrame(CommandNumber, data = b'')
+
+   PURPOSE:  Build a complete command frame, STX through ETX, for any command number
+   and raw (unescaped) data bytes.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by any function that sends a command to the controller.
+
+   INPUTS:
+           CommandNumber : The command number, for example 0x35.
+
+   OPTIONAL INPUTS:
+           data : The unescaped data bytes of the command.  Defaults to no data.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The escaped command as a bytes object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: Command = getFrame(0x36)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  #The LRC is the XOR of the command number and all of the unescaped data bytes.
+  LRC = CommandNumber
+  for value in data :
+    LRC ^= value
+  #End of for loop - for value in data :
+
+  return b''.join([stxBytes, byteTable[CommandNumber],
+                   b''.join([byteTable[value] for value in data]),
+                   byteTable[LRC], etxBytes])
+
+#End of the function getFrame.py
+
+#################################################################################
+
+#################################################################################
+
+def getPositionFrame(Az, El) :
+  """
+
+   NAME: getPositionFrame(Az, El)
+
+   PURPOSE:  Build the Move To Entered Coordinates (0x33) frame for a pan and tilt
+   position.  This is two table lookups per coordinate and one join.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by moveToEnteredCoords, readPointing and
+   moveToEnteredCoordsFile.
+
+   INPUTS:
+           Az : The pan coordinate in tenths of a degree.  This is an integer.
+           El : The tilt coordinate in tenths of a degree.  This is an integer.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The escaped command as a bytes object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: No range check is done here.  The caller is responsible for making
+   sure the coordinates are within the controller's limits.
+
+   EXAMPLE: Command = getPositionFrame(900, -150)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  Az = int(Az) & 0xFFFF
+  El = int(El) & 0xFFFF
+  LRC = moveToEnteredCoordsNumber ^ int16XorTable[Az] ^ int16XorTable[El]
+
+  return b''.join([stxBytes, byteTable[moveToEnteredCoordsNumber], int16Table[Az],
+                   int16Table[El], byteTable[LRC], etxBytes])
+
+#End of the function getPositionFrame.py
+
+#################################################################################
+
+#################################################################################
+
+def compileTrajectory(Az, El) :
+  """
+
+   NAME: compileTrajectory(Az, El)
+
+   PURPOSE:  Build the Move To Entered Coordinates (0x33) frames for a whole
+   trajectory at once.  The little endian packing, the LRC and the escaping are all
+   done with NumPy array operations, so there is no Python work per point.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by readPointing and moveToEnteredCoordsFile.
+
+   INPUTS:
+           Az : An array of pan coordinates in tenths of a degree.
+           El : An array of tilt coordinates in tenths of a degree.  This must be
+           the same length as Az.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A two element list [buffer, offsets].  buffer is a bytes object holding
+   every escaped frame back to back and offsets is an integer array of length
+   len(Az) + 1.  Frame i is buffer[offsets[i]:offsets[i + 1]].
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: No range check is done here.  Coordinates are truncated to
+   integers and wrap around outside of the 16-bit range.
+
+   EXAMPLE: buffer, offsets = compileTrajectory(Az, El)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import numpy as np
+
+  #Force the coordinates into unsigned 16-bit values.  Going through int64 first keeps
+  #the negative values as their two's complement.
+  Az = np.asarray(Az).astype(np.int64).astype(np.uint16)
+  El = np.asarray(El).astype(np.int64).astype(np.uint16)
+  numFrames = len(Az)
+
+  #Lay out every frame as eight unescaped bytes: STX, command number, the pan and tilt
+  #little endian bytes, the LRC and ETX.
+  frames = np.empty((numFrames, 8), dtype = np.uint8)
+  frames[:, 0] = STX
+  frames[:, 1] = moveToEnteredCoordsNumber
+  frames[:, 2] = Az & 0xFF
+  frames[:, 3] = Az >> 8
+  frames[:, 4] = El & 0xFF
+  frames[:, 5] = El >> 8
+  frames[:, 7] = ETX
+
+  #The LRC is the XOR of the command number and the four coordinate bytes of each
+  #frame.  Treat the flattened frames as one long array and reduce each frame's slice.
+  frames[:, 6] = np.bitwise_xor.reduceat(frames[:, 1:6].ravel(),
+                                         np.arange(0, 5*numFrames, 5))[:numFrames]
+
+  #Find every data or LRC byte that matches a control character.  The STX and ETX at
+  #either end of the frame are never escaped.
+  isControl = np.zeros(256, dtype = bool)
+  isControl[list(controlCharacters)] = True
+  needsEscape = isControl[frames]
+  needsEscape[:, 0] = False
+  needsEscape[:, 7] = False
+
+  #Each escaped byte takes two slots in the output.  Repeat those bytes, then overwrite
+  #the first copy with ESC and set bit 7 of the second copy.
+  flatFrames = frames.ravel()
+  flatEscape = needsEscape.ravel()
+  counts = 1 + flatEscape.astype(np.int64)
+  starts = np.cumsum(counts) - counts
+  output = np.repeat(flatFrames, counts)
+  escapeStarts = starts[flatEscape]
+  output[escapeStarts] = ESC
+  output[escapeStarts + 1] = flatFrames[flatEscape] | 0x80
+
+  #Every frame starts on its STX.  Close the index with the total length.
+  offsets = np.append(starts[::8], len(output))
+
+  return [output.tobytes(), offsets]
+
+#End of the function compileTrajectory.py
+
+#################################################################################
+
+#################################################################################
+
+def getJogByte(speed) :
+  """
+
+   NAME: getJogByte(speed)
+
+   PURPOSE:  Build a pan or tilt jog byte for the Get Status/Jog command.  Bits 7
+   through 1 hold the speed(0-127) and bit 0 holds the direction.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by getStatusJogFrame.
+
+   INPUTS:
+           speed : The signed jog speed.  Positive is clockwise(pan) or up(tilt),
+           negative is counter clockwise or down and 0 holds the axis still.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The jog byte as an integer.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Speeds larger than 127 are clipped to 127.
+
+   EXAMPLE: panJog = getJogByte(-40)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  speed = int(speed)
+  magnitude = min(abs(speed), 127)
+
+  return (magnitude << 1) | (1 if speed > 0 else 0)
+
+#End of the function getJogByte.py
+
+#################################################################################
+
+#################################################################################
+
+def getStatusJogFrame(commandBits = 0, panJogSpeed = 0, tiltJogSpeed = 0) :
+  """
+
+   NAME: getStatusJogFrame(commandBits = 0, panJogSpeed = 0, tiltJogSpeed = 0)
+
+   PURPOSE:  Build a Get Status/Jog (0x31) frame.  With no arguments this is the
+   plain status query.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by any function that sends a Get Status/Jog command.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           commandBits : The command bitset.  OR together statusJogRU, statusJogOSL,
+           statusJogSTOP and statusJogRES.
+           panJogSpeed : The signed pan jog speed(-127 to 127).
+           tiltJogSpeed : The signed tilt jog speed(-127 to 127).
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The escaped command as a bytes object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: Command = getStatusJogFrame(statusJogSTOP)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  #The two auxiliary bytes are not used and should be written as 0.
+  data = bytes((commandBits & 0xF, getJogByte(panJogSpeed), getJogByte(tiltJogSpeed), 0, 0))
+
+  return getFrame(statusJogNumber, data)
+
+#End of the function getStatusJogFrame.py
+
+#################################################################################
+
+#################################################################################
+
+def getTimeoutFrame(timeLength, Query = 0) :
+  """
+
+   NAME: getTimeoutFrame(timeLength, Query = 0)
+
+   PURPOSE:  Build a Get/Set Communication Timeout (0x96) frame.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by any function that sets or queries the timeout.
+
+   INPUTS:
+           timeLength : The timeout in seconds(0-120).  0 turns the timeout off.
+
+   OPTIONAL INPUTS:
+           Query : If set, bit 7 is set and the controller returns its current
+           timeout without changing it.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The escaped command as a bytes object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: timeLength must be between 0 and 120.
+
+   EXAMPLE: Command = getTimeoutFrame(2)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  timeLength = int(timeLength)
+  if((timeLength < 0) or (timeLength > 120)) :
+    raise ValueError('The timeout must be between 0 and 120 seconds.')
+  #End of if statement.
+
+  return getFrame(timeoutNumber, bytes(((0x80 if Query else 0) | timeLength,)))
+
+#End of the function getTimeoutFrame.py
+
+#################################################################################
+
+#################################################################################
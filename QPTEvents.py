@@ -0,0 +1,367 @@
+#This module turns the stream of status replies into events.  The EventEngine remembers the last
+#pan, tilt and general status bytes and only does any work when one of them changes, so a
+#controller sitting still costs three integer compares per reply.  Each flag that changed
+#becomes a FaultEvent("CWHL asserted", "EXEC cleared") that is handed to every subscriber.
+#Subscribers each get their own bounded queue, so a slow one drops its own events instead of
+#holding up the thread that reads the serial port.
+
+import queue
+import threading
+
+#################################################################################
+
+#################################################################################
+
+class FaultEvent :
+  """
+
+   NAME: FaultEvent(time, axis, flag, asserted, status)
+
+   PURPOSE:  Hold one flag change.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by EventEngine.
+
+   INPUTS:
+           time : The time.monotonic_ns() the change was seen.
+           axis : 'pan', 'tilt' or 'gen'.
+           flag : The QPTStatus.PanFlag, TiltFlag or GeneralFlag that changed.
+           asserted : True if the flag was set, False if it was cleared.
+           status : The QPTStatus.StatusRecord the change was seen in.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: print(event.getMessage())
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  __slots__ = ('time', 'axis', 'flag', 'asserted', 'status')
+
+  def __init__(self, time, axis, flag, asserted, status) :
+    self.time = time
+    self.axis = axis
+    self.flag = flag
+    self.asserted = asserted
+    self.status = status
+
+  def getMessage(self) :
+    """Return the change as text, for example 'pan CWHL asserted'."""
+    return self.axis + ' ' + self.flag.name + (' asserted' if self.asserted else ' cleared')
+
+  def __repr__(self) :
+    return 'FaultEvent(time={0}, {1})'.format(self.time, self.getMessage())
+
+#End of the class FaultEvent.py
+
+#################################################################################
+
+#################################################################################
+
+class CallbackSubscriber :
+  """
+
+   NAME: CallbackSubscriber(callback, maxQueue = 1000)
+
+   PURPOSE:  Call a function with every event from a thread of its own.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by EventEngine.subscribe.
+
+   INPUTS:
+           callback : The function, called as callback(event).
+
+   OPTIONAL INPUTS:
+           maxQueue : The most events that can wait for the callback.  Events that
+           arrive while the queue is full are dropped and counted in numDropped.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: A daemon thread runs until close is called.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: subscriber = engine.subscribe(print)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self, callback, maxQueue = 1000) :
+    self.callback = callback
+    self.events = queue.Queue(maxsize = maxQueue)
+    self.numDropped = 0
+    self.thread = threading.Thread(target = self.run, name = 'QPTEventCallback',
+                                   daemon = True)
+    self.thread.start()
+
+  def deliver(self, event) :
+    """Queue an event for the callback.  This never blocks."""
+    try :
+      self.events.put_nowait(event)
+    except queue.Full :
+      self.numDropped += 1
+    #End of try-except clause.
+
+  def close(self) :
+    """Stop the thread once the events already queued have been handled."""
+    self.events.put(None)
+
+  def run(self) :
+    while(True) :
+      event = self.events.get()
+      if(event is None) :
+        return
+      #End of if statement - if(event is None) :
+
+      try :
+        self.callback(event)
+      except Exception :
+        import traceback
+        traceback.print_exc()
+      #End of try-except clause.
+    #End of while loop - while(True) :
+
+#End of the class CallbackSubscriber.py
+
+#################################################################################
+
+#################################################################################
+
+class AsyncSubscriber :
+  """
+
+   NAME: AsyncSubscriber(loop, maxQueue = 1000)
+
+   PURPOSE:  Hand the events to an asyncio task as an async iterator.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by EventEngine.subscribeAsync.
+
+   INPUTS:
+           loop : The asyncio event loop the events are read on.
+
+   OPTIONAL INPUTS:
+           maxQueue : The most events that can wait to be read.  Events that arrive
+           while the queue is full are dropped and counted in numDropped.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Make this from a coroutine running on loop.
+
+   EXAMPLE: async for event in engine.subscribeAsync() :
+              print(event.getMessage())
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self, loop, maxQueue = 1000) :
+    import asyncio
+
+    self.loop = loop
+    self.events = asyncio.Queue(maxsize = maxQueue)
+    self.numDropped = 0
+
+  def put(self, event) :
+    """Put an event on the queue.  This runs on the event loop."""
+    import asyncio
+
+    try :
+      self.events.put_nowait(event)
+    except asyncio.QueueFull :
+      if(event is None) :
+        #Make room for the close so the reader still finishes.
+        self.events.get_nowait()
+        self.events.put_nowait(event)
+      #End of if statement - if(event is None) :
+      self.numDropped += 1
+    #End of try-except clause.
+
+  def deliver(self, event) :
+    """Pass an event over to the event loop.  This can be called from any thread and
+    never blocks."""
+    try :
+      self.loop.call_soon_threadsafe(self.put, event)
+    except RuntimeError :
+      #The event loop has been closed.
+      self.numDropped += 1
+    #End of try-except clause.
+
+  def close(self) :
+    """End the iteration once the events already queued have been read."""
+    self.deliver(None)
+
+  def __aiter__(self) :
+    return self
+
+  async def __anext__(self) :
+    event = await self.events.get()
+    if(event is None) :
+      raise StopAsyncIteration
+    #End of if statement - if(event is None) :
+    return event
+
+#End of the class AsyncSubscriber.py
+
+#################################################################################
+
+#################################################################################
+
+class EventEngine :
+  """
+
+   NAME: EventEngine()
+
+   PURPOSE:  Turn status replies into flag change events and hand them to the
+   subscribers.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Fed by the thread that reads the controller, for example as the
+   Heartbeat onStatus function.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.  numEvents counts the events made.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: update and feedFrame should be called from one thread.
+
+   EXAMPLE: engine = EventEngine()
+            engine.subscribe(lambda event : print(event.getMessage()))
+            heartbeat = QPTH.Heartbeat(session, onStatus = engine.feedFrame)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self) :
+    import QPTStatus as QPTSt
+
+    #The flags set in each byte value, so the changes are found with a single lookup.
+    self.flagTables = (('pan', tuple(tuple(QPTSt.panFlagTable[byte]) for byte in range(256))),
+                       ('tilt', tuple(tuple(QPTSt.tiltFlagTable[byte]) for byte in range(256))),
+                       ('gen', tuple(tuple(QPTSt.generalFlagTable[byte])
+                                     for byte in range(256))))
+
+    #The last status bytes.  All clear to start with, so any flag that is already set
+    #when the first reply comes in shows up as asserted.
+    self.last = (0, 0, 0)
+    self.subscribers = []
+    self.lock = threading.Lock()
+    self.numEvents = 0
+
+  def subscribe(self, callback, maxQueue = 1000) :
+    """Call callback(event) with every event from a thread of its own.  Returns the
+    CallbackSubscriber."""
+    subscriber = CallbackSubscriber(callback, maxQueue)
+    with self.lock :
+      self.subscribers = self.subscribers + [subscriber]
+    #End of with statement - with self.lock :
+    return subscriber
+
+  def subscribeAsync(self, maxQueue = 1000) :
+    """Return an AsyncSubscriber to read the events with 'async for'.  Call this from a
+    coroutine running on the event loop that reads the events."""
+    import asyncio
+
+    subscriber = AsyncSubscriber(asyncio.get_running_loop(), maxQueue)
+    with self.lock :
+      self.subscribers = self.subscribers + [subscriber]
+    #End of with statement - with self.lock :
+    return subscriber
+
+  def unsubscribe(self, subscriber) :
+    """Stop sending events to a subscriber and close it."""
+    with self.lock :
+      self.subscribers = [other for other in self.subscribers if other is not subscriber]
+    #End of with statement - with self.lock :
+    subscriber.close()
+
+  def update(self, status) :
+    """Compare a QPTStatus.StatusRecord with the last one and send out an event for
+    every flag that changed.  Returns the list of events."""
+    import time
+
+    current = (int(status.panFlags), int(status.tiltFlags), int(status.generalFlags))
+    if(current == self.last) :
+      return []
+    #End of if statement - if(current == self.last) :
+
+    now = time.monotonic_ns()
+    events = []
+    for (axis, flagTable), before, after in zip(self.flagTables, self.last, current) :
+      changed = before ^ after
+      if(changed == 0) :
+        continue
+      #End of if statement - if(changed == 0) :
+
+      for flag in flagTable[changed] :
+        events.append(FaultEvent(now, axis, flag, bool(after & flag), status))
+      #End of for loop - for flag in flagTable[changed] :
+    #End of for loop.
+    self.last = current
+    self.numEvents += len(events)
+
+    #The subscriber list is replaced, never changed, so it can be read without the lock.
+    for subscriber in self.subscribers :
+      for event in events :
+        subscriber.deliver(event)
+      #End of for loop - for event in events :
+    #End of for loop - for subscriber in self.subscribers :
+
+    return events
+
+  def feedFrame(self, frame) :
+    """Decode a QPTDecoder.Frame and pass the status to update.  Frames without a
+    status are ignored."""
+    import QPTStatus as QPTSt
+
+    status = QPTSt.decodeStatus(frame)
+    if(status is None) :
+      return []
+    #End of if statement - if(status is None) :
+
+    return self.update(status)
+
+#End of the class EventEngine.py
+
+#################################################################################
+
+#################################################################################
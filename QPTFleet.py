@@ -0,0 +1,261 @@
+#This module holds the Fleet class, which drives several controllers at once.  Each serial port
+#gets its own QPTSession and Heartbeat thread, so a slow or dead port only holds up its own
+#worker.  Commands can go to one controller, all of them, or a different command to each, and
+#every reply is put on one telemetry queue tagged with the controller ID.
+
+import collections
+import queue
+import threading
+
+#################################################################################
+
+#################################################################################
+
+class LatencyStats :
+  """
+
+   NAME: LatencyStats(numRecent = 1000)
+
+   PURPOSE:  Keep round trip latency statistics for one serial port.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by Fleet for every controller.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           numRecent : The number of most recent samples kept for the percentiles.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: stats = LatencyStats()
+            stats.add(0.018)
+            print(stats.getSummary())
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self, numRecent = 1000) :
+    self.lock = threading.Lock()
+    self.count = 0
+    self.total = 0.0
+    self.minimum = None
+    self.maximum = None
+    self.recent = collections.deque(maxlen = numRecent)
+
+  def add(self, seconds) :
+    """Add one round trip time in seconds."""
+    with self.lock :
+      self.count += 1
+      self.total += seconds
+      if((self.minimum is None) or (seconds < self.minimum)) :
+        self.minimum = seconds
+      #End of if statement.
+      if((self.maximum is None) or (seconds > self.maximum)) :
+        self.maximum = seconds
+      #End of if statement.
+      self.recent.append(seconds)
+
+  def getSummary(self) :
+    """Return a dictionary with the count and the mean, minimum, maximum, median and 95th
+    percentile round trip times in seconds."""
+    with self.lock :
+      recent = sorted(self.recent)
+      summary = {'count' : self.count,
+                 'mean' : self.total/self.count if self.count else None,
+                 'min' : self.minimum,
+                 'max' : self.maximum,
+                 'p50' : None,
+                 'p95' : None}
+    #End of with statement - with self.lock :
+
+    if(len(recent) > 0) :
+      summary['p50'] = recent[(len(recent) - 1)//2]
+      summary['p95'] = recent[min(len(recent) - 1, int(0.95*len(recent)))]
+    #End of if statement - if(len(recent) > 0) :
+
+    return summary
+
+#End of the class LatencyStats.py
+
+#################################################################################
+
+#################################################################################
+
+class Fleet :
+  """
+
+   NAME: Fleet(ports, period = 0.5, telemetrySize = 100000)
+
+   PURPOSE:  Drive several controllers at once with one I/O thread per serial port.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by programs that run more than one pan/tilt head.
+
+   INPUTS:
+           ports : A dictionary of controller ID to serial port name, for example
+           {'north' : '/dev/ttyUSB0', 'south' : '/dev/ttyUSB1'}.  A QPTSession can be
+           given in place of a port name.
+
+   OPTIONAL INPUTS:
+           period : The time in seconds between status commands on each port.
+           telemetrySize : The most telemetry entries held before new ones are
+           dropped(and counted in numDropped).
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.  telemetry is a queue.Queue of (controllerID, time, reply)
+   entries where time is the time.time() the reply was read and reply is a
+   QPTDecoder.Frame.  latency holds a LatencyStats for every controller.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The serial ports are opened.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: fleet = Fleet({'north' : '/dev/ttyUSB0', 'south' : '/dev/ttyUSB1'})
+            fleet.start()
+            fleet.broadcast(QPTE.getFrame(0x36))
+            controllerID, readTime, reply = fleet.telemetry.get()
+            fleet.stop()
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Closed the ports already opened when a later one fails, and only
+             timed replies that came back ACK, on October 18, 2026
+
+  """
+
+  def __init__(self, ports, period = 0.5, telemetrySize = 100000) :
+    import functools
+    import QPTHeartbeat as QPTH
+    import QPTSession as QPTS
+
+    self.telemetry = queue.Queue(maxsize = telemetrySize)
+    self.numDropped = 0
+    self.lock = threading.Lock()
+    self.sessions = {}
+    self.workers = {}
+    self.latency = {}
+
+    opened = []
+    try :
+      for controllerID, port in ports.items() :
+        if(isinstance(port, QPTS.QPTSession)) :
+          session = port
+        else :
+          session = QPTS.QPTSession(port = port)
+          opened.append(session)
+        #End of if-else clause.
+
+        self.sessions[controllerID] = session
+        self.latency[controllerID] = LatencyStats()
+        self.workers[controllerID] = QPTH.Heartbeat(
+          session, period = period,
+          onStatus = functools.partial(self.record, controllerID))
+        self.workers[controllerID].name = 'QPTHeartbeat-' + str(controllerID)
+      #End of for loop - for controllerID, port in ports.items() :
+    except Exception :
+      #Close the ports this fleet opened before the one that failed.
+      for session in opened :
+        session.close()
+      #End of for loop - for session in opened :
+      raise
+    #End of try-except clause.
+
+  def __enter__(self) :
+    self.start()
+    return self
+
+  def __exit__(self, excType, excValue, traceback) :
+    self.stop()
+
+  def start(self) :
+    """Start every worker thread."""
+    for worker in self.workers.values() :
+      worker.start()
+    #End of for loop - for worker in self.workers.values() :
+
+  def stop(self, timeout = None) :
+    """Stop every worker thread and close the serial ports."""
+    for worker in self.workers.values() :
+      worker.stopEvent.set()
+      worker.commands.put(None)
+    #End of for loop - for worker in self.workers.values() :
+
+    for controllerID, worker in self.workers.items() :
+      worker.stop(timeout)
+      self.sessions[controllerID].close()
+    #End of for loop - for controllerID, worker in self.workers.items() :
+
+  def record(self, controllerID, reply) :
+    """Put a reply on the telemetry queue and add its round trip to the latency stats.
+    This runs on the worker thread for controllerID and never blocks."""
+    import time
+
+    #The session only sets lastRoundTrip for replies that came back ACK, so for a NAK
+    #it still holds the time of an earlier exchange.
+    roundTrip = self.sessions[controllerID].lastRoundTrip
+    if(reply.isAck() and (roundTrip is not None)) :
+      self.latency[controllerID].add(roundTrip)
+    #End of if statement.
+
+    try :
+      self.telemetry.put_nowait((controllerID, time.time(), reply))
+    except queue.Full :
+      #Every worker thread can get here.
+      with self.lock :
+        self.numDropped += 1
+      #End of with statement - with self.lock :
+    #End of try-except clause.
+
+  def submit(self, controllerID, Command) :
+    """Queue a command for one controller.  Returns a Future for the reply.  The reply
+    is also put on the telemetry queue."""
+    future = self.workers[controllerID].submit(Command)
+
+    def done(future) :
+      if((not future.cancelled()) and (future.exception() is None) and
+         (future.result() is not None)) :
+        self.record(controllerID, future.result())
+      #End of if statement.
+    #End of the function done.
+
+    future.add_done_callback(done)
+    return future
+
+  def broadcast(self, Command) :
+    """Send the same command to every controller.  Returns a dictionary of controller
+    ID to Future."""
+    return {controllerID : self.submit(controllerID, Command)
+            for controllerID in self.workers}
+
+  def fanOut(self, Commands) :
+    """Send a different command to each controller.  Commands is a dictionary of
+    controller ID to command.  Returns a dictionary of controller ID to Future."""
+    return {controllerID : self.submit(controllerID, Command)
+            for controllerID, Command in Commands.items()}
+
+  def getLatencyReport(self) :
+    """Return a dictionary of controller ID to LatencyStats summary."""
+    return {controllerID : stats.getSummary()
+            for controllerID, stats in self.latency.items()}
+
+#End of the class Fleet.py
+
+#################################################################################
+
+#################################################################################
@@ -12,7 +12,7 @@
 #Set some Control characters.
 #The escape character.  Used for when command data is the same as the one of the
                #ACK, NAK, STX or ETX characters.
-ESC = 0x27
+ESC = 0x1B
 
 #The start of text character.
 STX = 0x2
@@ -24,7 +24,7 @@ ETX = 0x3
 ACK = 0x6
 
 #The not acknowledge character.
-NAK = 0xF
+NAK = 0x15
 
 #This next set of constants are active high.  This means that if the condition exists then the
 #bit is set to 1, otherwise it is set to zero.
@@ -83,6 +83,16 @@ maskOL = 2     #Current Overload.
 maskPRF = 1    #Pan Resolver Fault.
 maskTRF = 1    #Tilt Resolver Fault.
 
+#The number of data bytes the controller sends back for each command.  This does not count
+#the ACK/NAK, the echoed command number, the LRC or the ETX, nor any ESC characters.
+replyDataLength = {0x31 : 7, 0x32 : 7, 0x33 : 7, 0x34 : 7, 0x35 : 7, 0x36 : 7, 0x96 : 1}
+
+#How long(in seconds) to wait for the reply to each command.  At 9600 baud a status reply
+#takes about 12 ms on the wire, the rest is left for the controller to turn around.
+replyTimeout = {0x31 : 0.1, 0x32 : 0.2, 0x33 : 0.2, 0x34 : 0.2, 0x35 : 0.2, 0x36 : 0.2,
+                0x96 : 0.5}
+defaultReplyTimeout = 1.0
+
 #################################################################################
 
 #################################################################################
@@ -306,88 +316,19 @@ def getControllerFlagsStatus(moveType, controllerOutput) :
   
    MODIFICATION HISTORY:
              Written by jdw on October 8, 2021
+             Changed to use the QPTStatus message tables, which also fixes the flag
+             tests that were never true, on October 18, 2026
 
   """
 
-  #This function will pull the flags out of the returned controller output.
-
-  if(moveType == 'Pan') :
-    if(controllerOutput & maskCWSL == 1) :
-      print('The clockwise soft limit for the pan motion is active. ')
-
-    if(controllerOutput & maskCCWSL == 1) :
-      print('The Counter Clockwise soft limit for the pan motion is active. ')
-      
-    if(controllerOutput & maskCWHL == 1) :
-      print('The Clockwise hard limit for the pan motion is active. ')
-      
-    if(controllerOutput & maskCCWHL == 1) :
-      print('The Counter Clockwise hard limit for the pan motion is active. ')
-      
-    if(controllerOutput & maskTO == 1) :
-      print('The Time Out for the pan motion is active. ')
-      
-    if(controllerOutput & maskDE == 1) :
-      print('The Direction Error for the pan motion is active. ')
-      
-    if(controllerOutput & maskOL == 1) :
-      print('The Current Overload for the pan motion is active. ')
-      
-    if(controllerOutput & maskPRF == 1) :
-      print('The Pan Resolver Fault is active. ')
-  #End of if clause - if(moveType == 'Pan')
-  
-  if(moveType == 'Tilt') :
-    if(controllerOutput & maskUSL == 1) :
-      print('The Up soft limit for the tilt motion is active. ')
-      
-    if(controllerOutput & maskDSL == 1) :
-      print('The Down soft limit for the tilt motion is active. ')
-      
-    if(controllerOutput & maskUHL == 1) :
-      print('The Up hard limit for the tilt motion is active. ')
-      
-    if(controllerOutput & maskDHL == 1) :
-      print('The Down hard limit for the tilt motion is active. ')
-      
-    if(controllerOutput & maskTO == 1) :
-      print('The Time Out for the tilt motion is active. ')
-      
-    if(controllerOutput & maskDE == 1) :
-      print('The Direction Error for the tilt motion is active. ')
-      
-    if(controllerOutput & maskOL == 1) :
-      print('The Current Overload for the tilt motion is active. ')
-      
-    if(controllerOutput & maskTRF == 1) :
-      print('The Pan Resolver Fault is active. ')
-  #End of if clause - if(moveType == 'Tilt') :
-  
-  if(moveType == 'Gen') :  #Here Gen is short for general status.
-    if(controllerOutput & maskHRES == 1) :
-      print('The Up soft limit for the tilt motion is active. ')
-      
-    if(controllerOutput & maskEXEC == 1) :
-      print('The controller is executing and command. ')
-      
-    if(controllerOutput & maskDES == 1) :
-      print('The destination of the controller. ')
-      
-    if(controllerOutput & maskOSLR == 1) :
-      print('The Overridden Soft Limit switch is active. ')
-      
-    if(controllerOutput & maskCWM == 1) :
-      print('The Controller is moving in a clockwise motion. ')
-      
-    if(controllerOutput & maskCCWM == 1) :
-      print('The Controller is moving in a counter clockwise motion. ')
-      
-    if(controllerOutput & maskUPM == 1) :
-      print('The Controller is moving in an upward direction. ')
-      
-    if(controllerOutput & maskPRF == 1) :
-      print('The Controller is moving in a downward direction. ')
-  #End of if clause - if(moveType == 'Gen') :
+  import QPTStatus as QPTSt
+
+  #Look up the messages for the flags that are set.
+  messageTables = {'Pan' : QPTSt.panMessageTable, 'Tilt' : QPTSt.tiltMessageTable,
+                   'Gen' : QPTSt.generalMessageTable}  #Here Gen is short for general status.
+  for message in messageTables[moveType][controllerOutput] :
+    print(message)
+  #End of for loop - for message in messageTables[moveType][controllerOutput] :
     
   return
 #End of the function getControllerFlags.py
@@ -395,10 +336,12 @@ def getControllerFlagsStatus(moveType, controllerOutput) :
 
 #################################################################################
 
-def writePanTiltValues(PARAMS, panCoord, tiltCoord) :
+def writePanTiltValues(PARAMS, panCoord, tiltCoord, panStatus = 0, tiltStatus = 0,
+                       genStatus = 0, CommandNumber = 0) :
   """
 
-   NAME:  writePanTiltValues(PARAMS)
+   NAME:  writePanTiltValues(PARAMS, panCoord, tiltCoord, panStatus = 0, tiltStatus = 0,
+                             genStatus = 0, CommandNumber = 0)
            
    PURPOSE:  Write(or append) the controller pointing values(Az and El) to a file.
              
@@ -412,7 +355,10 @@ def writePanTiltValues(PARAMS, panCoord, tiltCoord) :
                panCoord : The pan location of the controller.  This is an integer.
                tiltCoord : The tilt location of the controller.  This is an integer.
   
-   OPTIONAL INPUTS: None
+   OPTIONAL INPUTS:
+               panStatus, tiltStatus, genStatus : The status bytes returned with the
+               coordinates.
+               CommandNumber : The command the controller was answering.
                   
    KEYWORD PARAMETERS: None
                   
@@ -420,7 +366,7 @@ def writePanTiltValues(PARAMS, panCoord, tiltCoord) :
                  
    OPTIONAL OUTPUTS: None
                    
-   SIDE EFFECTS: A file is written.
+   SIDE EFFECTS: A file is written by the telemetry writer thread.
                    
    RESTRICTIONS: None
                    
@@ -428,43 +374,21 @@ def writePanTiltValues(PARAMS, panCoord, tiltCoord) :
   
    MODIFICATION HISTORY:
              Written by jdw on October 8, 2021
+             Changed to queue the row on a buffered QPTTelemetry.TelemetryWriter
+             instead of opening the file for every row on October 18, 2026
+             Changed to write QPTTelemetry.telemetryDtype binary records with the
+             status bytes and command number on October 18, 2026
 
   """
   import time
-  
-  #Get the date and time.
-  timestr = time.localtime()
+  import QPTTelemetry as QPTT
 
-  yearStr = str('{0:02d}'.format(timestr[0]))
-  monthStr = str('{0:02d}'.format(timestr[1]))
-  dayStr = str('{0:02d}'.format(timestr[2]))
-  hourStr = str('{0:02d}'.format(timestr[3]))
-  minuteStr = str('{0:02d}'.format(timestr[4]))
-
-  dateTime = yearStr + monthStr + dayStr + '_' + hourStr + ':' + minuteStr
+  #Hand the record to the telemetry writer.  It keeps the file open and writes the
+  #records from its own thread, so this never waits on the disk.
+  QPTT.getTelemetryWriter(PARAMS, QPTT.BinaryTelemetryWriter).write(
+    (time.monotonic_ns(), time.time_ns(), panCoord, tiltCoord, panStatus, tiltStatus,
+     genStatus, CommandNumber))
 
-  #Generate a filename.
-  filename = PARAMS.saveDir + PARAMS.location + dateTime + '.csv'
-  
-  #Write the data to a file.
-  if(path.exists(filename)) :
-    #Append to the file.
-    with open(filename, mode='a') as f :
-      dataWriter = csv.writer(f, delimiter=',')
-      dataWriter.writerow([datetime, pan, tilt])
-      #End of the for loop - for i in range(len(LST)):
-    #End of the with statement - with open(filename, mode='a') as f :
-
-  else :
-    #Write the file.
-    with open(filename, mode='w') as f :
-      writeDataHandle = csv.writer(f, delimiter=',')
-      writeDataHandle.writerow([latitude, longitude, altitude])
-      writeDataHandle.writerow([datetime, pan, tilt])
-      #End of the for loop - for i in range(len(LST)):
-    #End of the with statement - with open(filename, mode='w') as f :
-  #End of if-else clause.
-  
   return
 
 #End of the function writePanTiltValues.py
@@ -498,7 +422,8 @@ def getLittleEndian(value, nbits) :
                   
    KEYWORD PARAMETERS: None
                   
-   OUTPUTS: The 16 bit 2's complement integer of the input.
+   OUTPUTS: A dictionary holding the escaped low byte list('byte1') and the escaped
+   high byte list('byte2') of the 16 bit 2's complement integer of the input.
                  
    OPTIONAL OUTPUTS:  None
                    
@@ -510,57 +435,22 @@ def getLittleEndian(value, nbits) :
   
    MODIFICATION HISTORY:
              Written by jdw on October 8, 2021
+             Rewritten to use the QPTEncoder lookup tables on October 18, 2026
 
   """
 
-  #Take the integer value and turn it into a hexadecimal value of the proper format.
-  #Here we are dealing with negative values.  This command forces hex() to deal with
-  #the called for(nbits) length otherwise Python will assign infinite precision to
-  #these values which is just confusing and gives wrong results.
-  temphex = hex((value + (1 << nbits)) % (1 << nbits))  #We are moding here so that
-  #we end up with the same number but of the correct size.
-
-  #Turn the hexadecimal number into an integer.
-  tempint = int(temphex, 16)
-
-  #Generate a string that holds the hexadecimal value of the temporary integer.
-  hexnum = hex(tempint)[2:]  #[2:] removes the '0x' part of the representation.
-
-  #Determine the length of the string and find the the number of zeros to pad.
-  numZeros = 4 - len(hexnum)
-  zeropad = numZeros*'0'
+  import QPTEncoder as QPTE
 
-  #Join the zeros to the hexadecimal number.
-  hexnum = zeropad + hexnum
+  #Force the value into the called for(nbits) length.
+  value = int(value) & ((1 << nbits) - 1)
 
-  #Now turn the string into an integer.
-  byte1 = int(hexnum[2] + hexnum[3], 16)
-  byte2 = int(hexnum[0] + hexnum[1], 16)
-
-  #We need to check to see that byte1 and/or byte2 does not match a control
-  #character.
-  ESCAPE = 0x1B
-  byteDict = {'byte1' : [], 'byte2' : []}
-  
-  if((byte1==STX) or (byte1==ETX) or (byte1==ACK) or (byte1==NAK) or (byte1==ESC)) :
-    #The byte is the same as the control character.  We add an escape and flip the
-    #seventh bit.  This will result in two bytes being returned.
-    b1 = [ESCAPE, byte1^0x80]
-    byteDict['byte1'] = b1
-  else :
-    b1 = [byte1] 
-    byteDict['byte1'] = b1
-  
-  if((byte2==STX) or (byte2==ETX) or (byte2==ACK) or (byte2==NAK) or (byte2==ESC)) :
-    #The byte is the same as the control character.  We add an escape and flip the
-    #seventh bit.  This will result in two bytes being returned.
-    b2 = [ESCAPE, byte2^0x80]
-  else :
-    b2 = [byte2] 
-    byteDict['byte2'] = b2
+  #The escaped little endian bytes come straight out of the lookup table built in
+  #QPTEncoder.  Split them back up into the low(byte1) and high(byte2) byte lists.
+  lowByte = QPTE.byteTable[value & 0xFF]
+  highByte = QPTE.byteTable[(value >> 8) & 0xFF]
 
-  #Return a list of the properly ordered integers.
-  return byteDict
+  #Return a dictionary of the properly ordered integers.
+  return {'byte1' : list(lowByte), 'byte2' : list(highByte)}
 
 #End of the function getLittle.py
 #################################################################################
@@ -568,7 +458,7 @@ def getLittleEndian(value, nbits) :
 #################################################################################
 
 #This function will calculate the check sum of all of the sub-commands used in a particular
-#controller command.  The result will be returned as a hexidecimal value.
+#controller command.  The result will be returned as an integer.
 def getCheckSum(Values) :
   """
 
@@ -581,14 +471,15 @@ def getCheckSum(Values) :
    CALLING SEQUENCE:  Called by all functions that send a command to the controller.
   
    INPUTS: 
-           Values : A list of bytes that are components of the command.
+           Values : A list of bytes that are components of the command.  A bytes or
+           bytearray object works as well.
            
    OPTIONAL INPUTS: None
                   
    KEYWORD PARAMETERS: None
                   
    OUTPUTS:  The result of the check sum calculation. This calculation is simply the
-   OR'ing of all of the value items.
+   XOR'ing of all of the value items.
                  
    OPTIONAL OUTPUTS: None
                    
@@ -600,23 +491,17 @@ def getCheckSum(Values) :
   
    MODIFICATION HISTORY:
              Written by jdw on October 9, 2021
+             Changed to plain integer XOR(no NumPy) on October 18, 2026
 
   """
 
-  import numpy as np
-
-  #Find the number of sub-commands to be XORed.
-  n = len(Values)
+  #XOR all of the values together.  Plain Python integers are much faster than
+  #boxing every byte into a NumPy scalar and it keeps NumPy out of the command path.
+  result = 0
+  for value in Values :
+    result ^= value
+  #End of for loop - for value in Values :
 
-  #Get the first value to XOR.  I want to make these values into signed 8-bit integers.
-  result = np.int16(Values[0])
-    
-  #Loop through the remaining values, XORing them to the original result.
-  for i in range(n - 1) :
-    result ^= np.int16(Values[i + 1])
-  #End of for loop; For i in range(n - 1) :
-    
-  #Convert to hexidecimal and return.
   return result
 
 #End of the function getCheckSum.py
@@ -624,6 +509,72 @@ def getCheckSum(Values) :
 
 #################################################################################
 
+class CheckSum :
+  """
+
+   NAME: CheckSum(Values = ())
+
+   PURPOSE:  Keep a running LRC that can be fed one byte(or a few bytes) at a time
+   while a command is being put together, instead of collecting the values into a
+   list and calling getCheckSum at the end.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by any function that builds a command byte by byte.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           Values : Bytes to start the running LRC with.  Defaults to none.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.  The current LRC is held in the LRC attribute.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: lrc = CheckSum([0x33])
+            lrc.add(AzLowByte)
+            lrc.update(ElBytes)
+            Command.append(lrc.LRC)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  __slots__ = ('LRC',)
+
+  def __init__(self, Values = ()) :
+    self.LRC = 0
+    self.update(Values)
+
+  def add(self, value) :
+    """XOR a single byte into the running LRC."""
+    self.LRC ^= value
+
+  def update(self, Values) :
+    """XOR every byte of Values into the running LRC."""
+    result = self.LRC
+    for value in Values :
+      result ^= value
+    #End of for loop - for value in Values :
+    self.LRC = result
+
+  def reset(self) :
+    """Start the running LRC over for the next command."""
+    self.LRC = 0
+
+#End of the class CheckSum.py
+
+#################################################################################
+
+#################################################################################
+
 def sendTimeout(PARAMS, ser, timeLength, Query = 0) :
   """
   
@@ -735,17 +686,17 @@ def getSimpleStatusCommand() :
   
    MODIFICATION HISTORY:
              Written by jdw on October 8, 2021
+             Changed to build the full Get Status/Jog frame with
+             QPTEncoder.getStatusJogFrame on October 18, 2026
 
   """
 
-  simpleStatusCommand = bytearray()
+  import QPTEncoder as QPTE
 
-  simpleStatusCommand.append(STX)
-  simpleStatusCommand.append(0x31)
-  simpleStatusCommand.append(0x31)
-  simpleStatusCommand.append(ETX)
-  
-  return simpleStatusCommand
+  #The Get Status/Jog command always carries the bitset, the two jog speeds and the two
+  #auxiliary bytes, and the LRC covers all of them.  The old 02 31 31 03 frame left them
+  #out, so the controller could NAK it.  All zeros asks for the status without moving.
+  return QPTE.getStatusJogFrame()
 #End of getSimpleStatusCommand.py
 
 #################################################################################
@@ -834,10 +785,10 @@ def sendStop(PARAMS, ser) :
 
 #################################################################################
 
-def sendStatusJog(PARAMS, ser, StatusJogFlags, panJogSpeed, tiltJogSpeed):
+def sendStatusJog(PARAMS, ser, panJogSpeed = None, tiltJogSpeed = None):
   """
 
-   NAME:  sendStatusJog(PARAMS, ser, StatusJogFlags, PanJogSpeed, TiltJogSpeed) 
+   NAME:  sendStatusJog(PARAMS, ser, panJogSpeed = None, tiltJogSpeed = None) 
            
    PURPOSE:  Send a get status/jog command to the controller.  This command can be
    used to determine the controller parameters as well as causing the controller to
@@ -848,101 +799,61 @@ def sendStatusJog(PARAMS, ser, StatusJogFlags, panJogSpeed, tiltJogSpeed):
    CALLING SEQUENCE:  Called by QPT.py
   
    INPUTS:
-           PARAMS : The parameter data class.
+           PARAMS : The parameter data class.  resolverUnits, overrideSoftLimits,
+           stop and reset set the command bits.
            ser : The serial port object. 
-           StatusJogFlags : A set of integer flags used to set machine parameters.
-           panJogSpeed : The value of the pan speed.  This is an integer.
-           tiltJogSpeed : The value of the tilt speed.  This is an integer.
   
-   OPTIONAL INPUTS: None
+   OPTIONAL INPUTS:
+           panJogSpeed : The signed pan speed(-127 to 127).  Defaults to
+           PARAMS.panJogSpeed.
+           tiltJogSpeed : The signed tilt speed(-127 to 127).  Defaults to
+           PARAMS.tiltJogSpeed.
                   
    KEYWORD PARAMETERS: None
                   
-   OUTPUTS: None
+   OUTPUTS: The reply as a QPTDecoder.Frame when ser is a QPTSession, otherwise None.
                  
    OPTIONAL OUTPUTS: None
                    
-   SIDE EFFECTS: The controller may be caused to stop moving.
+   SIDE EFFECTS: The controller may be caused to stop moving.  A jog speed other than
+   0 stops any automated move.
                    
    RESTRICTIONS: None
                    
-   EXAMPLE: sendStatusJog(PARAMS, ser, StatusJogFlags, PanJogSpeed, TiltJogSpeed)
+   EXAMPLE: sendStatusJog(PARAMS, ser, 40, -10)
   
    MODIFICATION HISTORY:
              Written by jdw on October 9, 2021
+             Changed to build the frame with QPTEncoder.getStatusJogFrame, which fixes
+             the command bits and the jog bytes, on October 18, 2026
 
   """
 
+  import QPTEncoder as QPTE
+
   #This function gets the status of the controller and it can also be used to ensure that
   #the controller stays awake.
 
-  #There are four bits that can be set for the command byte.
+  if(panJogSpeed is None) :
+    panJogSpeed = PARAMS.panJogSpeed
+  #End of if statement - if(panJogSpeed is None) :
+  if(tiltJogSpeed is None) :
+    tiltJogSpeed = PARAMS.tiltJogSpeed
+  #End of if statement - if(tiltJogSpeed is None) :
 
-  #If RU = 00000001 then the controller returns resolver units for both pan and tilt instead
-  #of angles.
-  if(PARAMS.resolverUnits) :
-    RU = 1
-  else :
-    RU = 0
-  #End of if-else clause.
-  
-  #If OSL = 00000010 then we override the soft limits during jog.  This could result in
-  #damage to the controller.
-  if(PARAMS.overrideSoftLimits) :
-    OSL = 2
-  else :
-    OSL = 0
-  #End of if-else clause.
+  #There are four bits that can be set for the command byte.  RU returns resolver units
+  #instead of angles, OSL overrides the soft limits during jog(this could result in
+  #damage to the controller), STOP stops the controller until the bit is reset to zero
+  #and RES clears all hard faults.
+  commandBits = ((QPTE.statusJogRU if PARAMS.resolverUnits else 0) |
+                 (QPTE.statusJogOSL if PARAMS.overrideSoftLimits else 0) |
+                 (QPTE.statusJogSTOP if PARAMS.stop else 0) |
+                 (QPTE.statusJogRES if PARAMS.reset else 0))
 
-  #If STOP = 00000100 then the controller stops.  In order for the controller to continue
-  #this bit must be reset to zero.
-  if(PARAMS.stop) :
-    STOP = 4
-  else :
-    STOP = 0
-  #End of if-else clause.
-    
-  #If RES = 00001000 then all hard faults are cleared.
-  if(PARAMS.reset) :
-    RES = 8
-  else :
-    RES = 0
-  #End of if-else clause.
+  #The jog bytes hold the speed in bits 7 through 1 and the direction in bit 0.
+  Command = QPTE.getStatusJogFrame(commandBits, panJogSpeed, tiltJogSpeed)
 
-  #Start text value.
-  STX = 0x2
-
-  #Calculate the pan and tilt integers.
-  nbits = 16
-  panJogCommand = getLittleEndian(panJogSpeed)
-  tiltJogCommand = getLittleEndian(tiltJogSpeed)
-  
-  CommandNumber = 0x31
-  Command = RU + OSL + STOP + RES
-  Aux1Command = 0x0  #This command is not used.
-  Aux2Command = 0x0  #This command is not used.
-  ETX = 0x3
-  
-  #Generate the LRC checksum.  
-  Values = [CommandNumber, Command, panJogCommand[0], panJogCommand[1],
-            tiltJogCommand[0], tiltJogCommand[1]]
-  LRC = getCheckSum(Values)
-
-  #Fill the command array.
-  Command = bytearray()
-  Command.append(STX)
-  Command.append(CommandNumber)
-  Command.append(Command)
-  Command.append(panJogCommand[0])
-  Command.append(panJogCommand[1])
-  Command.append(tiltJogCommand[0])
-  Command.append(tiltJogCommand[1])
-  Command.append(LRC)
-  Command.append(ETX)
-
-  sendCommand(PARAMS, ser, Command)
-
-  return 
+  return sendCommand(PARAMS, ser, Command)
 
 #End of the function sendStatusJog.py
 
@@ -950,10 +861,10 @@ def sendStatusJog(PARAMS, ser, StatusJogFlags, panJogSpeed, tiltJogSpeed):
 
 #################################################################################
 
-def moveToEnteredCoords(PARAMS, ser) :
+def moveToEnteredCoords(PARAMS, ser, limits = None) :
   """
 
-   NAME: moveToEnteredCoords(PARAMS, ser)
+   NAME: moveToEnteredCoords(PARAMS, ser, limits = None)
            
    PURPOSE:  Send a command to the controller to move to a set of entered coordinates.
              
@@ -965,7 +876,9 @@ def moveToEnteredCoords(PARAMS, ser) :
            PARAMS : the parameter data class.
            ser : The serial port object
   
-   OPTIONAL INPUTS: None
+   OPTIONAL INPUTS:
+           limits : A QPTTrajectory.TrajectoryLimits holding the soft limits to check
+           the coordinates against.  Defaults to the controller's range only.
                   
    KEYWORD PARAMETERS: None
                   
@@ -975,15 +888,21 @@ def moveToEnteredCoords(PARAMS, ser) :
                    
    SIDE EFFECTS: The controller moves to the entered coordinates.
                    
-   RESTRICTIONS: None
+   RESTRICTIONS: Raises QPTTrajectory.TrajectoryError if the coordinates are out of
+   range.  The soft limits are not checked if PARAMS.overrideSoftLimits is set.
                    
    EXAMPLE: moveToEnteredCoords(PARAMS, ser)
   
    MODIFICATION HISTORY:
              Written by jdw on October 9, 2021
+             Changed to check the coordinates with QPTTrajectory.validateTrajectory and
+             raise TrajectoryError instead of exiting on October 18, 2026
 
   """
 
+  import QPTEncoder as QPTE
+  import QPTTrajectory as QPTTr
+
   #First multiply the values by 10 in order to get the proper precision.
   Azimuth = PARAMS.Azimuth*10.0
   Elevation = PARAMS.Elevation*10.0
@@ -993,86 +912,15 @@ def moveToEnteredCoords(PARAMS, ser) :
   El = int(Elevation)
 
   #Check to see that the Azimuth and Elevation values are within appropriate ranges.
-  if ((Az > 3600) or (Az < -3600)) :
-    sys.exit('Azimuth range exceeds allowable values.  Exiting')
-  #End of if statement - if ((Az > 3600) or (Az < -3600)) :
+  report = QPTTr.validateTrajectory([Az], [El], limits = limits,
+                                    checkSoftLimits = not PARAMS.overrideSoftLimits)
+  if(not report.isValid()) :
+    raise QPTTr.TrajectoryError(report)
+  #End of if statement - if(not report.isValid()) :
   
-  if ((El > 1800) or (El < -1800)) :
-    sys.exit('Elevation range exceeds allowable values. Exiting')
-  #End of if statement - if((El > 1800) or (El < -1800)) :
-  
-  CommandNumber = 0x33
-    
-  #Convert the Azimuth and Elevation values into 16-bit signed two's-complement little endian
-  #integers.
-  numbits = 16
-  AzBytes = getLittleEndian(Az, numbits)
-  ElBytes = getLittleEndian(El, numbits)
-
-  #Generate the checksum(Longitudinal reduncancy check).
-  Values = [CommandNumber]
-
-  #Set up the command array.
-  Command = bytearray()
-  Command.append(STX)
-  Command.append(CommandNumber)
-
-  if(len(AzBytes['byte1']) == 1) :
-    AzByte10 = AzBytes['byte1'][0]
-    Command.append(AzByte10)
-    Values.append(AzByte10)
-  else :
-    AzByte10 = AzBytes['byte1'][0]
-    AzByte11 = AzBytes['byte1'][1]
-    Command.append(AzByte10)
-    Command.append(AzByte11)
-    Values.append(AzByte10)
-    Values.append(AzByte11)
-  #End of if-else clause.
-  
-  if(len(AzBytes['byte2']) == 1) :
-    AzByte20 = AzBytes['byte2'][0]
-    Command.append(AzByte20)
-    Values.append(AzByte20)
-  else :
-    AzByte20 = AzBytes['byte2'][0]
-    AzByte21 = AzBytes['bytes'][1]
-    Command.append(AzByte20)
-    Command.append(AzByte21)
-    Values.append(AzByte20)
-    Values.append(AzByte21)
-  #End of if-else clause.
-  
-  if(len(ElBytes['byte1']) == 1) :
-    ElByte10 = ElBytes['byte1'][0]
-    Command.append(ElByte10)
-    Values.append(ElByte10)
-  else :
-    ElByte10 = ElBytes['byte1'][0]
-    ElByte11 = ElBytes['byte1'][1]
-    Command.append(ElByte10)
-    Command.append(ElByte11)
-    Values.append(ElByte10)
-    Values.append(ElByte11)
-  #End of if-else clause.
-  
-  if(len(ElBytes['byte2']) == 1) :
-    ElByte20 = ElBytes['byte2'][0]
-    Command.append(ElByte20)
-    Values.append(ElByte20)
-  else :
-    ElByte20 = ElBytes['byte2'][0]
-    ElByte21 = ElBytes['bytes'][1]
-    Command.append(ElByte20)
-    Command.append(ElByte21)
-    Values.append(ElByte20)
-    Values.append(ElByte21)
-  #End of if-else clause.
-
-
-  LRC = getCheckSum(Values)
-  Command.append(LRC)
-  Command.append(ETX)
+  #Build the Move To Entered Coordinates command.  The 16-bit signed two's-complement
+  #little endian bytes, the escapes and the LRC all come from the QPTEncoder tables.
+  Command = QPTE.getPositionFrame(Az, El)
   
   #Send the command to the controller.
   sendCommand(PARAMS, ser, Command)
@@ -1311,6 +1159,114 @@ def readControllerOutput(ser, chunkSize=200):
 
 ###################################################################################
 
+def readResponse(ser, CommandNumber, decoder = None, timing = None) :
+  """
+
+   NAME: readResponse(ser, CommandNumber, decoder = None, timing = None)
+           
+   PURPOSE:  Read the controller's reply to a command.  This returns as soon as the
+   ETX of the reply arrives instead of waiting for the serial port timeout.
+             
+   CATEGORY: Machine Control
+              
+   CALLING SEQUENCE: Called by sendCommand.
+  
+   INPUTS:
+          ser : The serial port object
+          CommandNumber : The number of the command that was sent.  This sets the
+          number of bytes to ask for and how long to wait(see replyDataLength and
+          replyTimeout at the top of this file).
+  
+   OPTIONAL INPUTS:
+          decoder : A QPTDecoder.FrameDecoder.  Pass one in to keep any partial frame
+          between calls.  A new one is made if this is not given.
+          timing : A dictionary.  If this is given the first read asks for a single
+          byte so the time.monotonic() it arrived can be stored in
+          timing['firstByte'], and the number of bytes read is stored in
+          timing['bytesRead'].
+                  
+   KEYWORD PARAMETERS: None
+                  
+   OUTPUTS: The decoded reply as a QPTDecoder.Frame or None if no reply for this
+   command showed up before the deadline.
+                 
+   OPTIONAL OUTPUTS: The timing dictionary is filled in.
+                   
+   SIDE EFFECTS: The serial port timeout is changed while reading and put back
+   afterwards.  Replies to other commands ahead of this one are thrown away and any
+   frames after it are left in the decoder.
+                   
+   RESTRICTIONS: None
+                   
+   EXAMPLE: reply = readResponse(ser, 0x33)
+  
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Added the timing dictionary on October 18, 2026
+
+  """
+
+  import time
+  import QPTDecoder as QPTD
+
+  if(decoder is None) :
+    decoder = QPTD.FrameDecoder()
+  #End of if statement - if(decoder is None) :
+
+  #The shortest reply is the ACK, command number, data, LRC and ETX with nothing escaped.
+  frameLength = 4 + replyDataLength.get(CommandNumber, 0)
+  deadline = time.monotonic() + replyTimeout.get(CommandNumber, defaultReplyTimeout)
+  portTimeout = ser.timeout
+  if(timing is not None) :
+    timing['bytesRead'] = 0
+  #End of if statement - if(timing is not None) :
+
+  try :
+    while(True) :
+      remaining = deadline - time.monotonic()
+      if(remaining <= 0) :
+        return None
+      #End of if statement - if(remaining <= 0) :
+
+      #Ask for the rest of the shortest frame.  ser.read returns as soon as that many
+      #bytes are in, so an unescaped reply comes back in a single read.  Escaped replies
+      #are a byte or two longer and get picked up by the next pass.
+      #Frames left over from an earlier read are used before reading any more.
+      if(len(decoder.pending) > 0) :
+        chunk = b''
+      else :
+        numBytes = max(frameLength - len(decoder.buffer), ser.in_waiting, 1)
+        if((timing is not None) and ('firstByte' not in timing)) :
+          numBytes = 1
+        #End of if statement.
+        ser.timeout = remaining
+        chunk = ser.read(numBytes)
+        if((timing is not None) and (len(chunk) > 0)) :
+          timing['bytesRead'] += len(chunk)
+          if('firstByte' not in timing) :
+            timing['firstByte'] = time.monotonic()
+          #End of if statement - if('firstByte' not in timing) :
+        #End of if statement.
+      #End of if-else clause.
+
+      #Any frames after the reply are kept in the decoder for the next call.
+      frames = decoder.feed(chunk)
+      for i in range(len(frames)) :
+        if(frames[i].command == CommandNumber) :
+          decoder.unread(frames[i + 1:])
+          return frames[i]
+        #End of if statement - if(frames[i].command == CommandNumber) :
+      #End of for loop - for i in range(len(frames)) :
+    #End of while loop - while(True) :
+  finally :
+    ser.timeout = portTimeout
+  #End of try-finally clause.
+
+#End of the function readResponse.py
+###################################################################################
+
+###################################################################################
+
 def parseControllerOutput(PARAMS, bufferOutput) :
 
   """
@@ -1331,7 +1287,8 @@ def parseControllerOutput(PARAMS, bufferOutput) :
                   
    KEYWORD PARAMETERS: None
                   
-   OUTPUTS: None
+   OUTPUTS: A QPTStatus.StatusRecord holding the coordinates and the pan, tilt and
+   general flags, or None if there was no status in the output.
                  
    OPTIONAL OUTPUTS: None
                    
@@ -1340,40 +1297,91 @@ def parseControllerOutput(PARAMS, bufferOutput) :
                    
    RESTRICTIONS: None
                    
-   EXAMPLE: parseBuffer = QPTF.parseControllerOutput(PARAMS, readBufferCoordinates)
+   EXAMPLE: status = QPTF.parseControllerOutput(PARAMS, readBufferCoordinates)
   
    MODIFICATION HISTORY:
              Written by jdw on October 10, 2021
+             Changed to decode the output with QPTDecoder on October 18, 2026
+             Changed to return a QPTStatus.StatusRecord instead of printing the
+             flags on October 18, 2026
+             Moved the status decoding and writing to recordReply on October 18, 2026
 
   """
 
-  breakpoint()
-  #Separate out the various bytes of information returned by the controller.
-  ackByte = bufferOutput[0]
-  Command = bufferOutput[1]
-  panCoord = bufferOutput[2]
-  tiltCoord = bufferOutput[3]
-  panStatus = bufferOutput[4]
-  tiltStatus = bufferOutput[5]
-  genStatus = bufferOutput[6]
-  LRC = bufferOutput[7]
-  ETX = bufferOutput[8]
-  
-  #Check to see if any of the controller Status flags are active.
-  getControllerFlagsStatus('Pan', panStatus)
-  getControllerFlagsStatus('Tilt', tiltStatus)
-  getControllerFlagsStatus('Gen', genStatus)
+  import QPTDecoder as QPTD
 
-  #Write returned pan and tilt values to a file.
-  writePanTiltValues(PARAMS, panCoord, tiltCoord)
+  #Decode the controller output.  This removes any escapes, checks the LRC and skips
+  #anything that is not part of a complete frame.
+  frames = QPTD.FrameDecoder().feed(bufferOutput)
+  if(len(frames) == 0) :
+    return None
+  #End of if statement - if(len(frames) == 0) :
 
-  return
+  #Use the most recent frame.
+  return recordReply(PARAMS, frames[-1])
 
 #End of the function parseControllerOutput.py  
 ###################################################################################
 
 ###################################################################################
 
+def recordReply(PARAMS, reply) :
+
+  """
+
+   NAME:  recordReply(PARAMS, reply)
+           
+   PURPOSE:  Write the position and status in a controller reply to the telemetry file.
+             
+   CATEGORY : Machine Control.
+              
+   CALLING SEQUENCE:  Called by sendCommand, parseControllerOutput and by a QPTSession
+   that has been given PARAMS.
+  
+   INPUTS:
+           PARAMS : The parameter data class.
+           reply : A decoded reply, a QPTDecoder.Frame.
+  
+   OPTIONAL INPUTS: None
+                  
+   KEYWORD PARAMETERS: None
+                  
+   OUTPUTS: A QPTStatus.StatusRecord holding the coordinates and the pan, tilt and
+   general flags, or None if the reply does not carry a status.
+                 
+   OPTIONAL OUTPUTS: None
+                   
+   SIDE EFFECTS: The status is written by the function writePanTiltValues.py.
+                   
+   RESTRICTIONS: None
+                   
+   EXAMPLE: status = QPTF.recordReply(PARAMS, reply)
+  
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import QPTStatus as QPTSt
+
+  #The coordinates are 16-bit signed two's-complement little endian integers and the
+  #status bytes are turned into flags by table lookups.
+  status = QPTSt.decodeStatus(reply)
+  if(status is None) :
+    return None
+  #End of if statement - if(status is None) :
+
+  #Write returned pan and tilt values to a file.
+  writePanTiltValues(PARAMS, status.pan, status.tilt, int(status.panFlags),
+                     int(status.tiltFlags), int(status.generalFlags), status.command)
+
+  return status
+
+#End of the function recordReply.py  
+###################################################################################
+
+###################################################################################
+
 def sendCommand(PARAMS, ser, Command) :
   """
 
@@ -1388,18 +1396,19 @@ def sendCommand(PARAMS, ser, Command) :
   
    INPUTS:
            PARAMS : The parameter data class.
-           ser : The serial port object.
+           ser : The serial port object or a QPTSession.
            Command : The command (byte array) to be sent to the controller.
   
    OPTIONAL INPUTS: None
                   
    KEYWORD PARAMETERS: None
                   
-   OUTPUTS: None
+   OUTPUTS: The reply as a QPTDecoder.Frame when ser is a QPTSession, otherwise None.
                  
    OPTIONAL OUTPUTS: None
                    
-   SIDE EFFECTS:  The controller is sent a command.
+   SIDE EFFECTS:  The controller is sent a command.  The position and status in the
+   reply are written to the telemetry file.
                    
    RESTRICTIONS: None
                    
@@ -1407,63 +1416,60 @@ def sendCommand(PARAMS, ser, Command) :
   
    MODIFICATION HISTORY:
              Written by jdw on October 9, 2021
+             Changed to read with readResponse on October 18, 2026
+             Hands the command to a QPTSession when given one on October 18, 2026
+             Stopped printing the reply, QPTSession keeps timings in QPTMetrics
+             instead, on October 18, 2026
+             Writes the position and status in the reply to the telemetry file
+             with recordReply on October 18, 2026
+             Changed to sync with the full Get Status/Jog frame on October 18, 2026
 
   """
 
-  import binascii
-
-  def readAll(port, chunk_size=200):
-    """Read all characters on the serial port and return them."""
-    if not port.timeout:
-        raise TypeError('Port needs to have a timeout set!')
+  import QPTEncoder as QPTE
+  import QPTSession as QPTS
 
-    read_buffer = b''
-
-    while True:
-        # Read in chunks. Each chunk will wait as long as specified by
-        # timeout. Increase chunk_size to fail quicker
-        byte_chunk = port.read(size=chunk_size)
-        read_buffer += byte_chunk
-        if not len(byte_chunk) == chunk_size:
-            break
-
-    return read_buffer
+  #A session keeps track of whether the controller is synched up, so let it decide
+  #when the sync is needed.  A session that was given PARAMS writes the telemetry itself.
+  if(isinstance(ser, QPTS.QPTSession)) :
+    reply = ser.sendCommand(Command)
+    if((ser.PARAMS is None) and (reply is not None) and reply.isAck()) :
+      recordReply(PARAMS, reply)
+    #End of if statement.
+    return reply
+  #End of if statement - if(isinstance(ser, QPTS.QPTSession)) :
 
   #Set some truth values.
   keepSending = 1
   keepSynching = 1
+  CommandNumber = Command[1]
   
   #Loop to get the server synched with the controller.  Once it is synched then send the
   #command. 
   while(keepSynching) :
 
     #Send the simplest Get Status/Jog command to snych up with the controller.
-    bytesWritten = ser.write(getSimpleStatusCommand())
-    readBuffer1 = readAll(ser, chunk_size = 200)
-    if(len(readBuffer1) != 0) :  #The server has synched up with the controller.
+    bytesWritten = ser.write(QPTE.getStatusJogFrame())
+    statusReply = readResponse(ser, 0x31)
+    if(statusReply is not None) :  #The server has synched up with the controller.
 
       while(keepSending) :
        #The server is snyched up with the controller so lets send the command.
        bytesWritten = ser.write(Command)
-#       readBufferCoordinates = readControllerOutput(ser, chunkSize = 200)
-
-       
-       readBuffer = readAll(ser, chunk_size = 200)
-       lenReadBuffer = len(readBuffer)
-       print('Length of the readBuffer output', lenReadBuffer)
-       print('readBuffer : ',readBuffer)
-       print('What the conroller wrote to the server : ',binascii.hexlify(readBuffer))
-       if(lenReadBuffer != 0) :
-          #Read the information sent from the controller to the server.
-
 
-          #Parse that information and communicate to the user any errors.
-#          parseBuffer = parseControllerOutput(PARAMS, readBufferCoordinates)
+       #Read the information sent from the controller to the server.  This returns as
+       #soon as the reply is complete.
+       reply = readResponse(ser, CommandNumber)
+       if(reply is not None) :
+          #Write the returned position and status to the telemetry file.
+          if(reply.isAck()) :
+            recordReply(PARAMS, reply)
+          #End of if statement - if(reply.isAck()) :
           keepSending = 0
-        #End of if statement - if(len(StatusWritten != 0)
+        #End of if statement - if(reply is not None) :
         
       keepSynching = 0  #Change flag so as to stop the while loop.
-    #End of if statement - if(bytesWritten != 0) :
+    #End of if statement - if(statusReply is not None) :
     
   #End of while statement - while(keepSending) :
 
@@ -1474,6 +1480,58 @@ def sendCommand(PARAMS, ser, Command) :
 
 ###################################################################################
 
+def getPointingFilename(PARAMS) :
+  """
+
+   NAME: getPointingFilename(PARAMS)
+           
+   PURPOSE:  Generate the name of the pointing file for the current minute.
+             
+   CATEGORY: Machine Control
+              
+   CALLING SEQUENCE: Called by readPointing and QPTReadFile.py
+  
+   INPUTS:
+           PARAMS : The parameter data class.  saveDir is used.
+  
+   OPTIONAL INPUTS: None
+                  
+   KEYWORD PARAMETERS: None
+                  
+   OUTPUTS: The absolute path and filename of the pointing file.
+                 
+   OPTIONAL OUTPUTS: None
+                   
+   SIDE EFFECTS: None
+                   
+   RESTRICTIONS: None
+                   
+   EXAMPLE: filename = getPointingFilename(PARAMS)
+  
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+  import time
+
+  #Generate the filename.
+  dirname = PARAMS.saveDir
+  timestr = time.localtime()
+  yearStr = str('{0:02d}'.format(timestr[0]))
+  monthStr = str('{0:02d}'.format(timestr[1]))
+  dayStr = str('{0:02d}'.format(timestr[2]))
+  hourStr = str('{0:02d}'.format(timestr[3]))
+  minuteStr = str('{0:02d}'.format(timestr[4]))
+
+  dateTime = yearStr + monthStr + dayStr + '_' + hourStr + ':' + minuteStr
+
+  return dirname + 'Pointing' + dateTime + '.csv'
+
+#End of the function getPointingFilename.py
+###################################################################################
+
+###################################################################################
+
 def readPointing(PARAMS, ser) :
   
   """
@@ -1509,19 +1567,12 @@ def readPointing(PARAMS, ser) :
 
   """
   import numpy as np
+  import QPTEncoder as QPTE
+  import QPTPipeline as QPTP
+  import QPTSession as QPTS
   
   #Generate the filename.
-  dirname = PARAMS.saveDir
-  timestr = time.localtime()
-  yearStr = str('{0:02d}'.format(timestr[0]))
-  monthStr = str('{0:02d}'.format(timestr[1]))
-  dayStr = str('{0:02d}'.format(timestr[2]))
-  hourStr = str('{0:02d}'.format(timestr[3]))
-  minuteStr = str('{0:02d}'.format(timestr[4]))
-
-  dateTime = yearStr + monthStr + dayStr + '_' + hourStr + ':' + minuteStr
-
-  filename = dirname + 'Pointing' + dateTime + '.csv'
+  filename = getPointingFilename(PARAMS)
 
 
   #Read in the data.
@@ -1530,87 +1581,19 @@ def readPointing(PARAMS, ser) :
   #determine the size of the dataset and the number of its features.
   m, n = pointData.shape
 
-  CommandNumber = 0x33
-  numbits = 16
-  
-  #Loop through the inputs.
-  for i in range(m) :
-    #Convert the Azimuth and Elevation values into 16-bit signed two's-complement little endian
-    #integers.
-    AzBytes = getLittleEndian(PointData[i, 1], numbits)
-    ElBytes = getLittleEndian(PointData[i, 2], numbits)
-
-    #Generate the checksum(Longitudinal reduncancy check).
-    Values = [CommandNumber]
-
-    #Set up the command array.
-    Command = bytearray()
-    Command.append(STX)
-    Command.append(CommandNumber)
-
-    #This next set of commands gets the unknown azimuth position bytes for each of
-    #the two azimuth bytes.
-    if(len(AzBytes['byte1']) == 1) :
-      AzByte10 = AzBytes['byte1'][0]
-      Command.append(AzByte10)
-      Values.append(AzByte10)
-    else :
-      AzByte10 = AzBytes['byte1'][0]
-      AzByte11 = AzBytes['byte1'][1]
-      Command.append(AzByte10)
-      Command.append(AzByte11)
-      Values.append(AzByte10)
-      Values.append(AzByte11)
-    #End of if-else clause.
-  
-    if(len(AzBytes['byte2']) == 1) :
-      AzByte20 = AzBytes['byte2'][0]
-      Command.append(AzByte20)
-      Values.append(AzByte20)
-    else :
-      AzByte20 = AzBytes['byte2'][0]
-      AzByte21 = AzBytes['bytes'][1]
-      Command.append(AzByte20)
-      Command.append(AzByte21)
-      Values.append(AzByte20)
-      Values.append(AzByte21)
-    #End of if-else clause.
-
-    #This next set of commands gets the unknown elevations position bytes for each of
-    #the two elevation bytes.
-    if(len(ElBytes['byte1']) == 1) :
-      ElByte10 = ElBytes['byte1'][0]
-      Command.append(ElByte10)
-      Values.append(ElByte10)
-    else :
-      ElByte10 = ElBytes['byte1'][0]
-      ElByte11 = ElBytes['byte1'][1]
-      Command.append(ElByte10)
-      Command.append(ElByte11)
-      Values.append(ElByte10)
-      Values.append(ElByte11)
-    #End of if-else clause.
-  
-    if(len(ElBytes['byte2']) == 1) :
-      ElByte20 = ElBytes['byte2'][0]
-      Command.append(ElByte20)
-      Values.append(ElByte20)
-    else :
-      ElByte20 = ElBytes['byte2'][0]
-      ElByte21 = ElBytes['bytes'][1]
-      Command.append(ElByte20)
-      Command.append(ElByte21)
-      Values.append(ElByte20)
-      Values.append(ElByte21)
-    #End of if-else clause.
-
-    LRC = getCheckSum(Values)
-    Command.append(LRC)
-    Command.append(ETX)
-  
-    #Send the command to the controller.
-    sendCommand(PARAMS, ser, Command)
-  #End of for loop - for i in range(m) :
+  #Build the Move To Entered Coordinates commands for every point at once.
+  commandBuffer, offsets = QPTE.compileTrajectory(pointData[:, 1], pointData[:, 2])
+
+  #A session can keep several commands in flight at once.  Otherwise send them one
+  #at a time.
+  if(isinstance(ser, QPTS.QPTSession)) :
+    QPTP.CommandPipeline(ser).sendFrames(commandBuffer, offsets)
+  else :
+    #Loop through the inputs.
+    for i in range(m) :
+      #Send the command to the controller.
+      sendCommand(PARAMS, ser, commandBuffer[offsets[i]:offsets[i + 1]])
+  #End of if-else clause.
 
     
   
@@ -1620,10 +1603,12 @@ def readPointing(PARAMS, ser) :
 
 ###################################################################################
 
-def moveToEnteredCoordsFile(PARAMS, ser, filename) :
+def moveToEnteredCoordsFile(PARAMS, ser, filename, limits = None, scheduler = None,
+                            decimation = None, validateFirst = False) :
   """
 
-   NAME: moveToEnteredCoordsFile(PARAMS, ser)
+   NAME: moveToEnteredCoordsFile(PARAMS, ser, filename, limits = None, scheduler = None,
+                                 decimation = None, validateFirst = False)
            
    PURPOSE:  Send a command to the controller to move to a set of coordinates read in
    from a file.
@@ -1639,143 +1624,99 @@ def moveToEnteredCoordsFile(PARAMS, ser, filename) :
            azimuth and elevation coordinates for the planned mission.  The azimuth
            and elevation coordinates will be in degrees.
   
-   OPTIONAL INPUTS: None
+   OPTIONAL INPUTS:
+           limits : A QPTTrajectory.TrajectoryLimits holding the soft limits, largest
+           step and slew rate to check the whole trajectory against.  Defaults to the
+           controller's range only.
+           scheduler : A QPTScheduler.Scheduler.  If this is given each point is sent
+           at the time in the first column of the file instead of as fast as possible.
+           decimation : A dictionary.  If this is given points at the same position as
+           the one before them are not sent, and if it holds maxError the rest are
+           simplified to within that many tenths of a degree(see
+           QPTTrajectory.decimateTrajectory).
+           validateFirst : Set to 1 to check the whole file with
+           QPTTrajectory.validateTrajectoryFile before anything is sent.  This reads
+           and parses the file twice and holds back the first command until the whole
+           file has been read, so it is off by default.
                   
    KEYWORD PARAMETERS: None
                   
-   OUTPUTS: None
+   OUTPUTS: The QPTScheduler.SchedulerStats of the run when a scheduler is given,
+   otherwise None.
                  
-   OPTIONAL OUTPUTS: None
+   OPTIONAL OUTPUTS: The decimation dictionary is filled in with the number of points
+   read, kept and dropped, and framesSaved.
                    
    SIDE EFFECTS: The controller moves to the entered coordinates.
                    
-   RESTRICTIONS: None
+   RESTRICTIONS: Raises QPTTrajectory.TrajectoryError if any point fails the checks.
+   Every block is checked, steps across blocks included, just before it is sent, so
+   by default the blocks ahead of a bad one have already been sent and the head is
+   left part way along the trajectory.  With validateFirst the error, holding the
+   report of every bad row, is raised before anything is sent.  The soft limits are
+   not checked if PARAMS.overrideSoftLimits is set.
                    
    EXAMPLE: moveToEnteredCoordsFile(PARAMS, ser, filename)
   
    MODIFICATION HISTORY:
              Written by jdw on October 17, 2021
+             Changed to read, check and compile the file in blocks with
+             QPTTrajectory.streamTrajectory on October 18, 2026
+             Changed to check the whole file with
+             QPTTrajectory.validateTrajectoryFile before sending on October 18, 2026
+             Added the scheduler to send the points at their times on October 18, 2026
+             Added the decimation on October 18, 2026
+             Changed to keep the decimated points within the limits and check
+             them again before they are sent on October 18, 2026
+             Made the check of the whole file before sending optional with
+             validateFirst on October 18, 2026
 
   """
-  import csv
-  
-  #First read in the file.
-  with open(filename) as csvFile :
-    csvReader = csv.reader(csvFile, delimiter = ',')
-    for row in csvReader :
-      dateTime.append(float(row[0]))
-      Azimuth.append(float(row[1]))
-      Elevation.append(float(row[2]))
-    #End of for loop - for row in csvReader:
-  #End of with statement - with open(filename) as csvFile:
-    
-  #Multiply the values by 10 in order to get the proper precision.
-  Azimuth = 10.0*np.asarray(Azimuth)
-  Elevation = 10.0*np.asarray(Elevation)
-
-  #Now convert the resulting angle coordinates into integers.
-  Az = Azimuth.astype(int)
-  El = Elevation.astype(int)
-
-  #Check to see that the Azimuth and Elevation values are within appropriate ranges.
-  numAzHigh = len(Az[Az > 3600])
-  numAzLow = len(Az[Az< -3600])
-  if(numAzHigh > 0):
-    sys.exit('Azimuth values are too high.  Exiting')
-  #End of if statement - if(numAzHigh > 0) :
-  
-  if(numAzLow > 0) :
-    sys.exit('Azimuth values are too low.  Exiting')
-  #End of if statement - if(numAzLow > 0) :
-
-  numElHigh = len(El[El > 1800])
-  numElLow = len(El[El< -1800])
-  if(numElHigh > 0):
-    sys.exit('Elevation values are too high.  Exiting')
-  #End of if statement - if(numElHigh > 0) :
-
-  if(numElLow > 0) :
-    sys.exit('Elevation values are too low.  Exiting')
-  #End of if statement - if(numElLow > 0) :
-  
-  
-  CommandNumber = 0x33
-  numbits = 16
-  #Now loop through the azimuth and elevation values.
-  for i in range(len(Az)) :
-    
-    #Convert the Azimuth and Elevation values into 16-bit signed two's-complement little endian
-    #integers.
-    AzBytes = getLittleEndian(Az[i], numbits)
-    ElBytes = getLittleEndian(El[i], numbits)
-
-    #Generate the checksum(Longitudinal reduncancy check).
-    Values = [CommandNumber]
-
-    #Set up the command array.
-    Command = bytearray()
-    Command.append(STX)
-    Command.append(CommandNumber)
-
-    if(len(AzBytes['byte1']) == 1) :
-      AzByte10 = AzBytes['byte1'][0]
-      Command.append(AzByte10)
-      Values.append(AzByte10)
-    else :
-      AzByte10 = AzBytes['byte1'][0]
-      AzByte11 = AzBytes['byte1'][1]
-      Command.append(AzByte10)
-      Command.append(AzByte11)
-      Values.append(AzByte10)
-      Values.append(AzByte11)
-    #End of if-else clause.
-  
-    if(len(AzBytes['byte2']) == 1) :
-      AzByte20 = AzBytes['byte2'][0]
-      Command.append(AzByte20)
-      Values.append(AzByte20)
-    else :
-      AzByte20 = AzBytes['byte2'][0]
-      AzByte21 = AzBytes['bytes'][1]
-      Command.append(AzByte20)
-      Command.append(AzByte21)
-      Values.append(AzByte20)
-      Values.append(AzByte21)
-    #End of if-else clause.
-  
-    if(len(ElBytes['byte1']) == 1) :
-      ElByte10 = ElBytes['byte1'][0]
-      Command.append(ElByte10)
-      Values.append(ElByte10)
-    else :
-      ElByte10 = ElBytes['byte1'][0]
-      ElByte11 = ElBytes['byte1'][1]
-      Command.append(ElByte10)
-      Command.append(ElByte11)
-      Values.append(ElByte10)
-      Values.append(ElByte11)
-    #End of if-else clause.
-  
-    if(len(ElBytes['byte2']) == 1) :
-      ElByte20 = ElBytes['byte2'][0]
-      Command.append(ElByte20)
-      Values.append(ElByte20)
-    else :
-      ElByte20 = ElBytes['byte2'][0]
-      ElByte21 = ElBytes['bytes'][1]
-      Command.append(ElByte20)
-      Command.append(ElByte21)
-      Values.append(ElByte20)
-      Values.append(ElByte21)
-    #End of if-else clause.
-
-    LRC = getCheckSum(Values)
-    Command.append(LRC)
-    Command.append(ETX)
-  
-    #Send the command to the controller.
-    sendCommand(PARAMS, ser, Command)
-  #End of for loop - for i in range(len(Az)) :
+  import QPTPipeline as QPTP
+  import QPTSession as QPTS
+  import QPTTrajectory as QPTTr
+
+  #If asked, check every point before anything is sent, so a bad row part way through the
+  #file does not leave the controller half way along the trajectory.
+  checkSoftLimits = not PARAMS.overrideSoftLimits
+  if(validateFirst) :
+    report = QPTTr.validateTrajectoryFile(filename, limits, checkSoftLimits)
+    if(not report.isValid()) :
+      raise QPTTr.TrajectoryError(report)
+    #End of if statement - if(not report.isValid()) :
+  #End of if statement - if(validateFirst) :
+
+  #Read, check and compile the file a block at a time on a background thread, so the
+  #first block goes out while the rest of the file is still being read.  The decimation
+  #keeps the points it needs to stay within the step and slew limits, and the points
+  #that are left are checked against the limits again.
+  with QPTTr.streamTrajectory(filename, decimation = decimation, limits = limits,
+                              checkSoftLimits = checkSoftLimits) as blocks :
+    #Send each point when it is due.  The pipeline is no use here since the points are
+    #spaced out in time.
+    if(scheduler is not None) :
+      return scheduler.run(((block[0], block[4], block[5]) for block in blocks),
+                           lambda Command : sendCommand(PARAMS, ser, Command))
+    #End of if statement - if(scheduler is not None) :
+
+    #A session can keep several commands in flight at once.  Otherwise send them one
+    #at a time.
+    if(isinstance(ser, QPTS.QPTSession)) :
+      pipeline = QPTP.CommandPipeline(ser)
+    #End of if statement - if(isinstance(ser, QPTS.QPTSession)) :
+
+    for dateTime, Az, El, firstRow, commandBuffer, offsets in blocks :
+      if(isinstance(ser, QPTS.QPTSession)) :
+        pipeline.sendFrames(commandBuffer, offsets)
+      else :
+        #Now loop through the azimuth and elevation values.
+        for i in range(len(Az)) :
+          #Send the command to the controller.
+          sendCommand(PARAMS, ser, commandBuffer[offsets[i]:offsets[i + 1]])
+        #End of for loop - for i in range(len(Az)) :
+      #End of if-else clause.
+    #End of for loop.
+  #End of with statement - with QPTTr.streamTrajectory(filename) as blocks :
   
   return
 
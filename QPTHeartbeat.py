@@ -0,0 +1,201 @@
+#This module holds the Heartbeat class.  The heartbeat is a thread that owns the controller's
+#serial port.  It sends a Get Status/Jog command on a fixed period so the controller's
+#communication timeout never trips, decodes every status reply, and sends the commands other
+#threads put in its queue in between the status commands.
+
+import queue
+import threading
+
+#The manual asks that the controller not be refreshed more often than once every 120 ms.
+minimumPeriod = 0.12
+
+#################################################################################
+
+#################################################################################
+
+class Heartbeat(threading.Thread) :
+  """
+
+   NAME: Heartbeat(session, period = 0.5, onStatus = None, metrics = None)
+
+   PURPOSE:  Keep the controller synched up from a background thread while other
+   threads hand it commands to send.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by QPTInterrupt.py.
+
+   INPUTS:
+           session : The QPTSession that owns the serial port.  Nothing else should
+           use the session once the heartbeat has started.
+
+   OPTIONAL INPUTS:
+           period : The time in seconds between status commands.  This is raised to
+           0.12 seconds if it is set any lower.
+           onStatus : A function called as onStatus(reply) with every status reply.
+           It runs on the heartbeat thread so it should be quick.
+           metrics : The QPTMetrics.Metrics that the failed status commands are
+           counted in(as heartbeatErrors).  Defaults to the shared QPTMetrics.metrics.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.  lastStatus holds the last status reply and numHeartbeats,
+   numCommands and numMissed count the status commands, the queued commands and
+   the status commands that got no reply.  numErrors counts the status commands
+   that raised an exception(from the port or from onStatus) and lastError holds the
+   last one.  The thread keeps going after an error.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The thread runs until stop is called.
+
+   RESTRICTIONS: Every write, status command or queued command, waits until at least
+   minimumPeriod seconds after the one before it, as the manual asks.  A burst of
+   queued commands therefore goes out one every minimumPeriod seconds.
+
+   EXAMPLE: heartbeat = Heartbeat(session)
+            heartbeat.start()
+            reply = heartbeat.submit(QPTE.getFrame(0x36)).result()
+            heartbeat.stop()
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Kept the thread going when a status command raises on October 18, 2026
+             Changed to send the full Get Status/Jog frame, to space every write at
+             least minimumPeriod apart and to count the failed status commands in
+             the metrics instead of printing them on October 18, 2026
+
+  """
+
+  def __init__(self, session, period = 0.5, onStatus = None, metrics = None) :
+    import QPTMetrics as QPTM
+
+    threading.Thread.__init__(self, name = 'QPTHeartbeat', daemon = True)
+    self.session = session
+    self.period = max(period, minimumPeriod)
+    self.onStatus = onStatus
+    self.metrics = metrics if metrics is not None else QPTM.metrics
+    self.commands = queue.Queue()
+    self.stopEvent = threading.Event()
+    self.lastStatus = None
+
+    #Counters.
+    self.numHeartbeats = 0
+    self.numCommands = 0
+    self.numMissed = 0
+    self.numErrors = 0
+    self.lastError = None
+
+    #The time.monotonic() of the last write, which every write is spaced from.
+    self.lastWrite = None
+
+  def submit(self, Command) :
+    """Queue a command to be sent.  Returns a concurrent.futures.Future that is set to
+    the reply(or None) once the command has been sent."""
+    import concurrent.futures
+
+    future = concurrent.futures.Future()
+    self.commands.put((Command, future))
+    return future
+
+  def stop(self, timeout = None) :
+    """Stop the thread and wait for it to finish."""
+    self.stopEvent.set()
+    self.commands.put(None)
+    if(self.is_alive()) :
+      self.join(timeout)
+    #End of if statement - if(self.is_alive()) :
+
+  def send(self, Command) :
+    """Wait until minimumPeriod has passed since the last write and send Command.
+    Returns the reply, or None if the heartbeat was stopped while waiting."""
+    import time
+
+    if(self.lastWrite is not None) :
+      if(self.stopEvent.wait(max(0.0, self.lastWrite + minimumPeriod - time.monotonic()))) :
+        return None
+      #End of if statement.
+    #End of if statement - if(self.lastWrite is not None) :
+
+    self.lastWrite = time.monotonic()
+    return self.session.sendCommand(Command)
+
+  def beat(self) :
+    """Send one status command and hand the reply to onStatus."""
+    import QPTEncoder as QPTE
+
+    self.numHeartbeats += 1
+    reply = self.send(QPTE.getStatusJogFrame())
+    if((reply is None) or (not reply.isAck())) :
+      self.numMissed += 1
+      return
+    #End of if statement.
+
+    self.lastStatus = reply
+    if(self.onStatus is not None) :
+      self.onStatus(reply)
+    #End of if statement - if(self.onStatus is not None) :
+
+  def run(self) :
+    import time
+    import QPTEncoder as QPTE
+
+    nextBeat = time.monotonic()
+    while(not self.stopEvent.is_set()) :
+      #Send the status command once the period is up.
+      now = time.monotonic()
+      if(now >= nextBeat) :
+        #A port error or a bad onStatus must not stop the refresh, since then the
+        #controller's communication timeout trips.  Count it and keep going.
+        try :
+          self.beat()
+        except Exception as error :
+          self.numErrors += 1
+          self.lastError = error
+          self.metrics.count('heartbeatErrors', QPTE.statusJogNumber)
+        #End of try-except clause.
+        nextBeat = max(nextBeat + self.period, time.monotonic())
+        continue
+      #End of if statement - if(now >= nextBeat) :
+
+      #Wait for a command until the next status command is due.
+      try :
+        item = self.commands.get(timeout = nextBeat - now)
+      except queue.Empty :
+        continue
+      #End of try-except clause.
+
+      if(item is None) :
+        continue
+      #End of if statement - if(item is None) :
+
+      Command, future = item
+      if(not future.set_running_or_notify_cancel()) :
+        continue
+      #End of if statement.
+
+      try :
+        self.numCommands += 1
+        future.set_result(self.send(Command))
+      except Exception as error :
+        future.set_exception(error)
+      #End of try-except clause.
+    #End of while loop - while(not self.stopEvent.is_set()) :
+
+    #Let anyone still waiting know that their command was never sent.
+    while(True) :
+      try :
+        item = self.commands.get_nowait()
+      except queue.Empty :
+        break
+      #End of try-except clause.
+      if(item is not None) :
+        item[1].cancel()
+      #End of if statement - if(item is not None) :
+    #End of while loop - while(True) :
+
+#End of the class Heartbeat.py
+
+#################################################################################
+
+#################################################################################
@@ -1,17 +1,25 @@
 #! /usr/bin/env python3
 
 
-def chooseCommand(signalNum, stackFrame) :
-    print('Possible Commands are: \n') 
+def chooseCommand(heartbeat, signalNum, stackFrame) :
+    import QPTEncoder as QPTE
+
+    #The heartbeat thread keeps talking to the controller while we wait on the user.
+    print('Possible Commands are: \n')
     print('Get Status Jog')
     print('Move to Entered Coordinates')
     print('Move to Zero Zero')
     print('Move to Delta Coordinates')
     print('Move to Home')
     print('Send Stop')
-    print('Read Pointing')
+    print('Quit')
     Command = input()
 
+    Commands = []
+
+    if(Command.lower() == 'get status jog') :
+        Commands.append(QPTE.getStatusJogFrame())
+
     if(Command.lower() == 'move to entered coordinates') :
 
         print('Enter the Azimuth Coordinates(in degrees).')
@@ -19,20 +27,41 @@ def chooseCommand(signalNum, stackFrame) :
 
         print('Enter the Elevation Coordinates(in degrees).')
         El = int(input())
-        
+
         print('The Azimuth is : ', Az,'The Elevation is : ', El)
-        
+        Commands.append(QPTE.getPositionFrame(Az*10, El*10))
+
+    if(Command.lower() == 'move to zero zero') :
+        Commands.append(QPTE.getFrame(0x35))
+
     if(Command.lower() == 'move to delta coordinates') :
 
         print('Enter the delta Azimuth Coordinate(in degrees)')
         deltaAz = int(input())
-        
+
         print('Enter the delta Elevation Coordinate(in degrees)')
         deltaEl = int(input())
-        
-        print('The delta Azimuth is : ', deltaAz,'The delta Elevation is : ', deltaEl) 
 
-        
+        print('The delta Azimuth is : ', deltaAz,'The delta Elevation is : ', deltaEl)
+        Commands.append(QPTE.getFrame(0x34, (deltaAz*10).to_bytes(2, 'little', signed = True) +
+                                      (deltaEl*10).to_bytes(2, 'little', signed = True)))
+
+    if(Command.lower() == 'move to home') :
+        Commands.append(QPTE.getFrame(0x36))
+
+    if(Command.lower() == 'send stop') :
+        #Set the STOP bit, then clear it again so the controller takes the next command.
+        Commands.append(QPTE.getStatusJogFrame(QPTE.statusJogSTOP))
+        Commands.append(QPTE.getStatusJogFrame())
+
+    if(Command.lower() == 'quit') :
+        heartbeat.stopEvent.set()
+
+    #Queue up the commands.  The heartbeat sends them between its status commands.
+    for Command in Commands :
+        heartbeat.submit(Command)
+
+
 #    print('Signal Number : ', signalNum, 'Frame : ', stackFrame)
 
 
@@ -41,48 +70,54 @@ def main() :
   import signal
   import time
   import argparse
-  import serial
+  import functools
   import QPTFunctions as QPTF
+  import QPTSession as QPTS
+  import QPTHeartbeat as QPTH
   import getParams as gP
 
-  #Set up the serial port parameters.
+  #Set up the serial port.  The session owns the port and keeps track of whether the
+  #controller is synched up.
   port = '/dev/ttyUSB1'
   baud_rate = 9600  #Standard baud rate for the controller.
-  byte_size = serial.EIGHTBITS  #Set the size of the byte to be written.
-  parity = serial.PARITY_NONE #Took this from the manual under the Autobaud section.
   timeout = 1  #Not sure what is the best value for this.  I might want to set this to some
   #floating point value.
 
-  ser = serial.Serial(
-      port = port,
-      baudrate = baud_rate,
-      bytesize = byte_size,
-      parity = parity,
-      timeout = timeout)
- 
+  session = QPTS.QPTSession(port = port, baudRate = baud_rate, timeout = timeout)
+
+  #Fill the PARAMS dataclass.
+  PARAMS = gP.getParams(QPTF.getArgs(argparse.ArgumentParser()))
+  session.PARAMS = PARAMS  #Write the position in every reply to the telemetry file.
+
   #Fill in the Parameter data class values for latitude, longitude and altitude.
   PARAMS.latitude = 38.9983  #Air Force Academy
   PARAMS.longitude = -104.8613  #Air Force Academy
   PARAMS. altitude = 2068.982  #Air Force Academy. Units are meters.  This corresponds to 6788 ft.
 
-  #Set the signal object.  The function chooseCommand is called upon receiving an interrupt. 
-  signal.signal(signal.SIGINT, chooseCommand)
-    
+  #Start the heartbeat.  It sends continuous Get Status commands to the controller so that
+  #it stays synched up with the server/computer, reads every reply, and sends any commands
+  #we give it in between.
+  heartbeat = QPTH.Heartbeat(session, period = 0.5)
+  heartbeat.start()
+
+  #Set the signal object.  The function chooseCommand is called upon receiving an interrupt.
+  signal.signal(signal.SIGINT, functools.partial(chooseCommand, heartbeat))
+
   #Lets start a loop.
-  while(True) :
-      
+  while(heartbeat.is_alive() and not heartbeat.stopEvent.is_set()) :
+
     #Write out a statement that will ask the user to send interrupt to program
     #when a new command is required.
     print('Enter Control-C to send a command to the Controller.')
     time.sleep(0.5)
+  #End of while loop - while(heartbeat.is_alive() and not heartbeat.stopEvent.is_set()) :
+
+  #Stop the heartbeat and close the serial port.
+  heartbeat.stop()
+  session.close()
 
-    #Send continuous Get Status commands to the controller so that it stays
-    #synched up with the server/computer.
-    bytesWritten = ser.write(QPTF.getSimpleStatusCommand())
-  #End of while loop - while(keepGoing):
 
 
-        
 # Standard boilerplate to call the main() function to begin
 # the program.
 if __name__ == '__main__':
@@ -0,0 +1,263 @@
+#This module holds the timing and counter instrumentation for the commands sent to the
+#controller.  QPTSession times each command in phases(the sync, the write, the wait for the
+#first byte of the reply and the wait for the whole reply) and counts the bytes, retries, NAKs,
+#timeouts, failed syncs and failed heartbeats, all by command number.  The numbers can be served as Prometheus
+#text from a small HTTP server on the local machine or written to a file every so often.
+
+import bisect
+import threading
+
+#The upper edges of the latency histogram buckets in seconds.  At 9600 baud one byte takes
+#about 1 ms on the wire, so these run from a single byte to a full reply timeout.
+latencyBuckets = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.015, 0.02, 0.03, 0.05, 0.1, 0.2,
+                  0.5, 1.0)
+
+#The counters, with the help text for each.
+counterHelp = {'commands' : 'Commands written to the controller.',
+               'bytesWritten' : 'Bytes written to the controller.',
+               'bytesRead' : 'Bytes read from the controller.',
+               'retries' : 'Commands sent again after a NAK, timeout or failed sync.',
+               'naks' : 'Replies that were a NAK.',
+               'timeouts' : 'Commands that got no reply before the deadline.',
+               'syncFailures' : 'Syncs that gave up without a reply.',
+               'heartbeatErrors' : 'Heartbeat status commands that raised an error.'}
+
+#The Prometheus name of each counter.
+counterNames = {'commands' : 'qpt_commands_total',
+                'bytesWritten' : 'qpt_bytes_written_total',
+                'bytesRead' : 'qpt_bytes_read_total',
+                'retries' : 'qpt_retries_total',
+                'naks' : 'qpt_naks_total',
+                'timeouts' : 'qpt_timeouts_total',
+                'syncFailures' : 'qpt_sync_failures_total',
+                'heartbeatErrors' : 'qpt_heartbeat_errors_total'}
+
+#################################################################################
+
+#################################################################################
+
+class Histogram :
+  """
+
+   NAME: Histogram(buckets = latencyBuckets)
+
+   PURPOSE:  Count samples into fixed buckets.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by Metrics.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           buckets : The upper edges of the buckets, smallest first.  A last bucket
+           catches everything larger.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Not thread safe by itself.  Metrics holds a lock around it.
+
+   EXAMPLE: histogram = Histogram()
+            histogram.observe(0.012)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+  def __init__(self, buckets = latencyBuckets) :
+    self.buckets = buckets
+    self.counts = [0]*(len(buckets) + 1)
+    self.count = 0
+    self.sum = 0.0
+
+  def observe(self, value) :
+    """Add one sample."""
+    self.counts[bisect.bisect_left(self.buckets, value)] += 1
+    self.count += 1
+    self.sum += value
+
+#End of the class Histogram.py
+
+#################################################################################
+
+#################################################################################
+
+class Metrics :
+  """
+
+   NAME: Metrics(buckets = latencyBuckets)
+
+   PURPOSE:  Keep the phase histograms and the counters for each command number and
+   export them as Prometheus text.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Used by QPTSession.  The module level metrics object is shared
+   by every session that is not given one of its own.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           buckets : The upper edges of the latency buckets in seconds.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: QPTM.metrics.startHTTPServer(9108)
+            print(QPTM.metrics.getPrometheusText())
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self, buckets = latencyBuckets) :
+    self.buckets = buckets
+    self.lock = threading.Lock()
+    self.histograms = {}
+    self.counters = {}
+
+  def observe(self, phase, CommandNumber, seconds) :
+    """Add the time in seconds one phase of a command took."""
+    key = (phase, CommandNumber)
+    with self.lock :
+      histogram = self.histograms.get(key)
+      if(histogram is None) :
+        histogram = self.histograms[key] = Histogram(self.buckets)
+      #End of if statement - if(histogram is None) :
+      histogram.observe(seconds)
+    #End of with statement - with self.lock :
+
+  def count(self, name, CommandNumber, amount = 1) :
+    """Add amount to one of the counters in counterNames."""
+    key = (name, CommandNumber)
+    with self.lock :
+      self.counters[key] = self.counters.get(key, 0) + amount
+    #End of with statement - with self.lock :
+
+  def reset(self) :
+    """Clear every histogram and counter."""
+    with self.lock :
+      self.histograms.clear()
+      self.counters.clear()
+    #End of with statement - with self.lock :
+
+  def getPrometheusText(self) :
+    """Return the histograms and counters in the Prometheus text format."""
+    with self.lock :
+      histograms = sorted((key, list(histogram.counts), histogram.count, histogram.sum)
+                          for key, histogram in self.histograms.items())
+      counters = dict(self.counters)
+    #End of with statement - with self.lock :
+
+    lines = ['# HELP qpt_phase_seconds Time taken by each phase of a command.',
+             '# TYPE qpt_phase_seconds histogram']
+    edges = [repr(float(edge)) for edge in self.buckets] + ['+Inf']
+    for (phase, CommandNumber), counts, count, total in histograms :
+      labels = 'phase="{0}",command="0x{1:02X}"'.format(phase, CommandNumber)
+      cumulative = 0
+      for edge, bucketCount in zip(edges, counts) :
+        cumulative += bucketCount
+        lines.append('qpt_phase_seconds_bucket{{{0},le="{1}"}} {2}'.format(labels, edge,
+                                                                           cumulative))
+      #End of for loop - for edge, bucketCount in zip(edges, counts) :
+      lines.append('qpt_phase_seconds_sum{{{0}}} {1!r}'.format(labels, total))
+      lines.append('qpt_phase_seconds_count{{{0}}} {1}'.format(labels, count))
+    #End of for loop.
+
+    for name, metricName in counterNames.items() :
+      lines.append('# HELP ' + metricName + ' ' + counterHelp[name])
+      lines.append('# TYPE ' + metricName + ' counter')
+      for (counterName, CommandNumber), value in sorted(counters.items()) :
+        if(counterName == name) :
+          lines.append('{0}{{command="0x{1:02X}"}} {2}'.format(metricName, CommandNumber,
+                                                              value))
+        #End of if statement - if(counterName == name) :
+      #End of for loop.
+    #End of for loop - for name, metricName in counterNames.items() :
+
+    return '\n'.join(lines) + '\n'
+
+  def writeFile(self, filename) :
+    """Write the Prometheus text to filename.  The file is replaced in one step so a
+    reader never sees half of it."""
+    import os
+
+    tempFilename = filename + '.tmp'
+    with open(tempFilename, mode = 'w') as f :
+      f.write(self.getPrometheusText())
+    #End of with statement - with open(tempFilename, mode = 'w') as f :
+    os.replace(tempFilename, filename)
+
+  def startFileWriter(self, filename, period = 10.0) :
+    """Write the Prometheus text to filename every period seconds from a background
+    thread, for example into the node exporter's textfile directory.  Returns a
+    threading.Event that stops the thread when it is set."""
+    stopEvent = threading.Event()
+
+    def run() :
+      while(not stopEvent.wait(period)) :
+        self.writeFile(filename)
+      #End of while loop - while(not stopEvent.wait(period)) :
+      self.writeFile(filename)
+    #End of the function run.
+
+    threading.Thread(target = run, name = 'QPTMetricsFile', daemon = True).start()
+    return stopEvent
+
+  def startHTTPServer(self, port = 9108, host = '127.0.0.1') :
+    """Serve the Prometheus text at http://host:port/metrics from a background thread.
+    Returns the server; call its shutdown method to stop it."""
+    import http.server
+
+    metrics = self
+
+    class MetricsHandler(http.server.BaseHTTPRequestHandler) :
+      def do_GET(self) :
+        if(self.path.split('?')[0] not in ('/', '/metrics')) :
+          self.send_error(404)
+          return
+        #End of if statement.
+
+        body = metrics.getPrometheusText().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+      def log_message(self, format, *args) :
+        #Keep the scrapes off of stdout.
+        pass
+    #End of the class MetricsHandler.
+
+    server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target = server.serve_forever, name = 'QPTMetricsHTTP',
+                     daemon = True).start()
+    return server
+
+#End of the class Metrics.py
+
+#################################################################################
+
+#################################################################################
+
+#The metrics shared by every session that is not given its own.
+metrics = Metrics()
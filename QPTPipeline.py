@@ -0,0 +1,219 @@
+#This module holds the CommandPipeline class.  Instead of writing a command and then waiting
+#for its reply before writing the next one, the pipeline keeps a window of commands in flight
+#and matches the replies to the commands in order.  If the controller NAKs a command or a
+#reply goes missing the pipeline drops back to sending one command at a time.
+
+import collections
+
+from QPTFunctions import readResponse, recordReply
+
+#The command number for Move To Entered Coordinates.  The reply to this command echoes the
+#destination coordinates, which lets us check that replies line up with the commands.
+moveToEnteredCoordsNumber = 0x33
+
+#################################################################################
+
+#################################################################################
+
+class CommandPipeline :
+  """
+
+   NAME: CommandPipeline(session, window = 4, maxRetries = 5, minimumGap = None)
+
+   PURPOSE:  Send a sequence of commands with up to window commands in flight at
+   once.  Replies are matched to commands in the order the commands were sent.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by readPointing and moveToEnteredCoordsFile when they
+   are given a QPTSession.
+
+   INPUTS:
+           session : The QPTSession that owns the serial port.
+
+   OPTIONAL INPUTS:
+           window : The largest number of commands in flight.  A window of 1 is the
+           old lockstep behavior.
+           maxRetries : The number of times any one command is resent before the
+           pipeline gives up.
+           minimumGap : The least time in seconds between two writes.  The manual asks
+           that the controller not be refreshed more often than once every 120 ms, so
+           this defaults to QPTHeartbeat.minimumPeriod.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.  numSent, numCompleted, numResent and numFallbacks count
+   the writes, acknowledged commands, resends and drops back to lockstep.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The writes, replies, NAKs, timeouts and resends go into the session's
+   QPTMetrics counters and phase timings the same way QPTSession.exchange keeps them.
+   The first byte and whole reply times run from the write of the command the reply
+   belongs to, so they include the time spent waiting behind the commands ahead of it.
+   If the session was given PARAMS the replies are written to the telemetry file.
+
+   RESTRICTIONS: The window overlaps the wait for each reply with the gap before the
+   next write, it does not send the commands back to back.  Any command other than
+   Get Status/Jog ends a Move To the controller is making, so nothing else should be
+   sent while a trajectory is going out.  Once the pipeline has dropped back to
+   lockstep it stays there for the rest of the run.  The next call to sendFrames starts with the full window.
+
+   EXAMPLE: pipeline = CommandPipeline(session, window = 4)
+            pipeline.sendFrames(commandBuffer, offsets)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Added the QPTMetrics timings and counters and the telemetry on
+             October 18, 2026
+             Added minimumGap so the writes are spaced out as the manual asks on
+             October 18, 2026
+
+  """
+
+  def __init__(self, session, window = 4, maxRetries = 5, minimumGap = None) :
+    import QPTHeartbeat as QPTH
+
+    self.session = session
+    self.window = max(1, int(window))
+    self.maxRetries = maxRetries
+    self.minimumGap = QPTH.minimumPeriod if minimumGap is None else minimumGap
+
+    #Counters.
+    self.numSent = 0
+    self.numCompleted = 0
+    self.numResent = 0
+    self.numFallbacks = 0
+
+  def fallBack(self) :
+    """Drop back to sending one command at a time and resync the controller."""
+    self.numFallbacks += 1
+    self.session.markLost()
+    self.session.ser.reset_input_buffer()
+
+  def waitForGap(self, lastWrite) :
+    """Wait until minimumGap seconds have passed since the time.monotonic() lastWrite."""
+    import time
+
+    if(lastWrite is not None) :
+      time.sleep(max(0.0, lastWrite + self.minimumGap - time.monotonic()))
+    #End of if statement - if(lastWrite is not None) :
+
+  def sendCommands(self, Commands, onReply = None) :
+    """Send every command in the list Commands.  onReply(index, reply) is called for
+    each acknowledged command.  Raises RuntimeError if a command is never acknowledged."""
+    import time
+    import QPTDecoder as QPTD
+
+    session = self.session
+    ser = session.ser
+    decoder = session.decoder
+    metrics = session.metrics
+    window = self.window
+    numCommands = len(Commands)
+    inFlight = collections.deque()
+    retries = collections.Counter()
+    writeTimes = {}
+    nextIndex = 0
+    lastWrite = None
+
+    while((nextIndex < numCommands) or (len(inFlight) > 0)) :
+      #Make sure that the controller is synched up before filling the window.
+      if((len(inFlight) == 0) and session.needsSync()) :
+        self.waitForGap(lastWrite)
+        if(not session.sync()) :
+          raise RuntimeError('Could not sync with the controller.')
+        #End of if statement - if(not session.sync()) :
+        lastWrite = time.monotonic()
+      #End of if statement.
+
+      #Fill the window.
+      while((nextIndex < numCommands) and (len(inFlight) < window)) :
+        Command = Commands[nextIndex]
+        self.waitForGap(lastWrite)
+        startTime = time.monotonic()
+        lastWrite = startTime
+        ser.write(Command)
+        writeTimes[nextIndex] = time.monotonic()
+        metrics.count('commands', Command[1])
+        metrics.count('bytesWritten', Command[1], len(Command))
+        metrics.observe('write', Command[1], writeTimes[nextIndex] - startTime)
+        inFlight.append(nextIndex)
+        nextIndex += 1
+        self.numSent += 1
+      #End of while loop.
+
+      #Read the reply to the oldest command in flight.
+      index = inFlight[0]
+      Command = Commands[index]
+      timing = {}
+      reply = readResponse(ser, Command[1], decoder, timing)
+      replyTime = time.monotonic()
+      metrics.count('bytesRead', Command[1], timing['bytesRead'])
+      if('firstByte' in timing) :
+        metrics.observe('firstByte', Command[1],
+                        max(0.0, timing['firstByte'] - writeTimes[index]))
+      #End of if statement - if('firstByte' in timing) :
+
+      #A move reply echoes the destination, so a reply that does not match means one
+      #of the replies went missing.  Skip this check in lockstep, where the controller
+      #may echo its current position if it has a fault.
+      linedUp = True
+      if((reply is not None) and (window > 1) and (Command[1] == moveToEnteredCoordsNumber)) :
+        sent = QPTD.FrameDecoder().feed(Command)
+        linedUp = (len(sent) == 1) and (reply.data[0:4] == sent[0].data[0:4])
+      #End of if statement.
+
+      if((reply is not None) and reply.isAck() and linedUp) :
+        inFlight.popleft()
+        self.numCompleted += 1
+        metrics.observe('frame', Command[1], replyTime - writeTimes[index])
+        session.synced = True
+        session.lastReplyTime = replyTime
+        if(session.PARAMS is not None) :
+          recordReply(session.PARAMS, reply)
+        #End of if statement - if(session.PARAMS is not None) :
+        if(onReply is not None) :
+          onReply(index, reply)
+        #End of if statement - if(onReply is not None) :
+        continue
+      #End of if statement.
+
+      #The controller NAK'ed or dropped a reply.  Go to lockstep and resend everything
+      #from the oldest command in flight.
+      retries[index] += 1
+      if(retries[index] > self.maxRetries) :
+        raise RuntimeError('Command ' + str(index) + ' was never acknowledged.')
+      #End of if statement - if(retries[index] > self.maxRetries) :
+
+      if(reply is not None and reply.isNak()) :
+        session.numNaks += 1
+        metrics.count('naks', Command[1])
+      else :
+        session.numTimeouts += 1
+        metrics.count('timeouts', Command[1])
+      #End of if-else clause.
+
+      window = 1
+      self.fallBack()
+      self.numResent += nextIndex - index
+      for resent in range(index, nextIndex) :
+        metrics.count('retries', Commands[resent][1])
+      #End of for loop - for resent in range(index, nextIndex) :
+      nextIndex = index
+      inFlight.clear()
+    #End of while loop.
+
+    return
+
+  def sendFrames(self, commandBuffer, offsets, onReply = None) :
+    """Send the frames from QPTEncoder.compileTrajectory.  Frame i is
+    commandBuffer[offsets[i]:offsets[i + 1]]."""
+    Commands = [commandBuffer[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+    self.sendCommands(Commands, onReply)
+
+#End of the class CommandPipeline.py
+
+#################################################################################
+
+#################################################################################
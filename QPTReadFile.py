@@ -8,28 +8,23 @@
 #Gather our code in a main() function.
 def main() :
   import argparse
-  import serial
   import QPTFunctions as QPTF
+  import QPTSession as QPTS
   import getParams as gP
 #  from geopy.geocoders import Nominatim
   
-  #Set up the serial port.
+  #Set up the serial port.  The session owns the port and only resyncs with the
+  #controller when it has to.
   port = '/dev/ttyUSB1'
   baud_rate = 9600  #Standard baud rate for the controller.
-  byte_size = serial.EIGHTBITS  #Set the size of the byte to be written.
-  parity = serial.PARITY_NONE #Took this from the manual under the Autobaud section.
   timeout = 1  #Not sure what is the best value for this.  I might want to set this to some
   #floating point value.
 
-  ser = serial.Serial(
-    port = port,
-    baudrate = baud_rate,
-    bytesize = byte_size,
-    parity = parity,
-    timeout = timeout)
+  session = QPTS.QPTSession(port = port, baudRate = baud_rate, timeout = timeout)
    
   #Fill the PARAMS dataclass.
   PARAMS = gP.getParams(QPTF.getArgs(argparse.ArgumentParser()))
+  session.PARAMS = PARAMS  #Write the position in every reply to the telemetry file.
   
   #Get the latitude and longitude.
 #  locator = Nominatim(user_agent = 'QPT')
@@ -51,11 +46,11 @@ def main() :
 
   #Read in the azimuth and elevation coordinates from a file.
   if(PARAMS.command == 'move to entered coordinates') :
-    QPTF.moveToEnteredCoordsFile(PARAMS, ser)
+    QPTF.moveToEnteredCoordsFile(PARAMS, session, QPTF.getPointingFilename(PARAMS))
   #End of if statement - if(PARAMS.command == 'SendStatusJog') :
     
   #Close the serial port.
-  ser.close()
+  session.close()
   
 # Standard boilerplate to call the main() function to begin
 # the program.
@@ -0,0 +1,617 @@
+#This module points the head at satellites.  The two line element sets(TLEs) are propagated with
+#SGP4 for every satellite and every time at once, using the sgp4 package's SatrecArray, and the
+#TEME positions it returns are turned into azimuth and elevation for the site in PARAMS with
+#NumPy.  The passes over the site are found from the times the elevation crosses a mask, and a
+#pass can be turned into a trajectory and sent to the controller with the scheduler.
+#
+#The sgp4 package is only needed for the propagation.  It is imported inside the functions that
+#use it.
+
+import numpy as np
+
+#The WGS84 ellipsoid, in kilometers.
+earthRadius = 6378.137
+earthFlattening = 1.0/298.257223563
+
+#The Julian date of the Unix epoch.
+unixEpochJD = 2440587.5
+
+#The most satellite times propagated at once, to keep the arrays to a few hundred megabytes.
+maxPropagation = 2000000
+
+#################################################################################
+
+#################################################################################
+
+class SatellitePass :
+  """
+
+   NAME: SatellitePass(name, satIndex, riseTime, setTime, maxTime, maxElevation)
+
+   PURPOSE:  Hold one pass of a satellite over the site.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by findPasses.
+
+   INPUTS:
+           name : The satellite name.
+           satIndex : The satellite's index in the list of TLEs.
+           riseTime, setTime : The Unix times the satellite rises above and sets below
+           the elevation mask.
+           maxTime, maxElevation : The Unix time and elevation in degrees of the
+           highest point of the pass.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: A pass already under way at the start of the search has its riseTime
+   at the start, and one still going at the end has its setTime at the end.
+
+   EXAMPLE: for satPass in findPasses(tles, PARAMS, startTime, 86400.0) :
+              print(satPass)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  __slots__ = ('name', 'satIndex', 'riseTime', 'setTime', 'maxTime', 'maxElevation')
+
+  def __init__(self, name, satIndex, riseTime, setTime, maxTime, maxElevation) :
+    self.name = name
+    self.satIndex = satIndex
+    self.riseTime = riseTime
+    self.setTime = setTime
+    self.maxTime = maxTime
+    self.maxElevation = maxElevation
+
+  def getDuration(self) :
+    """Return the length of the pass in seconds."""
+    return self.setTime - self.riseTime
+
+  def __repr__(self) :
+    return ('SatellitePass({0}, rise={1:.1f}, set={2:.1f}, '
+            'maxElevation={3:.1f})').format(self.name, self.riseTime, self.setTime,
+                                            self.maxElevation)
+
+#End of the class SatellitePass.py
+
+#################################################################################
+
+#################################################################################
+
+def readTLEFile(filename) :
+  """
+
+   NAME: readTLEFile(filename)
+
+   PURPOSE:  Read the two line element sets from a file.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by programs that track satellites.
+
+   INPUTS:
+           filename : The TLE file.  Each set is two lines starting with '1 ' and
+           '2 ', with or without a name line before it, as Celestrak hands them out.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A list of (name, line1, line2) tuples.  Sets without a name line are named
+   after their catalog number.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: tles = readTLEFile('/data/stations.txt')
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  with open(filename) as tleFile :
+    lines = [line.rstrip() for line in tleFile if len(line.strip()) > 0]
+  #End of with statement - with open(filename) as tleFile :
+
+  tles = []
+  name = None
+  i = 0
+  while(i < len(lines)) :
+    if(lines[i].startswith('1 ') and (i + 1 < len(lines)) and lines[i + 1].startswith('2 ')) :
+      if(name is None) :
+        name = lines[i][2:7].strip()
+      #End of if statement - if(name is None) :
+      tles.append((name, lines[i], lines[i + 1]))
+      name = None
+      i += 2
+    else :
+      name = lines[i].strip()
+      i += 1
+    #End of if-else clause.
+  #End of while loop - while(i < len(lines)) :
+
+  return tles
+
+#End of the function readTLEFile.py
+
+#################################################################################
+
+#################################################################################
+
+def getJulianDates(times) :
+  """
+
+   NAME: getJulianDates(times)
+
+   PURPOSE:  Split Unix times into the whole and fractional Julian dates sgp4 takes.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by getLookAngles.
+
+   INPUTS:
+           times : An array of Unix times in seconds.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A list of [jd, fr] arrays.  Keeping the fraction of the day apart keeps
+   the times to well under a millisecond.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: jd, fr = getJulianDates(np.arange(startTime, startTime + 600, 1.0))
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  times = np.asarray(times, dtype = float)
+  days = np.floor(times/86400.0)
+
+  return [unixEpochJD + days, (times - days*86400.0)/86400.0]
+
+#End of the function getJulianDates.py
+
+#################################################################################
+
+#################################################################################
+
+def getGMST(jd, fr) :
+  """
+
+   NAME: getGMST(jd, fr)
+
+   PURPOSE:  Work out the Greenwich mean sidereal angle, the rotation from the TEME
+   frame of SGP4 to the Earth fixed frame.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by getLookAngles.
+
+   INPUTS:
+           jd, fr : Arrays of the whole and fractional Julian dates.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: An array of the angles in radians.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: This is the IAU 1982 model that SGP4 is defined with.  Polar motion
+   is left out, which is far below the controller's 0.1 degree resolution.
+
+   EXAMPLE: gmst = getGMST(jd, fr)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  #Julian centuries from J2000, with the big parts taken off first so the fraction of
+  #the day is not lost.
+  tut1 = ((jd - 2451545.0) + fr)/36525.0
+  seconds = (-6.2e-6*tut1**3 + 0.093104*tut1**2 + (876600.0*3600.0 + 8640184.812866)*tut1 +
+             67310.54841)
+
+  return np.remainder(np.radians(seconds/240.0), 2.0*np.pi)
+
+#End of the function getGMST.py
+
+#################################################################################
+
+#################################################################################
+
+def getSitePosition(latitude, longitude, altitude) :
+  """
+
+   NAME: getSitePosition(latitude, longitude, altitude)
+
+   PURPOSE:  Work out the Earth fixed position of the site.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by getLookAngles.
+
+   INPUTS:
+           latitude, longitude : The geodetic latitude and longitude in degrees.
+           altitude : The height above the WGS84 ellipsoid in meters.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The x, y, z position in kilometers as an array.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: site = getSitePosition(PARAMS.latitude, PARAMS.longitude, PARAMS.altitude)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  phi = np.radians(latitude)
+  lam = np.radians(longitude)
+  height = altitude*1.0e-3
+  e2 = earthFlattening*(2.0 - earthFlattening)
+  N = earthRadius/np.sqrt(1.0 - e2*np.sin(phi)**2)
+
+  return np.array([(N + height)*np.cos(phi)*np.cos(lam),
+                   (N + height)*np.cos(phi)*np.sin(lam),
+                   (N*(1.0 - e2) + height)*np.sin(phi)])
+
+#End of the function getSitePosition.py
+
+#################################################################################
+
+#################################################################################
+
+def getLookAngles(tles, times, PARAMS) :
+  """
+
+   NAME: getLookAngles(tles, times, PARAMS)
+
+   PURPOSE:  Work out the azimuth and elevation of every satellite at every time.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by findPasses and getPassTrajectory.
+
+   INPUTS:
+           tles : A list of (name, line1, line2) tuples, as from readTLEFile.
+           times : An array of Unix times in seconds.
+           PARAMS : The parameter data class.  latitude, longitude(degrees) and
+           altitude(meters) give the site.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A list of [Az, El, distance] arrays, each with a row for each satellite
+   and a column for each time.  The angles are in degrees with the azimuth from 0 to
+   360 clockwise from north, and the distance is in kilometers.  Times SGP4 could not
+   propagate to(a decayed orbit, for instance) are NaN.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Needs the sgp4 package.
+
+   EXAMPLE: Az, El, distance = getLookAngles(tles, times, PARAMS)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  from sgp4.api import Satrec, SatrecArray
+
+  satellites = SatrecArray([Satrec.twoline2rv(line1, line2) for name, line1, line2 in tles])
+  times = np.asarray(times, dtype = float)
+
+  #The rotation from Earth fixed to east, north and up at the site.
+  site = getSitePosition(PARAMS.latitude, PARAMS.longitude, PARAMS.altitude)
+  phi = np.radians(PARAMS.latitude)
+  lam = np.radians(PARAMS.longitude)
+  toENU = np.array([[-np.sin(lam), np.cos(lam), 0.0],
+                    [-np.sin(phi)*np.cos(lam), -np.sin(phi)*np.sin(lam), np.cos(phi)],
+                    [np.cos(phi)*np.cos(lam), np.cos(phi)*np.sin(lam), np.sin(phi)]])
+
+  Az = np.empty((len(tles), len(times)))
+  El = np.empty((len(tles), len(times)))
+  distance = np.empty((len(tles), len(times)))
+
+  #Propagate a run of times at a time so the arrays stay a sensible size.
+  chunk = max(1, maxPropagation//max(1, len(tles)))
+  for start in range(0, len(times), chunk) :
+    stop = min(start + chunk, len(times))
+    jd, fr = getJulianDates(times[start:stop])
+    errors, positions, velocities = satellites.sgp4(jd, fr)
+
+    #Turn the TEME positions into Earth fixed ones by turning them through the sidereal
+    #angle, then take off the site and turn them into east, north and up.
+    gmst = getGMST(jd, fr)
+    cosG = np.cos(gmst)
+    sinG = np.sin(gmst)
+    x = cosG*positions[..., 0] + sinG*positions[..., 1] - site[0]
+    y = -sinG*positions[..., 0] + cosG*positions[..., 1] - site[1]
+    z = positions[..., 2] - site[2]
+
+    east = toENU[0, 0]*x + toENU[0, 1]*y
+    north = toENU[1, 0]*x + toENU[1, 1]*y + toENU[1, 2]*z
+    up = toENU[2, 0]*x + toENU[2, 1]*y + toENU[2, 2]*z
+    horizontal = np.hypot(east, north)
+
+    bad = errors != 0
+    Az[:, start:stop] = np.where(bad, np.nan, np.remainder(np.degrees(np.arctan2(east, north)),
+                                                           360.0))
+    El[:, start:stop] = np.where(bad, np.nan, np.degrees(np.arctan2(up, horizontal)))
+    distance[:, start:stop] = np.where(bad, np.nan, np.hypot(horizontal, up))
+  #End of for loop - for start in range(0, len(times), chunk) :
+
+  return [Az, El, distance]
+
+#End of the function getLookAngles.py
+
+#################################################################################
+
+#################################################################################
+
+def findPasses(tles, PARAMS, startTime, duration = 86400.0, step = 30.0,
+               minElevation = 10.0) :
+  """
+
+   NAME: findPasses(tles, PARAMS, startTime, duration = 86400.0, step = 30.0,
+                    minElevation = 10.0)
+
+   PURPOSE:  Find the passes of the satellites over the site.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by programs that track satellites.
+
+   INPUTS:
+           tles : A list of (name, line1, line2) tuples, as from readTLEFile.
+           PARAMS : The parameter data class, for the site.
+           startTime : The Unix time to start the search at.
+
+   OPTIONAL INPUTS:
+           duration : How long to search in seconds.
+           step : The time in seconds between the positions worked out.  The rise
+           and set times are interpolated between them.  A pass that stays above the
+           mask for less than step seconds can be missed.
+           minElevation : The elevation mask in degrees.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A list of SatellitePass, in order of rise time.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Needs the sgp4 package.
+
+   EXAMPLE: passes = findPasses(readTLEFile('/data/active.txt'), PARAMS, time.time())
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  times = startTime + np.arange(0.0, duration + step, step)
+  Az, El, distance = getLookAngles(tles, times, PARAMS)
+
+  #Find every rise and set at once from where the elevation crosses the mask.  Padding
+  #each row with a step below the mask closes off the passes that are under way at the
+  #start or the end.
+  height = np.nan_to_num(El - minElevation, nan = -1.0)
+  above = height > 0
+  padded = np.zeros((len(tles), len(times) + 2), dtype = bool)
+  padded[:, 1:-1] = above
+  change = np.diff(padded.astype(np.int8), axis = 1)
+  riseSats, riseIndices = np.nonzero(change == 1)
+  setSats, setIndices = np.nonzero(change == -1)
+
+  #A crossing between two steps is put where the straight line between them crosses.
+  #Passes cut off by the start or the end of the search start or end there instead.
+  def getCrossing(sats, before, after) :
+    with np.errstate(divide = 'ignore', invalid = 'ignore') :
+      fraction = height[sats, before]/(height[sats, before] - height[sats, after])
+    #End of with statement.
+    return times[before] + fraction*step
+  #End of the function getCrossing.
+
+  riseTimes = np.where(riseIndices > 0,
+                       getCrossing(riseSats, np.maximum(riseIndices - 1, 0), riseIndices),
+                       times[riseIndices])
+  lastIndices = setIndices - 1
+  setTimes = np.where(setIndices < len(times),
+                      getCrossing(setSats, lastIndices, np.minimum(setIndices, len(times) - 1)),
+                      times[lastIndices])
+
+  passes = []
+  for sat, first, last, riseTime, setTime in zip(riseSats, riseIndices, lastIndices, riseTimes,
+                                                 setTimes) :
+    highest = first + int(np.argmax(El[sat, first:last + 1]))
+    passes.append(SatellitePass(tles[sat][0], int(sat), float(riseTime), float(setTime),
+                                float(times[highest]), float(El[sat, highest])))
+  #End of for loop.
+
+  passes.sort(key = lambda satPass : satPass.riseTime)
+
+  return passes
+
+#End of the function findPasses.py
+
+#################################################################################
+
+#################################################################################
+
+def getPassTrajectory(tle, satPass, PARAMS, step = 1.0, azimuthZero = 0.0) :
+  """
+
+   NAME: getPassTrajectory(tle, satPass, PARAMS, step = 1.0, azimuthZero = 0.0)
+
+   PURPOSE:  Work out the pointing for one pass.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by trackPass.
+
+   INPUTS:
+           tle : The (name, line1, line2) of the satellite.
+           satPass : The SatellitePass.
+           PARAMS : The parameter data class, for the site.
+
+   OPTIONAL INPUTS:
+           step : The time in seconds between points.
+           azimuthZero : The azimuth in degrees that pan 0 points at.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A list of [dateTime, Az, El] arrays, with dateTime the Unix times and the
+   angles in degrees, as in a trajectory file.  The azimuth is unwrapped so the head
+   does not swing all the way round when the pass crosses north, and kept within the
+   controller's range of -360 to 360 degrees.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Needs the sgp4 package.
+
+   EXAMPLE: dateTime, Az, El = getPassTrajectory(tles[satPass.satIndex], satPass, PARAMS)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  dateTime = np.arange(satPass.riseTime, satPass.setTime, step)
+  dateTime = np.append(dateTime, satPass.setTime)
+  Az, El, distance = getLookAngles([tle], dateTime, PARAMS)
+  Az = Az[0] - azimuthZero
+  El = El[0]
+
+  #Unwrap the azimuth and then shift the whole pass by turns so its middle is nearest
+  #to pan 0.
+  Az = np.degrees(np.unwrap(np.radians(Az)))
+  Az -= 360.0*np.round(0.5*(Az.min() + Az.max())/360.0)
+
+  return [dateTime, Az, El]
+
+#End of the function getPassTrajectory.py
+
+#################################################################################
+
+#################################################################################
+
+def trackPass(PARAMS, ser, tle, satPass, step = 1.0, azimuthZero = 0.0, limits = None,
+              scheduler = None) :
+  """
+
+   NAME: trackPass(PARAMS, ser, tle, satPass, step = 1.0, azimuthZero = 0.0,
+                   limits = None, scheduler = None)
+
+   PURPOSE:  Send the pointing for a pass to the controller, each point at its time.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by programs that track satellites.
+
+   INPUTS:
+           PARAMS : The parameter data class.
+           ser : The serial port object or a QPTSession.
+           tle : The (name, line1, line2) of the satellite.
+           satPass : The SatellitePass.
+
+   OPTIONAL INPUTS:
+           step, azimuthZero : As for getPassTrajectory.
+           limits : A QPTTrajectory.TrajectoryLimits to check the pass against.
+           scheduler : A QPTScheduler.Scheduler made with absolute set.  One with the
+           default late point policy is made if this is not given.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The QPTScheduler.SchedulerStats of the run.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The controller follows the pass.  This waits for the pass to start,
+   and points that are already past when it is called are sent late.
+
+   RESTRICTIONS: Raises QPTTrajectory.TrajectoryError if the pass cannot be reached,
+   before anything is sent.  Needs the sgp4 package.
+
+   EXAMPLE: satPass = findPasses(tles, PARAMS, time.time())[0]
+            stats = trackPass(PARAMS, session, tles[satPass.satIndex], satPass)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Changed to round the angles instead of cutting them on
+             October 18, 2026
+
+  """
+
+  import QPTEncoder as QPTE
+  import QPTScheduler as QPTSc
+  import QPTTrajectory as QPTTr
+  from QPTFunctions import sendCommand
+
+  dateTime, Az, El = getPassTrajectory(tle, satPass, PARAMS, step, azimuthZero)
+
+  #Round the angles to the nearest tenth of a degree, the controller's resolution.
+  Az = np.round(10.0*Az).astype(int)
+  El = np.round(10.0*El).astype(int)
+  report = QPTTr.validateTrajectory(Az, El, dateTime, limits,
+                                    checkSoftLimits = not PARAMS.overrideSoftLimits)
+  if(not report.isValid()) :
+    raise QPTTr.TrajectoryError(report)
+  #End of if statement - if(not report.isValid()) :
+
+  if(scheduler is None) :
+    scheduler = QPTSc.Scheduler(absolute = True)
+  #End of if statement - if(scheduler is None) :
+
+  commandBuffer, offsets = QPTE.compileTrajectory(Az, El)
+
+  return scheduler.run([(dateTime, commandBuffer, offsets)],
+                       lambda Command : sendCommand(PARAMS, ser, Command))
+
+#End of the function trackPass.py
+
+#################################################################################
+
+#################################################################################
@@ -0,0 +1,279 @@
+#This module sends the points of a trajectory at the times they are tagged with instead of as
+#fast as the serial link allows.  Every point's send time is worked out from the start of the
+#run with time.monotonic_ns(), so the small errors of each wait never add up.  The scheduler
+#sleeps until shortly before a point is due and spins for the last couple of milliseconds, and
+#it keeps a running correction for how late it wakes up so it can start the send that much
+#earlier.  When the link falls behind a late point policy decides what to do about it, and the
+#lateness of every point is kept so the jitter of each run can be reported.
+
+import threading
+
+#The late point policies.
+#  catchup  : Send the late points one after another as fast as possible until back on time.
+#  skip     : Drop a late point if the point after it is already due as well.
+#  compress : Push the rest of the schedule back by the lateness and then shorten the time
+#             between points by compressFactor until the schedule is back where it should be.
+latePolicies = ('catchup', 'skip', 'compress')
+
+#################################################################################
+
+#################################################################################
+
+class SchedulerStats :
+  """
+
+   NAME: SchedulerStats()
+
+   PURPOSE:  Keep the lateness of every point sent in one run.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by Scheduler.run.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.  numPoints, numSent and numSkipped count the points and
+   lateness holds the time.monotonic_ns() each point was sent less the time it was
+   due, in nanoseconds, for every point sent.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: stats = scheduler.run(blocks, send)
+            print(stats.getSummary())
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self) :
+    self.numPoints = 0
+    self.numSent = 0
+    self.numSkipped = 0
+    self.lateness = []
+    self.elapsed = 0.0
+
+  def getSummary(self, lateTolerance = 0.005) :
+    """Return a dictionary of the point counts and the lateness statistics in
+    milliseconds.  jitter is the standard deviation of the lateness and numLate
+    counts the points sent more than lateTolerance seconds after they were due."""
+    import numpy as np
+
+    summary = {'numPoints' : self.numPoints, 'numSent' : self.numSent,
+               'numSkipped' : self.numSkipped, 'elapsed' : self.elapsed}
+    if(len(self.lateness) == 0) :
+      return summary
+    #End of if statement - if(len(self.lateness) == 0) :
+
+    lateness = np.asarray(self.lateness, dtype = float)*1.0e-6
+    summary['meanLateness'] = float(lateness.mean())
+    summary['medianLateness'] = float(np.median(lateness))
+    summary['p99Lateness'] = float(np.percentile(lateness, 99))
+    summary['maxLateness'] = float(lateness.max())
+    summary['jitter'] = float(lateness.std())
+    summary['numLate'] = int(np.count_nonzero(lateness > lateTolerance*1.0e3))
+
+    return summary
+
+#End of the class SchedulerStats.py
+
+#################################################################################
+
+#################################################################################
+
+class Scheduler :
+  """
+
+   NAME: Scheduler(latePolicy = 'catchup', lateTolerance = 0.005, spinThreshold = 0.002,
+                   compressFactor = 0.5, absolute = False, startDelay = 0.0,
+                   correctionGain = 0.1, maxCorrection = 0.002, clock = None,
+                   sleep = None)
+
+   PURPOSE:  Send the points of a trajectory at their time tags.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Used by moveToEnteredCoordsFile when it is given a scheduler.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           latePolicy : What to do with points that are late, one of latePolicies.
+           lateTolerance : How late in seconds a point can be before the policy
+           steps in.
+           spinThreshold : How long in seconds before a point is due to stop
+           sleeping and spin on the clock.
+           compressFactor : For the compress policy, the fraction of the time between
+           points that is taken off until the schedule has caught up.
+           absolute : If set the time tags are Unix times in seconds and each point is
+           sent at that wall clock time.  Otherwise the time tags are seconds and the
+           first point is sent startDelay seconds after the run starts.
+           startDelay : See absolute.
+           correctionGain, maxCorrection : How quickly the correction for waking up
+           late follows the measured lateness, and the largest it may get in seconds.
+           clock : A function returning the time in nanoseconds, in place of
+           time.monotonic_ns.  With sleep this lets the tests run on a made up clock.
+           sleep : A function called as sleep(seconds) in place of waiting on the stop
+           event.  It returns True if the run should stop.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Raises ValueError for an unknown latePolicy.  The time tags are
+   expected to increase.  The spin keeps one core busy for the last spinThreshold
+   seconds before each point.
+
+   EXAMPLE: scheduler = Scheduler(latePolicy = 'skip')
+            stats = scheduler.run([(dateTime, commandBuffer, offsets)], session.sendCommand)
+            print(stats.getSummary())
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Added the clock and sleep on October 18, 2026
+
+  """
+
+  def __init__(self, latePolicy = 'catchup', lateTolerance = 0.005, spinThreshold = 0.002,
+               compressFactor = 0.5, absolute = False, startDelay = 0.0,
+               correctionGain = 0.1, maxCorrection = 0.002, clock = None, sleep = None) :
+    import time
+
+    if(latePolicy not in latePolicies) :
+      raise ValueError('The late point policy must be one of ' + ', '.join(latePolicies))
+    #End of if statement - if(latePolicy not in latePolicies) :
+
+    self.latePolicy = latePolicy
+    self.lateTolerance = int(lateTolerance*1.0e9)
+    self.spinThreshold = int(spinThreshold*1.0e9)
+    self.compressFactor = compressFactor
+    self.absolute = absolute
+    self.startDelay = int(startDelay*1.0e9)
+    self.correctionGain = correctionGain
+    self.maxCorrection = int(maxCorrection*1.0e9)
+    self.stopEvent = threading.Event()
+    self.clock = clock if clock is not None else time.monotonic_ns
+    self.sleep = sleep if sleep is not None else self.stopEvent.wait
+
+    #How much earlier than the due time to start a send, learned from how late the
+    #earlier sends started.
+    self.correction = 0
+
+  def stop(self) :
+    """Stop a run from another thread.  The point being sent is finished first."""
+    self.stopEvent.set()
+
+  def wait(self, deadline) :
+    """Wait until the clock reaches deadline.  Sleep for most of the time and spin for
+    the last spinThreshold.  Returns False if the run was stopped."""
+    remaining = deadline - self.clock()
+    if(remaining > self.spinThreshold) :
+      if(self.sleep((remaining - self.spinThreshold)*1.0e-9)) :
+        return False
+      #End of if statement.
+    #End of if statement - if(remaining > self.spinThreshold) :
+
+    while(self.clock() < deadline) :
+      pass
+    #End of while loop - while(self.clock() < deadline) :
+
+    return not self.stopEvent.is_set()
+
+  def run(self, blocks, send) :
+    """Send every point of blocks, an iterable of (dateTime, commandBuffer, offsets)
+    with dateTime in seconds and the commands as from QPTEncoder.compileTrajectory.
+    send is called as send(Command) for each point.  Returns the SchedulerStats."""
+    import time
+    import numpy as np
+
+    self.stopEvent.clear()
+    stats = SchedulerStats()
+    runStart = time.perf_counter()
+
+    base = None
+    slip = 0
+    lastNominal = None
+    for dateTime, commandBuffer, offsets in blocks :
+      dateTime = np.asarray(dateTime, dtype = float)
+      if(len(dateTime) == 0) :
+        continue
+      #End of if statement - if(len(dateTime) == 0) :
+
+      #Tie the time tags to the monotonic clock once, on the first point.  Every due time
+      #after that comes from this one reference, so the errors of the waits do not add up.
+      if(base is None) :
+        if(self.absolute) :
+          base = (self.clock() - time.time_ns(), 0.0)
+        else :
+          base = (self.clock() + self.startDelay, float(dateTime[0]))
+        #End of if-else clause.
+      #End of if statement - if(base is None) :
+
+      nominals = (base[0] + np.round((dateTime - base[1])*1.0e9)).astype(np.int64).tolist()
+      stats.numPoints += len(nominals)
+
+      for i, nominal in enumerate(nominals) :
+        if(self.stopEvent.is_set()) :
+          break
+        #End of if statement - if(self.stopEvent.is_set()) :
+
+        #Take some of the slip back out of the time since the last point.
+        if((slip > 0) and (lastNominal is not None)) :
+          slip = max(0, slip - int(self.compressFactor*(nominal - lastNominal)))
+        #End of if statement.
+        lastNominal = nominal
+        due = nominal + slip
+
+        now = self.clock()
+        waited = now < due - self.correction
+        if(waited) :
+          if(not self.wait(due - self.correction)) :
+            break
+          #End of if statement.
+        elif((self.latePolicy == 'skip') and (now - due > self.lateTolerance) and
+             (i + 1 < len(nominals)) and (nominals[i + 1] <= now)) :
+          stats.numSkipped += 1
+          continue
+        #End of if-elif clause.
+
+        sendTime = self.clock()
+        send(commandBuffer[offsets[i]:offsets[i + 1]])
+        stats.numSent += 1
+        stats.lateness.append(sendTime - nominal)
+
+        #Learn how late the waits wake up, only from the points that were waited for.
+        if(waited) :
+          error = sendTime - due
+          self.correction = min(self.maxCorrection,
+                                max(0, self.correction + int(self.correctionGain*error)))
+        elif((self.latePolicy == 'compress') and (sendTime - due > self.lateTolerance)) :
+          slip = sendTime - nominal
+        #End of if-elif clause.
+      #End of for loop - for i, nominal in enumerate(nominals) :
+
+      if(self.stopEvent.is_set()) :
+        break
+      #End of if statement - if(self.stopEvent.is_set()) :
+    #End of for loop - for dateTime, commandBuffer, offsets in blocks :
+
+    stats.elapsed = time.perf_counter() - runStart
+
+    return stats
+
+#End of the class Scheduler.py
+
+#################################################################################
+
+#################################################################################
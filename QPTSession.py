@@ -0,0 +1,232 @@
+#This module holds the QPTSession class.  A session owns the serial port connected to the
+#controller and keeps track of whether the server and the controller are synched up, so
+#that the Get Status/Jog sync only has to be sent when it is actually needed.
+
+from QPTFunctions import readResponse, recordReply
+
+#The command number of the Get Status/Jog command.
+statusCommandNumber = 0x31
+
+#################################################################################
+
+#################################################################################
+
+class QPTSession :
+  """
+
+   NAME: QPTSession(port = '/dev/ttyUSB1', baudRate = 9600, timeout = 1,
+                    controllerTimeout = 1.0, maxRetries = 5, ser = None,
+                    metrics = None, capture = None, PARAMS = None)
+
+   PURPOSE:  Own the serial port connected to the controller and keep track of the
+   sync state.  The controller is only resynched after an error, a NAK, or when
+   nothing has been heard from it for longer than its communication timeout.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by QPT.py, QPTReadFile.py and QPTInterrupt.py and passed
+   to the QPTFunctions command functions in place of the serial port object.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           port : The name of the serial port.
+           baudRate : The baud rate.  9600 is the standard rate for the controller.
+           timeout : The serial port read timeout in seconds.
+           controllerTimeout : The controller's communication timeout in seconds(see
+           command 0x96).  If nothing has been heard from the controller for longer
+           than this the next command is preceded by a sync.
+           maxRetries : The number of times a command is sent before giving up.
+           ser : An already opened serial port object.  If this is given the port
+           settings are ignored.
+           metrics : The QPTMetrics.Metrics that the command timings and counters are
+           kept in.  Defaults to the shared QPTMetrics.metrics.
+           capture : The name of a capture file.  If this is given everything
+           written to and read from the port is recorded in it(see QPTCapture).
+           PARAMS : The parameter data class.  If this is given the position and
+           status in every acknowledged reply are written to the telemetry file(see
+           QPTFunctions.recordReply), whoever sent the command.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The serial port is opened.
+
+   RESTRICTIONS: Only one session should use a port at a time.
+
+   EXAMPLE: with QPTSession('/dev/ttyUSB1') as session :
+              QPTF.moveToHome(PARAMS, session)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Added the QPTMetrics timings and counters on October 18, 2026
+             Added the capture file on October 18, 2026
+             Added PARAMS for writing the telemetry on October 18, 2026
+             Changed to sync with the full Get Status/Jog frame on October 18, 2026
+
+  """
+
+  def __init__(self, port = '/dev/ttyUSB1', baudRate = 9600, timeout = 1,
+               controllerTimeout = 1.0, maxRetries = 5, ser = None, metrics = None,
+               capture = None, PARAMS = None) :
+    import QPTDecoder as QPTD
+    import QPTMetrics as QPTM
+
+    if(ser is None) :
+      import serial
+
+      #Took the byte size and parity from the manual under the Autobaud section.
+      ser = serial.Serial(
+        port = port,
+        baudrate = baudRate,
+        bytesize = serial.EIGHTBITS,
+        parity = serial.PARITY_NONE,
+        timeout = timeout)
+    #End of if statement - if(ser is None) :
+
+    if(capture is not None) :
+      import QPTCapture as QPTC
+      ser = QPTC.CaptureSerial(ser, capture)
+    #End of if statement - if(capture is not None) :
+
+    self.ser = ser
+    self.decoder = QPTD.FrameDecoder()
+    self.controllerTimeout = controllerTimeout
+    self.maxRetries = maxRetries
+    self.metrics = metrics if metrics is not None else QPTM.metrics
+    self.PARAMS = PARAMS
+
+    #The sync state.  lastReplyTime is the time.monotonic() of the last good reply and
+    #lastRoundTrip is the time in seconds from the last write to its reply.
+    self.synced = False
+    self.lastReplyTime = 0.0
+    self.lastRoundTrip = None
+    self.lastStatus = None
+
+    #Counters.
+    self.numSyncs = 0
+    self.numNaks = 0
+    self.numTimeouts = 0
+
+  def __enter__(self) :
+    return self
+
+  def __exit__(self, excType, excValue, traceback) :
+    self.close()
+
+  def close(self) :
+    """Close the serial port."""
+    self.ser.close()
+
+  def needsSync(self) :
+    """Return True if the controller has to be resynched before the next command."""
+    import time
+
+    return((not self.synced) or
+           (time.monotonic() - self.lastReplyTime > self.controllerTimeout))
+
+  def markLost(self) :
+    """Force a resync before the next command."""
+    self.synced = False
+    self.decoder.reset()
+
+  def exchange(self, Command) :
+    """Write one command and read its reply.  The sync state is updated from the reply,
+    the write, first byte and whole reply times go into the metrics and, if PARAMS was
+    given, the position in the reply goes into the telemetry file."""
+    import time
+
+    CommandNumber = Command[1]
+    timing = {}
+    startTime = time.monotonic()
+    self.ser.write(Command)
+    writeTime = time.monotonic()
+    reply = readResponse(self.ser, CommandNumber, self.decoder, timing)
+    replyTime = time.monotonic()
+
+    metrics = self.metrics
+    metrics.count('commands', CommandNumber)
+    metrics.count('bytesWritten', CommandNumber, len(Command))
+    metrics.count('bytesRead', CommandNumber, timing['bytesRead'])
+    metrics.observe('write', CommandNumber, writeTime - startTime)
+    if('firstByte' in timing) :
+      metrics.observe('firstByte', CommandNumber, timing['firstByte'] - writeTime)
+    #End of if statement - if('firstByte' in timing) :
+
+    if(reply is None) :
+      self.numTimeouts += 1
+      metrics.count('timeouts', CommandNumber)
+      self.markLost()
+    elif(reply.isNak()) :
+      self.numNaks += 1
+      metrics.count('naks', CommandNumber)
+      self.markLost()
+    else :
+      metrics.observe('frame', CommandNumber, replyTime - writeTime)
+      self.synced = True
+      self.lastReplyTime = replyTime
+      self.lastRoundTrip = self.lastReplyTime - startTime
+      if(CommandNumber == statusCommandNumber) :
+        self.lastStatus = reply
+      #End of if statement - if(CommandNumber == statusCommandNumber) :
+      if(self.PARAMS is not None) :
+        recordReply(self.PARAMS, reply)
+      #End of if statement - if(self.PARAMS is not None) :
+    #End of if-elif-else clause.
+
+    return reply
+
+  def sync(self) :
+    """Send Get Status/Jog commands until the controller answers.  Returns True if it did."""
+    import QPTEncoder as QPTE
+
+    for attempt in range(self.maxRetries) :
+      self.numSyncs += 1
+      reply = self.exchange(QPTE.getStatusJogFrame())
+      if((reply is not None) and reply.isAck()) :
+        return True
+      #End of if statement.
+    #End of for loop - for attempt in range(self.maxRetries) :
+
+    return False
+
+  def sendCommand(self, Command) :
+    """Send a command, synching first only if needed.  The command is repeated until it
+    is acknowledged or maxRetries is reached.  Returns the last reply as a
+    QPTDecoder.Frame, or None if the controller never answered."""
+    import time
+
+    CommandNumber = Command[1]
+    reply = None
+    for attempt in range(self.maxRetries) :
+      if(attempt > 0) :
+        self.metrics.count('retries', CommandNumber)
+      #End of if statement - if(attempt > 0) :
+
+      #A Get Status/Jog command is a sync all by itself.
+      if((CommandNumber != statusCommandNumber) and self.needsSync()) :
+        syncStart = time.monotonic()
+        synced = self.sync()
+        self.metrics.observe('sync', CommandNumber, time.monotonic() - syncStart)
+        if(not synced) :
+          self.metrics.count('syncFailures', CommandNumber)
+          continue
+        #End of if statement - if(not synced) :
+      #End of if statement.
+
+      reply = self.exchange(Command)
+      if((reply is not None) and reply.isAck()) :
+        return reply
+      #End of if statement.
+    #End of for loop - for attempt in range(self.maxRetries) :
+
+    return reply
+
+#End of the class QPTSession.py
+
+#################################################################################
+
+#################################################################################
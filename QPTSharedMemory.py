@@ -0,0 +1,274 @@
+#This module shares the latest controller status with other processes on the same machine.  The
+#process that owns the serial port writes every decoded status into a ring buffer kept in
+#multiprocessing.shared_memory, and any number of other processes(a display, a tracker, a
+#logger) attach to it by name and read the newest records straight out of the shared memory.
+#
+#There are no locks.  Each slot carries a sequence number that the writer makes odd before it
+#changes the slot and even again once it is done, and the header holds the number of records
+#written so far.  A reader reads the slot's sequence number, the record, and the sequence
+#number again, and only keeps the record if both match the value the slot should have once
+#the record it wants has been written.  So a reader never sees half of a record, and the writer
+#never waits on a reader.
+
+import struct
+
+import numpy as np
+
+from QPTTelemetry import telemetryDtype
+
+#The default name of the shared memory block.
+defaultName = 'qpt_status'
+
+#The header at the start of the shared memory, padded out to 32 bytes.
+ringMagic = b'QPTR'
+ringVersion = 1
+ringHeaderDtype = np.dtype([('magic', 'S4'),
+                            ('version', '<u4'),
+                            ('capacity', '<u8'),
+                            ('sequence', '<u8'),
+                            ('pad', '<u8')])
+
+#One slot: the slot sequence number and a telemetry record, 32 bytes in all.
+slotDtype = np.dtype([('sequence', '<u8'),
+                      ('record', telemetryDtype)])
+
+#The same layouts for struct, which is much quicker than NumPy for a single record.
+sequenceStruct = struct.Struct('<Q')
+recordStruct = struct.Struct('<qqhhBBBB')
+sequenceOffset = ringHeaderDtype.fields['sequence'][1]
+
+#################################################################################
+
+#################################################################################
+
+class StatusRing :
+  """
+
+   NAME: StatusRing(name = defaultName, capacity = None)
+
+   PURPOSE:  A ring buffer of the most recent status records in shared memory, with
+   one writer and any number of readers.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made with a capacity by the process that owns the serial port,
+   which is the only one that writes to it.  Made without a capacity by the readers,
+   which attach to the ring that is already there.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           name : The name of the shared memory block.
+           capacity : The number of records to keep.  If this is given a new ring is
+           made, otherwise the existing ring called name is attached to.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The writer makes the shared memory block and should call unlink when
+   it is done with it.  Raises FileExistsError if a ring with this name is already
+   there, or FileNotFoundError when attaching to one that is not.
+
+   RESTRICTIONS: Only one process, and one thread in it, may write.  The sequence
+   numbers are 8 byte aligned so they are read and written in one piece, and the
+   slot is checked after the record is read, which relies on the stores being seen
+   in order as they are on x86-64.
+
+   EXAMPLE: ring = StatusRing(capacity = 1024)           #In the port owner.
+            heartbeat = QPTH.Heartbeat(session, onStatus = ring.feedFrame)
+
+            ring = StatusRing()                          #In the display.
+            monotonicTime, wallTime, pan, tilt = ring.getLatest()[:4]
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self, name = defaultName, capacity = None) :
+    from multiprocessing import shared_memory
+
+    self.isWriter = capacity is not None
+    if(self.isWriter) :
+      size = ringHeaderDtype.itemsize + capacity*slotDtype.itemsize
+      self.sharedMemory = shared_memory.SharedMemory(name = name, create = True, size = size)
+    else :
+      self.sharedMemory = attachSharedMemory(name)
+    #End of if-else clause.
+
+    self.header = np.ndarray(1, dtype = ringHeaderDtype, buffer = self.sharedMemory.buf)
+    if(self.isWriter) :
+      self.header[0] = (ringMagic, ringVersion, capacity, 0, 0)
+    elif((self.header['magic'][0] != ringMagic) or (self.header['version'][0] != ringVersion)) :
+      self.close()
+      raise ValueError(name + ' is not a status ring.')
+    #End of if-elif clause.
+
+    self.capacity = int(self.header['capacity'][0])
+    self.buffer = self.sharedMemory.buf
+    self.slots = np.ndarray(self.capacity, dtype = slotDtype, buffer = self.buffer,
+                            offset = ringHeaderDtype.itemsize)
+
+    #The writer keeps its own count so it never has to read the shared memory.
+    self.numWritten = 0
+
+  def __enter__(self) :
+    return self
+
+  def __exit__(self, excType, excValue, traceback) :
+    self.close()
+    if(self.isWriter) :
+      self.unlink()
+    #End of if statement - if(self.isWriter) :
+
+  def write(self, monotonicTime, wallTime, pan, tilt, panStatus, tiltStatus, genStatus,
+            CommandNumber) :
+    """Add one record in the order of the QPTTelemetry.telemetryDtype fields."""
+    n = self.numWritten
+    offset = ringHeaderDtype.itemsize + (n % self.capacity)*slotDtype.itemsize
+
+    #Odd while the slot is being changed, then even with the record number in it.
+    sequenceStruct.pack_into(self.buffer, offset, 2*n + 1)
+    recordStruct.pack_into(self.buffer, offset + sequenceStruct.size, monotonicTime,
+                           wallTime, pan, tilt, panStatus, tiltStatus, genStatus,
+                           CommandNumber)
+    sequenceStruct.pack_into(self.buffer, offset, 2*n + 2)
+    self.numWritten = n + 1
+    sequenceStruct.pack_into(self.buffer, sequenceOffset, n + 1)
+
+  def writeStatus(self, status) :
+    """Add a QPTStatus.StatusRecord."""
+    import time
+
+    self.write(time.monotonic_ns(), time.time_ns(), status.pan, status.tilt,
+               int(status.panFlags), int(status.tiltFlags), int(status.generalFlags),
+               status.command)
+
+  def feedFrame(self, frame) :
+    """Decode a QPTDecoder.Frame and add its status.  Frames without a status are
+    ignored.  This can be used as the Heartbeat onStatus function."""
+    import QPTStatus as QPTSt
+
+    status = QPTSt.decodeStatus(frame)
+    if(status is not None) :
+      self.writeStatus(status)
+    #End of if statement - if(status is not None) :
+
+  def getSequence(self) :
+    """Return the number of records written so far.  A reader can poll this to see
+    whether anything new has come in."""
+    return sequenceStruct.unpack_from(self.buffer, sequenceOffset)[0]
+
+  def getLatest(self, maxTries = 10) :
+    """Return the newest record as a tuple in the order of the telemetryDtype fields,
+    or None if nothing has been written yet."""
+    buffer = self.buffer
+    for attempt in range(maxTries) :
+      numWritten = sequenceStruct.unpack_from(buffer, sequenceOffset)[0]
+      if(numWritten == 0) :
+        return None
+      #End of if statement - if(numWritten == 0) :
+
+      slot = (numWritten - 1) % self.capacity
+      offset = ringHeaderDtype.itemsize + slot*slotDtype.itemsize
+      before = sequenceStruct.unpack_from(buffer, offset)[0]
+      record = recordStruct.unpack_from(buffer, offset + sequenceStruct.size)
+      after = sequenceStruct.unpack_from(buffer, offset)[0]
+      if(before == after == 2*numWritten) :
+        return record
+      #End of if statement - if(before == after == 2*numWritten) :
+    #End of for loop - for attempt in range(maxTries) :
+
+    return None
+
+  def getRecent(self, count) :
+    """Return a copy of up to count of the newest records, oldest first.  Records the
+    writer was changing while they were read are left out."""
+    numWritten = self.getSequence()
+    recordNumbers = np.arange(max(0, numWritten - min(count, self.capacity)), numWritten,
+                              dtype = np.uint64)
+    slots = (recordNumbers % self.capacity).astype(np.intp)
+
+    before = self.slots['sequence'][slots]
+    records = self.slots['record'][slots]
+    after = self.slots['sequence'][slots]
+    good = (before == after) & (before == 2*recordNumbers + 2)
+
+    return records[good]
+
+  def close(self) :
+    """Let go of the shared memory."""
+    self.header = self.slots = self.buffer = None
+    self.sharedMemory.close()
+
+  def unlink(self) :
+    """Remove the shared memory block.  Only the writer should call this."""
+    self.sharedMemory.unlink()
+
+#End of the class StatusRing.py
+
+#################################################################################
+
+#################################################################################
+
+def attachSharedMemory(name) :
+  """
+
+   NAME: attachSharedMemory(name)
+
+   PURPOSE:  Attach to a shared memory block made by another process without taking
+   ownership of it.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by StatusRing.
+
+   INPUTS:
+           name : The name of the shared memory block.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The multiprocessing.shared_memory.SharedMemory.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: sharedMemory = attachSharedMemory('qpt_status')
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  from multiprocessing import shared_memory
+
+  #Before Python 3.13 every process that attached to a block registered it with the
+  #resource tracker, which removed the block when that process exited.  Keep the reader
+  #from registering it at all.
+  try :
+    return shared_memory.SharedMemory(name = name, track = False)
+  except TypeError :
+    from multiprocessing import resource_tracker
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype : None
+    try :
+      return shared_memory.SharedMemory(name = name)
+    finally :
+      resource_tracker.register = register
+    #End of try-finally clause.
+  #End of try-except clause.
+
+#End of the function attachSharedMemory.py
+
+#################################################################################
+
+#################################################################################
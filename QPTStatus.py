@@ -0,0 +1,270 @@
+#This module decodes the status part of a controller reply: the pan and tilt coordinates and
+#the pan, tilt and general status bytes.  Each status byte is turned into a set of flags by
+#looking it up in a 256 entry table that is filled in once, when the module is imported, so
+#decoding a reply is a struct unpack and three table lookups.
+
+import enum
+import struct
+
+from QPTFunctions import maskCWSL, maskCCWSL, maskCWHL, maskCCWHL
+from QPTFunctions import maskUSL, maskDSL, maskUHL, maskDHL
+from QPTFunctions import maskHRES, maskEXEC, maskDES, maskOSLR
+from QPTFunctions import maskCWM, maskCCWM, maskUPM, maskDWNM
+from QPTFunctions import maskTO, maskDE, maskOL, maskPRF, maskTRF
+
+#The status data: pan and tilt as 16-bit signed little endian integers followed by the pan,
+#tilt and general status bytes.
+statusStruct = struct.Struct('<hhBBB')
+
+#################################################################################
+
+#################################################################################
+
+class PanFlag(enum.IntFlag) :
+  """The pan status bits."""
+  CWSL = maskCWSL    #Clockwise Soft Limit.
+  CCWSL = maskCCWSL  #Counter Clockwise Soft Limit.
+  CWHL = maskCWHL    #Clockwise Hard Limit.
+  CCWHL = maskCCWHL  #Counter Clockwise Hard Limit.
+  TO = maskTO        #Time Out.
+  DE = maskDE        #Direction Error.
+  OL = maskOL        #Current Overload.
+  PRF = maskPRF      #Pan Resolver Fault.
+
+class TiltFlag(enum.IntFlag) :
+  """The tilt status bits."""
+  USL = maskUSL  #Up Soft Limit.
+  DSL = maskDSL  #Down Soft Limit.
+  UHL = maskUHL  #Up Hard Limit.
+  DHL = maskDHL  #Down Hard Limit.
+  TO = maskTO    #Time Out.
+  DE = maskDE    #Direction Error.
+  OL = maskOL    #Current Overload.
+  TRF = maskTRF  #Tilt Resolver Fault.
+
+class GeneralFlag(enum.IntFlag) :
+  """The general status bits."""
+  HRES = maskHRES  #High Resolution.
+  EXEC = maskEXEC  #Executing command.
+  DES = maskDES    #The coordinates are the destination, not the current position.
+  OSLR = maskOSLR  #Overridden Soft Limit.
+  CWM = maskCWM    #Clockwise motion.
+  CCWM = maskCCWM  #Counter Clockwise motion.
+  UPM = maskUPM    #Upward motion.
+  DWNM = maskDWNM  #Downward motion.
+
+#The hard faults.  The controller will not move that axis again until it is sent a reset.
+panFaults = PanFlag.CWHL | PanFlag.CCWHL | PanFlag.TO | PanFlag.DE | PanFlag.OL | PanFlag.PRF
+tiltFaults = TiltFlag.UHL | TiltFlag.DHL | TiltFlag.TO | TiltFlag.DE | TiltFlag.OL | TiltFlag.TRF
+
+#The message for each flag.  These are kept in one dictionary per status byte since flags
+#from different bytes with the same bit compare equal.
+panMessages = {
+  PanFlag.CWSL : 'The clockwise soft limit for the pan motion is active.',
+  PanFlag.CCWSL : 'The Counter Clockwise soft limit for the pan motion is active.',
+  PanFlag.CWHL : 'The Clockwise hard limit for the pan motion is active.',
+  PanFlag.CCWHL : 'The Counter Clockwise hard limit for the pan motion is active.',
+  PanFlag.TO : 'The Time Out for the pan motion is active.',
+  PanFlag.DE : 'The Direction Error for the pan motion is active.',
+  PanFlag.OL : 'The Current Overload for the pan motion is active.',
+  PanFlag.PRF : 'The Pan Resolver Fault is active.'}
+tiltMessages = {
+  TiltFlag.USL : 'The Up soft limit for the tilt motion is active.',
+  TiltFlag.DSL : 'The Down soft limit for the tilt motion is active.',
+  TiltFlag.UHL : 'The Up hard limit for the tilt motion is active.',
+  TiltFlag.DHL : 'The Down hard limit for the tilt motion is active.',
+  TiltFlag.TO : 'The Time Out for the tilt motion is active.',
+  TiltFlag.DE : 'The Direction Error for the tilt motion is active.',
+  TiltFlag.OL : 'The Current Overload for the tilt motion is active.',
+  TiltFlag.TRF : 'The Tilt Resolver Fault is active.'}
+generalMessages = {
+  GeneralFlag.HRES : 'The controller is in high resolution mode.',
+  GeneralFlag.EXEC : 'The controller is executing a command.',
+  GeneralFlag.DES : 'The coordinates returned are the destination coordinates.',
+  GeneralFlag.OSLR : 'The Overridden Soft Limit switch is active.',
+  GeneralFlag.CWM : 'The Controller is moving in a clockwise motion.',
+  GeneralFlag.CCWM : 'The Controller is moving in a counter clockwise motion.',
+  GeneralFlag.UPM : 'The Controller is moving in an upward direction.',
+  GeneralFlag.DWNM : 'The Controller is moving in a downward direction.'}
+
+#################################################################################
+
+#################################################################################
+
+def buildFlagTable(flagClass, messages) :
+  """
+
+   NAME: buildFlagTable(flagClass, messages)
+
+   PURPOSE:  Build the tables that turn a status byte into its flags and messages.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called once when this module is imported.
+
+   INPUTS:
+           flagClass : PanFlag, TiltFlag or GeneralFlag.
+           messages : The dictionary of flag to message for flagClass.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: [flagTable, messageTable] where flagTable[byte] is the flagClass value for
+   byte and messageTable[byte] is a tuple of the messages for the bits set in byte,
+   highest bit first.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: panFlagTable, panMessageTable = buildFlagTable(PanFlag, panMessages)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  flagTable = tuple(flagClass(byte) for byte in range(256))
+  messageTable = tuple(tuple(messages[flag] for flag in flagClass if byte & flag)
+                       for byte in range(256))
+
+  return [flagTable, messageTable]
+
+#End of the function buildFlagTable.py
+
+#################################################################################
+
+#################################################################################
+
+panFlagTable, panMessageTable = buildFlagTable(PanFlag, panMessages)
+tiltFlagTable, tiltMessageTable = buildFlagTable(TiltFlag, tiltMessages)
+generalFlagTable, generalMessageTable = buildFlagTable(GeneralFlag, generalMessages)
+
+#################################################################################
+
+#################################################################################
+
+class StatusRecord :
+  """
+
+   NAME: StatusRecord(command, pan, tilt, panFlags, tiltFlags, generalFlags)
+
+   PURPOSE:  Hold one decoded status reply.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by decodeStatus.
+
+   INPUTS:
+           command : The command number the controller was answering.
+           pan, tilt : The coordinates in controller units(tenths of a degree).
+           panFlags : The PanFlag value of the pan status byte.
+           tiltFlags : The TiltFlag value of the tilt status byte.
+           generalFlags : The GeneralFlag value of the general status byte.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: if(PanFlag.OL in status.panFlags) :
+              sendReset()
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  __slots__ = ('command', 'pan', 'tilt', 'panFlags', 'tiltFlags', 'generalFlags')
+
+  def __init__(self, command, pan, tilt, panFlags, tiltFlags, generalFlags) :
+    self.command = command
+    self.pan = pan
+    self.tilt = tilt
+    self.panFlags = panFlags
+    self.tiltFlags = tiltFlags
+    self.generalFlags = generalFlags
+
+  def hasFault(self) :
+    """Return True if either axis has a hard fault that needs a reset."""
+    return bool((self.panFlags & panFaults) or (self.tiltFlags & tiltFaults))
+
+  def isMoving(self) :
+    """Return True if the controller is moving either axis."""
+    return bool(self.generalFlags & (GeneralFlag.CWM | GeneralFlag.CCWM |
+                                     GeneralFlag.UPM | GeneralFlag.DWNM))
+
+  def getMessages(self) :
+    """Return a tuple of the messages for every flag that is set."""
+    return (panMessageTable[self.panFlags] + tiltMessageTable[self.tiltFlags] +
+            generalMessageTable[self.generalFlags])
+
+  def __repr__(self) :
+    return ('StatusRecord(command=0x{0:02X}, pan={1}, tilt={2}, panFlags={3!r}, '
+            'tiltFlags={4!r}, generalFlags={5!r})').format(
+              self.command, self.pan, self.tilt, self.panFlags, self.tiltFlags,
+              self.generalFlags)
+
+#End of the class StatusRecord.py
+
+#################################################################################
+
+#################################################################################
+
+def decodeStatus(frame) :
+  """
+
+   NAME: decodeStatus(frame)
+
+   PURPOSE:  Decode the status data of a controller reply.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by parseControllerOutput.
+
+   INPUTS:
+           frame : A QPTDecoder.Frame read from the controller.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A StatusRecord, or None if the frame is a NAK or has no status data.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: status = decodeStatus(reply)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  if(frame.isNak() or (len(frame.data) < statusStruct.size)) :
+    return None
+  #End of if statement.
+
+  pan, tilt, panStatus, tiltStatus, genStatus = statusStruct.unpack_from(frame.data)
+
+  return StatusRecord(frame.command, pan, tilt, panFlagTable[panStatus],
+                      tiltFlagTable[tiltStatus], generalFlagTable[genStatus])
+
+#End of the function decodeStatus.py
+
+#################################################################################
+
+#################################################################################
@@ -0,0 +1,1071 @@
+#This module writes the controller telemetry(pointing values) to disk.  The file is kept open
+#and the rows are buffered and written by a background thread, so the thread talking to the
+#controller only ever drops a row into a queue and never waits on the disk.  Telemetry can be
+#written as CSV or as fixed width binary records that are read back with np.memmap.
+
+import queue
+import threading
+
+import numpy as np
+
+#One binary telemetry record.  The times are integer nanoseconds from time.monotonic_ns and
+#time.time_ns, the coordinates are in controller units(tenths of a degree) and the status
+#bytes are copied as they come back from the controller.
+telemetryDtype = np.dtype([('monotonicTime', '<i8'),
+                           ('wallTime', '<i8'),
+                           ('pan', '<i2'),
+                           ('tilt', '<i2'),
+                           ('panStatus', 'u1'),
+                           ('tiltStatus', 'u1'),
+                           ('generalStatus', 'u1'),
+                           ('command', 'u1')])
+
+#Every binary telemetry file has an index file next to it(.qpti in place of .qpt) that
+#holds one entry for each block of records: the smallest and largest wall clock time in the
+#block, the number of the first record and the number of records.  The writer closes a block
+#every indexBlockRecords records and when it closes the file.
+indexDtype = np.dtype([('minTime', '<i8'),
+                       ('maxTime', '<i8'),
+                       ('start', '<i8'),
+                       ('count', '<i8')])
+indexBlockRecords = 4096
+
+#The 64 byte header at the start of every binary telemetry file.
+telemetryMagic = b'QPTT'
+telemetryVersion = 1
+headerDtype = np.dtype([('magic', 'S4'),
+                        ('version', '<u2'),
+                        ('recordSize', '<u2'),
+                        ('latitude', '<f8'),
+                        ('longitude', '<f8'),
+                        ('altitude', '<f8'),
+                        ('startTime', '<i8'),
+                        ('location', 'S24')])
+
+#################################################################################
+
+#################################################################################
+
+def getTelemetryFilename(PARAMS, extension = '.csv', timeFormat = '%Y%m%d_%H:%M') :
+  """
+
+   NAME: getTelemetryFilename(PARAMS, extension = '.csv', timeFormat = '%Y%m%d_%H:%M')
+
+   PURPOSE:  Build the telemetry filename from the save directory, the location and
+   the current date and time.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by TelemetryWriter.
+
+   INPUTS:
+           PARAMS : The parameter data class.
+
+   OPTIONAL INPUTS:
+           extension : The file extension.
+           timeFormat : The time.strftime format of the date and time part.  The
+           default starts a new file every minute.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The filename as a string.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: filename = getTelemetryFilename(PARAMS)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import time
+
+  #Get the date and time.
+  dateTime = time.strftime(timeFormat, time.localtime())
+
+  return PARAMS.saveDir + PARAMS.location + dateTime + extension
+
+#End of the function getTelemetryFilename.py
+
+#################################################################################
+
+#################################################################################
+
+class TelemetryWriter(threading.Thread) :
+  """
+
+   NAME: TelemetryWriter(PARAMS, filename = None, maxQueue = 10000, flushRows = 500,
+                         flushInterval = 1.0)
+
+   PURPOSE:  Write telemetry rows to a CSV file from a background thread.  The file
+   stays open and rows are written in batches once flushRows rows have built up or
+   flushInterval seconds have gone by, whichever comes first.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by writePanTiltValues through getTelemetryWriter.
+
+   INPUTS:
+           PARAMS : The parameter data class.  saveDir, location, latitude,
+           longitude and altitude are used.
+
+   OPTIONAL INPUTS:
+           filename : The file to write.  Defaults to getTelemetryFilename(PARAMS),
+           in which case a new file is started every minute.
+           maxQueue : The most rows that can be waiting to be written.  Rows written
+           while the queue is full are dropped(and counted in numDropped) rather
+           than holding up the caller.
+           flushRows : The number of rows to collect before writing them out.
+           flushInterval : The longest time in seconds a row waits to be written.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: A file is written.  A new file starts with a latitude, longitude
+   and altitude header row.
+
+   RESTRICTIONS: If the file cannot be opened or written the error is printed once
+   and kept in error, and the thread carries on dropping(and counting) the rows so
+   the callers are never held up and no new writer is started for every row.
+
+   EXAMPLE: writer = TelemetryWriter(PARAMS)
+            writer.start()
+            writer.write([dateTime, pan, tilt])
+            writer.close()
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Kept the thread going after a file error on October 18, 2026
+
+  """
+
+  def __init__(self, PARAMS, filename = None, maxQueue = 10000, flushRows = 500,
+               flushInterval = 1.0) :
+    threading.Thread.__init__(self, name = 'QPTTelemetryWriter', daemon = True)
+    self.PARAMS = PARAMS
+    self.rollOver = filename is None
+    self.filename = filename if filename is not None else self.getFilename()
+    self.rows = queue.Queue(maxsize = maxQueue)
+    self.flushRows = flushRows
+    self.flushInterval = flushInterval
+    self.stopEvent = threading.Event()
+
+    #Counters.
+    self.numWritten = 0
+    self.numDropped = 0
+
+    #The error that stopped the writing, if any.
+    self.error = None
+
+  def write(self, row) :
+    """Queue one row to be written.  This never blocks.  Returns False if the row was
+    dropped because the queue is full."""
+    try :
+      self.rows.put_nowait(row)
+    except queue.Full :
+      self.numDropped += 1
+      return False
+    #End of try-except clause.
+
+    return True
+
+  def close(self, timeout = None) :
+    """Write out everything still queued, close the file and stop the thread."""
+    self.stopEvent.set()
+    if(self.is_alive()) :
+      self.join(timeout)
+    #End of if statement - if(self.is_alive()) :
+
+  def getFilename(self) :
+    """Return the name of the file the next rows belong in."""
+    return getTelemetryFilename(self.PARAMS)
+
+  def openFile(self, filename) :
+    """Open filename for appending, writing the site header row if it is a new file."""
+    import csv
+    import os
+
+    newFile = not os.path.exists(filename)
+    f = open(filename, mode = 'a', newline = '')
+    self.dataWriter = csv.writer(f, delimiter = ',')
+    if(newFile) :
+      self.dataWriter.writerow([self.PARAMS.latitude, self.PARAMS.longitude,
+                                self.PARAMS.altitude])
+    #End of if statement - if(newFile) :
+
+    return f
+
+  def closeFile(self, f) :
+    """Close the open file."""
+    f.close()
+
+  def writeBatch(self, f, batch) :
+    """Write a list of rows to the open file."""
+    self.dataWriter.writerows(batch)
+
+  def run(self) :
+    import traceback
+
+    try :
+      self.writeRows()
+    except Exception as error :
+      self.error = error
+      traceback.print_exc()
+      self.discardRows()
+    #End of try-except clause.
+
+  def discardRows(self) :
+    """Throw away and count the rows until the writer is closed."""
+    while(not self.stopEvent.is_set()) :
+      try :
+        self.rows.get(timeout = 0.1)
+        self.numDropped += 1
+      except queue.Empty :
+        pass
+      #End of try-except clause.
+    #End of while loop - while(not self.stopEvent.is_set()) :
+
+    while(True) :
+      try :
+        self.rows.get_nowait()
+        self.numDropped += 1
+      except queue.Empty :
+        break
+      #End of try-except clause.
+    #End of while loop - while(True) :
+
+  def writeRows(self) :
+    """Write the queued rows out in batches until the writer is closed."""
+    import time
+
+    f = self.openFile(self.filename)
+    try :
+      batch = []
+      flushTime = time.monotonic() + self.flushInterval
+      while(True) :
+        stopping = self.stopEvent.is_set()
+
+        #Collect rows until the batch is full or it is time to flush.
+        try :
+          batch.append(self.rows.get(timeout = max(0.0, min(flushTime - time.monotonic(),
+                                                            0.1))))
+        except queue.Empty :
+          pass
+        #End of try-except clause.
+
+        if((len(batch) >= self.flushRows) or (time.monotonic() >= flushTime) or stopping) :
+          #Pick up anything else already waiting so it goes out in the same write.
+          while(True) :
+            try :
+              batch.append(self.rows.get_nowait())
+            except queue.Empty :
+              break
+            #End of try-except clause.
+          #End of while loop - while(True) :
+
+          if(len(batch) > 0) :
+            #Start a new file when the date and time part of the name changes.
+            if(self.rollOver) :
+              filename = self.getFilename()
+              if(filename != self.filename) :
+                self.closeFile(f)
+                self.filename = filename
+                f = self.openFile(filename)
+              #End of if statement - if(filename != self.filename) :
+            #End of if statement - if(self.rollOver) :
+
+            self.writeBatch(f, batch)
+            f.flush()
+            self.numWritten += len(batch)
+            batch = []
+          #End of if statement - if(len(batch) > 0) :
+          flushTime = time.monotonic() + self.flushInterval
+
+          if(stopping) :
+            break
+          #End of if statement - if(stopping) :
+        #End of if statement.
+      #End of while loop - while(True) :
+    finally :
+      self.closeFile(f)
+    #End of try-finally clause.
+
+#End of the class TelemetryWriter.py
+
+#################################################################################
+
+#################################################################################
+
+class BinaryTelemetryWriter(TelemetryWriter) :
+  """
+
+   NAME: BinaryTelemetryWriter(PARAMS, filename = None, maxQueue = 10000,
+                               flushRows = 500, flushInterval = 1.0)
+
+   PURPOSE:  Write telemetry as fixed width telemetryDtype records from a background
+   thread.  This works like TelemetryWriter except that each row is a tuple in the
+   order of the telemetryDtype fields and the file starts with a headerDtype header.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by writePanTiltValues through getTelemetryWriter.
+
+   INPUTS:
+           PARAMS : The parameter data class.  saveDir, location, latitude,
+           longitude and altitude are used.
+
+   OPTIONAL INPUTS:
+           filename : The file to write.  Defaults to a .qpt file named by
+           getTelemetryFilename(PARAMS), in which case a new file is started
+           every day.
+           maxQueue, flushRows, flushInterval : As for TelemetryWriter.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The telemetry file and its index file are written.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: writer = BinaryTelemetryWriter(PARAMS)
+            writer.start()
+            writer.write((time.monotonic_ns(), time.time_ns(), pan, tilt, panStatus,
+                          tiltStatus, genStatus, 0x31))
+            writer.close()
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def getFilename(self) :
+    """Return the name of the file the next records belong in."""
+    return getTelemetryFilename(self.PARAMS, extension = '.qpt', timeFormat = '%Y%m%d')
+
+  def openFile(self, filename) :
+    """Open filename for appending, writing the header if it is a new file.  A record
+    left half written by a crash is cut off so the records stay aligned."""
+    import os
+    import time
+
+    f = open(filename, mode = 'ab')
+    size = f.seek(0, os.SEEK_END)
+    if(size < headerDtype.itemsize) :
+      f.truncate(0)
+      header = np.zeros(1, dtype = headerDtype)
+      header['magic'] = telemetryMagic
+      header['version'] = telemetryVersion
+      header['recordSize'] = telemetryDtype.itemsize
+      header['latitude'] = self.PARAMS.latitude
+      header['longitude'] = self.PARAMS.longitude
+      header['altitude'] = self.PARAMS.altitude
+      header['startTime'] = time.time_ns()
+      header['location'] = str(self.PARAMS.location).encode()[:headerDtype['location'].itemsize]
+      f.write(header.tobytes())
+    else :
+      extra = (size - headerDtype.itemsize) % telemetryDtype.itemsize
+      if(extra != 0) :
+        f.truncate(size - extra)
+      #End of if statement - if(extra != 0) :
+    #End of if-else clause.
+    f.flush()
+
+    #Pick up the index where it left off.  Records written after the last index entry
+    #(by a writer that did not get to close the file) start the open block.
+    blocks = buildTelemetryIndex(filename, onlyIfStale = True)
+    if(len(blocks) > 0) :
+      self.blockStart = int(blocks['start'][-1] + blocks['count'][-1])
+    else :
+      self.blockStart = 0
+    #End of if-else clause.
+    times = readTelemetry(filename)[1]['wallTime'][self.blockStart:]
+    self.blockCount = len(times)
+    self.blockMin = int(times.min()) if len(times) > 0 else 0
+    self.blockMax = int(times.max()) if len(times) > 0 else 0
+    self.indexFile = open(getIndexFilename(filename), mode = 'ab')
+
+    return f
+
+  def closeFile(self, f) :
+    """Index the open block and close the file and its index file."""
+    f.close()
+    self.closeBlock()
+    self.indexFile.close()
+
+  def closeBlock(self) :
+    """Write the index entry for the open block and start a new one."""
+    if(self.blockCount == 0) :
+      return
+    #End of if statement - if(self.blockCount == 0) :
+
+    entry = np.array([(self.blockMin, self.blockMax, self.blockStart, self.blockCount)],
+                     dtype = indexDtype)
+    self.indexFile.write(entry.tobytes())
+    self.indexFile.flush()
+    self.blockStart += self.blockCount
+    self.blockCount = 0
+
+  def writeBatch(self, f, batch) :
+    """Write a list of records to the open file and add them to the index."""
+    records = np.array(batch, dtype = telemetryDtype)
+    f.write(records.tobytes())
+
+    #The records have to be on disk before the index points at them.
+    f.flush()
+
+    times = records['wallTime']
+    while(len(times) > 0) :
+      numTaken = min(len(times), indexBlockRecords - self.blockCount)
+      taken = times[:numTaken]
+      times = times[numTaken:]
+      if(self.blockCount == 0) :
+        self.blockMin = int(taken.min())
+        self.blockMax = int(taken.max())
+      else :
+        self.blockMin = min(self.blockMin, int(taken.min()))
+        self.blockMax = max(self.blockMax, int(taken.max()))
+      #End of if-else clause.
+      self.blockCount += numTaken
+
+      if(self.blockCount == indexBlockRecords) :
+        self.closeBlock()
+      #End of if statement - if(self.blockCount == indexBlockRecords) :
+    #End of while loop - while(len(times) > 0) :
+
+#End of the class BinaryTelemetryWriter.py
+
+#################################################################################
+
+#################################################################################
+
+def readTelemetry(filename) :
+  """
+
+   NAME: readTelemetry(filename)
+
+   PURPOSE:  Read a binary telemetry file without copying it.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by the analysis programs.
+
+   INPUTS:
+           filename : The .qpt file written by BinaryTelemetryWriter.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: [header, records] where header is a headerDtype record and records is a
+   read only np.memmap of telemetryDtype records.  A record still being written when
+   the file was opened is left off the end.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Raises ValueError if the file is not a telemetry file or was
+   written with a different record layout.
+
+   EXAMPLE: header, records = readTelemetry('/data/afa20261018.qpt')
+            print(header['latitude'], records['pan'].mean())
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import os
+
+  size = os.path.getsize(filename)
+  if(size < headerDtype.itemsize) :
+    raise ValueError(filename + ' is too short to be a telemetry file.')
+  #End of if statement - if(size < headerDtype.itemsize) :
+
+  header = np.fromfile(filename, dtype = headerDtype, count = 1)[0]
+  if(header['magic'] != telemetryMagic) :
+    raise ValueError(filename + ' is not a telemetry file.')
+  #End of if statement - if(header['magic'] != telemetryMagic) :
+  if((header['version'] != telemetryVersion) or
+     (header['recordSize'] != telemetryDtype.itemsize)) :
+    raise ValueError(filename + ' was written with a different telemetry version.')
+  #End of if statement.
+
+  #np.memmap will not map zero records so hand back an empty array instead.
+  numRecords = (size - headerDtype.itemsize)//telemetryDtype.itemsize
+  if(numRecords == 0) :
+    return [header, np.zeros(0, dtype = telemetryDtype)]
+  #End of if statement - if(numRecords == 0) :
+
+  records = np.memmap(filename, dtype = telemetryDtype, mode = 'r',
+                      offset = headerDtype.itemsize, shape = (numRecords,))
+
+  return [header, records]
+
+#End of the function readTelemetry.py
+
+#################################################################################
+
+#################################################################################
+
+def getIndexFilename(filename) :
+  """
+
+   NAME: getIndexFilename(filename)
+
+   PURPOSE:  Return the name of the index file that goes with a binary telemetry file.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by BinaryTelemetryWriter and the index functions.
+
+   INPUTS:
+           filename : The .qpt telemetry file.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The index filename as a string.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: indexFilename = getIndexFilename('/data/afa20261018.qpt')
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import os
+
+  return os.path.splitext(filename)[0] + '.qpti'
+
+#End of the function getIndexFilename.py
+
+#################################################################################
+
+#################################################################################
+
+def makeTelemetryIndex(wallTime, start = 0, blockRecords = indexBlockRecords) :
+  """
+
+   NAME: makeTelemetryIndex(wallTime, start = 0, blockRecords = indexBlockRecords)
+
+   PURPOSE:  Make the index entries for a run of records.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by buildTelemetryIndex and readTelemetryIndex.
+
+   INPUTS:
+           wallTime : The wallTime field of the records.
+
+   OPTIONAL INPUTS:
+           start : The record number of wallTime[0] in the file.
+           blockRecords : The number of records in each block.  The last block can
+           be short.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: An array of indexDtype entries.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: blocks = makeTelemetryIndex(records['wallTime'])
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  offsets = np.arange(0, len(wallTime), blockRecords)
+  blocks = np.zeros(len(offsets), dtype = indexDtype)
+  if(len(offsets) == 0) :
+    return blocks
+  #End of if statement - if(len(offsets) == 0) :
+
+  blocks['minTime'] = np.minimum.reduceat(wallTime, offsets)
+  blocks['maxTime'] = np.maximum.reduceat(wallTime, offsets)
+  blocks['start'] = offsets + start
+  blocks['count'] = np.diff(np.append(offsets, len(wallTime)))
+
+  return blocks
+
+#End of the function makeTelemetryIndex.py
+
+#################################################################################
+
+#################################################################################
+
+def buildTelemetryIndex(filename, onlyIfStale = False) :
+  """
+
+   NAME: buildTelemetryIndex(filename, onlyIfStale = False)
+
+   PURPOSE:  Write the index file for a binary telemetry file from its records.
+   This is for files written before there was an index or whose index was lost.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by BinaryTelemetryWriter when it opens a file and by hand.
+
+   INPUTS:
+           filename : The .qpt telemetry file.
+
+   OPTIONAL INPUTS:
+           onlyIfStale : If set, an index file that is there and points only at
+           records that are in the file is kept as it is.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The index entries as an array of indexDtype entries.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The index file is written.
+
+   RESTRICTIONS: Do not call this on a file a writer has open.
+
+   EXAMPLE: buildTelemetryIndex('/data/afa20261018.qpt')
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import os
+
+  indexFilename = getIndexFilename(filename)
+  records = readTelemetry(filename)[1]
+
+  if(onlyIfStale and os.path.exists(indexFilename)) :
+    blocks = np.fromfile(indexFilename, dtype = indexDtype,
+                         count = os.path.getsize(indexFilename)//indexDtype.itemsize)
+    if((len(blocks) == 0) or
+       (blocks['start'][-1] + blocks['count'][-1] <= len(records))) :
+      return blocks
+    #End of if statement.
+  #End of if statement - if(onlyIfStale and os.path.exists(indexFilename)) :
+
+  blocks = makeTelemetryIndex(records['wallTime'])
+  with open(indexFilename, mode = 'wb') as f :
+    f.write(blocks.tobytes())
+  #End of with statement - with open(indexFilename, mode = 'wb') as f :
+
+  return blocks
+
+#End of the function buildTelemetryIndex.py
+
+#################################################################################
+
+#################################################################################
+
+def readTelemetryIndex(filename) :
+  """
+
+   NAME: readTelemetryIndex(filename)
+
+   PURPOSE:  Read a binary telemetry file and its index.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by TelemetryIndex.
+
+   INPUTS:
+           filename : The .qpt telemetry file.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: [records, blocks] where records is the np.memmap from readTelemetry and
+   blocks is an array of indexDtype entries covering every record.  Records past the
+   end of the index file(a file still being written) and files with no index file
+   are indexed here, in memory.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: records, blocks = readTelemetryIndex('/data/afa20261018.qpt')
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import os
+
+  #Read the index first.  A writer only adds an index entry once its records are on disk,
+  #so every entry read here points at records that readTelemetry will find.
+  indexFilename = getIndexFilename(filename)
+  if(os.path.exists(indexFilename)) :
+    blocks = np.fromfile(indexFilename, dtype = indexDtype,
+                         count = os.path.getsize(indexFilename)//indexDtype.itemsize)
+  else :
+    blocks = np.zeros(0, dtype = indexDtype)
+  #End of if-else clause.
+
+  records = readTelemetry(filename)[1]
+  indexedEnd = int(blocks['start'][-1] + blocks['count'][-1]) if len(blocks) > 0 else 0
+  if(indexedEnd > len(records)) :
+    #The index does not match the file, so index it all here.
+    blocks = makeTelemetryIndex(records['wallTime'])
+  elif(indexedEnd < len(records)) :
+    blocks = np.concatenate([blocks, makeTelemetryIndex(records['wallTime'][indexedEnd:],
+                                                        start = indexedEnd)])
+  #End of if-elif clause.
+
+  return [records, blocks]
+
+#End of the function readTelemetryIndex.py
+
+#################################################################################
+
+#################################################################################
+
+def getOverlapRange(runningMax, runningMin, t0, t1) :
+  """
+
+   NAME: getOverlapRange(runningMax, runningMin, t0, t1)
+
+   PURPOSE:  Find the range of entries that can hold times in [t0, t1) with two binary
+   searches.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by TelemetryIndex.query.
+
+   INPUTS:
+           runningMax : The running maximum of the entry maximum times.
+           runningMin : The running minimum, taken from the end, of the entry
+           minimum times.
+           t0, t1 : The start and end of the time window.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: [first, last] such that only entries first through last - 1 can overlap
+   the window.  Both running arrays are sorted even if the clock stepped backwards,
+   so the search never misses an entry.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: first, last = getOverlapRange(runningMax, runningMin, t0, t1)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  #Entries before first all end before t0 and entries from last on all start at or
+  #after t1.
+  first = int(np.searchsorted(runningMax, t0, side = 'left'))
+  last = int(np.searchsorted(runningMin, t1, side = 'left'))
+
+  return [first, max(first, last)]
+
+#End of the function getOverlapRange.py
+
+#################################################################################
+
+#################################################################################
+
+class TelemetryIndex :
+  """
+
+   NAME: TelemetryIndex(saveDir, location)
+
+   PURPOSE:  Find the telemetry records in a time window across all of the binary
+   telemetry files for a location, reading only the blocks that hold the window.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by the analysis programs.
+
+   INPUTS:
+           saveDir : The directory the telemetry files are written to.
+           location : The location part of the telemetry filenames.
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The file indexes are kept in memory.  Only the newest file, the one
+   that may still be being written, is read again for a query, and only if its size
+   has changed.  Call refresh to pick up new files.
+
+   RESTRICTIONS: Times are wall clock nanoseconds, as from time.time_ns.
+
+   EXAMPLE: index = TelemetryIndex(PARAMS.saveDir, PARAMS.location)
+            records = index.query(t0, t1)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Changed to read the newest file again only when its size changes and
+             to keep the search arrays of the older files on October 18, 2026
+
+  """
+
+  def __init__(self, saveDir, location) :
+    self.saveDir = saveDir
+    self.location = location
+    self.files = {}
+    self.refresh()
+
+  def loadFile(self, filename) :
+    """Read one file and its index and keep them with the sorted search arrays."""
+    import os
+
+    #Take the size first, so rows written while the file is read are picked up later.
+    size = os.path.getsize(filename)
+    records, blocks = readTelemetryIndex(filename)
+    self.files[filename] = {
+      'size' : size,
+      'records' : records,
+      'blocks' : blocks,
+      'runningMax' : np.maximum.accumulate(blocks['maxTime']),
+      'runningMin' : np.minimum.accumulate(blocks['minTime'][::-1])[::-1]}
+
+  def getFileRange(self, filename) :
+    """Return the smallest and largest wall clock times in a loaded file."""
+    blocks = self.files[filename]['blocks']
+
+    #An empty file gets a range that no window can overlap.
+    if(len(blocks) == 0) :
+      return (np.iinfo(np.int64).max, np.iinfo(np.int64).min)
+    #End of if statement - if(len(blocks) == 0) :
+
+    return (blocks['minTime'].min(), blocks['maxTime'].max())
+
+  def refresh(self) :
+    """Look for new telemetry files and read again any that have grown."""
+    import glob
+    import os
+
+    filenames = sorted(glob.glob(os.path.join(glob.escape(self.saveDir),
+                                              glob.escape(self.location) + '*.qpt')))
+    self.filenames = [filename for filename in filenames
+                      if os.path.getsize(filename) >= headerDtype.itemsize]
+
+    #The file that was the newest one may have grown since it was read.
+    for filename in self.filenames[:-1] :
+      if((filename not in self.files) or
+         (self.files[filename]['size'] != os.path.getsize(filename))) :
+        self.loadFile(filename)
+      #End of if statement.
+    #End of for loop - for filename in self.filenames[:-1] :
+
+    #The search arrays of the older files do not change, so they are made once here and
+    #updateNewest only has to fold the newest file in.
+    ranges = np.array([self.getFileRange(filename) for filename in self.filenames[:-1]],
+                      dtype = np.int64).reshape(-1, 2)
+    self.olderRunningMax = np.maximum.accumulate(ranges[:, 1])
+    self.olderRunningMin = np.minimum.accumulate(ranges[::-1, 0])[::-1]
+
+    self.fileRunningMax = None
+    self.updateNewest()
+
+  def updateNewest(self) :
+    """Read the newest file again if its size has changed and update the file search
+    arrays."""
+    import os
+
+    if(len(self.filenames) == 0) :
+      self.fileRunningMax = np.zeros(0, dtype = np.int64)
+      self.fileRunningMin = np.zeros(0, dtype = np.int64)
+      return
+    #End of if statement - if(len(self.filenames) == 0) :
+
+    newest = self.filenames[-1]
+    entry = self.files.get(newest)
+    if((entry is None) or (entry['size'] != os.path.getsize(newest))) :
+      self.loadFile(newest)
+    elif(self.fileRunningMax is not None) :
+      return
+    #End of if-elif clause.
+
+    #Fold the newest file into the search arrays of the older files.
+    newestMin, newestMax = self.getFileRange(newest)
+    lastMax = self.olderRunningMax[-1] if len(self.olderRunningMax) > 0 else newestMax
+    self.fileRunningMax = np.append(self.olderRunningMax, max(lastMax, newestMax))
+    self.fileRunningMin = np.append(np.minimum(self.olderRunningMin, newestMin), newestMin)
+
+  def query(self, t0, t1) :
+    """Return the records with wall clock times in [t0, t1) as one array, in file
+    order."""
+    #Only the newest file can have grown since the last query, and it is only read again
+    #when its size has changed.
+    self.updateNewest()
+
+    pieces = []
+    firstFile, lastFile = getOverlapRange(self.fileRunningMax, self.fileRunningMin, t0, t1)
+    for filename in self.filenames[firstFile:lastFile] :
+      entry = self.files[filename]
+      first, last = getOverlapRange(entry['runningMax'], entry['runningMin'], t0, t1)
+      for block in entry['blocks'][first:last] :
+        if((block['maxTime'] < t0) or (block['minTime'] >= t1)) :
+          continue
+        #End of if statement.
+
+        records = entry['records'][block['start']:block['start'] + block['count']]
+        times = records['wallTime']
+        pieces.append(records[(times >= t0) & (times < t1)])
+      #End of for loop - for block in entry['blocks'][first:last] :
+    #End of for loop - for filename in self.filenames[firstFile:lastFile] :
+
+    if(len(pieces) == 0) :
+      return np.zeros(0, dtype = telemetryDtype)
+    #End of if statement - if(len(pieces) == 0) :
+
+    return np.concatenate(pieces)
+
+#End of the class TelemetryIndex.py
+
+#################################################################################
+
+#################################################################################
+
+#The writers that are open, one for each save directory, location and kind of file.
+openWriters = {}
+openWritersLock = threading.Lock()
+
+def getTelemetryWriter(PARAMS, writerClass = TelemetryWriter) :
+  """
+
+   NAME: getTelemetryWriter(PARAMS, writerClass = TelemetryWriter)
+
+   PURPOSE:  Return the running writer of type writerClass for PARAMS.saveDir and
+   PARAMS.location, starting one the first time it is asked for.  The writers are
+   closed when the program exits.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by writePanTiltValues.
+
+   INPUTS:
+           PARAMS : The parameter data class.
+
+   OPTIONAL INPUTS:
+           writerClass : TelemetryWriter for CSV files or BinaryTelemetryWriter for
+           binary files.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The writer.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The first call for a location opens a file and starts a thread.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: getTelemetryWriter(PARAMS).write([dateTime, pan, tilt])
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import atexit
+
+  key = (PARAMS.saveDir, PARAMS.location, writerClass)
+  with openWritersLock :
+    writer = openWriters.get(key)
+    if((writer is None) or (not writer.is_alive())) :
+      if(len(openWriters) == 0) :
+        atexit.register(closeTelemetryWriters)
+      #End of if statement - if(len(openWriters) == 0) :
+      writer = writerClass(PARAMS)
+      writer.start()
+      openWriters[key] = writer
+    #End of if statement.
+  #End of with statement - with openWritersLock :
+
+  return writer
+
+#End of the function getTelemetryWriter.py
+
+#################################################################################
+
+#################################################################################
+
+def closeTelemetryWriters() :
+  """
+
+   NAME: closeTelemetryWriters()
+
+   PURPOSE:  Flush and close every writer started by getTelemetryWriter.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called when the program exits.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: None
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The telemetry files are closed.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: closeTelemetryWriters()
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  with openWritersLock :
+    writers = list(openWriters.values())
+    openWriters.clear()
+  #End of with statement - with openWritersLock :
+
+  for writer in writers :
+    writer.close()
+  #End of for loop - for writer in writers :
+
+  return
+
+#End of the function closeTelemetryWriters.py
+
+#################################################################################
+
+#################################################################################
@@ -0,0 +1,427 @@
+#This module tracks a moving target with the jog speeds of the Get Status/Jog command instead of
+#a stream of Move To Entered Coordinates commands.  A move command brings the head to a stop at
+#every point, while a jog keeps it moving at a set speed.  Every period the Tracker sends one
+#Get Status/Jog command, reads the position in the reply, and sets the next jog speeds from the
+#target's rate plus a proportional-integral correction of the position error.  Each command is
+#nine bytes, so a track at five commands a second needs about 45 bytes a second on the link.
+#
+#The jog speeds are 0-127 steps between the controller's minimum and maximum motor speeds, not
+#angular rates, so the rate of one jog step and the offset of the minimum speed have to be
+#measured for each head with measureJogRate.
+
+import threading
+
+#The Get Status/Jog speed limit.
+maxJogSpeed = 127
+
+#################################################################################
+
+#################################################################################
+
+class TrackingStats :
+  """
+
+   NAME: TrackingStats()
+
+   PURPOSE:  Keep the position errors and command counts of one track.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by Tracker.track.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS: None
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.  numCommands counts the commands sent, numMissed those with
+   no status in the reply and bytesWritten the bytes of the commands.  panError and
+   tiltError hold the target less the reported position, in tenths of a degree, for
+   every status read.  fault holds the StatusRecord that stopped the track, if any.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: stats = tracker.track(dateTime, Az, El)
+            print(stats.getSummary())
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self) :
+    self.numCommands = 0
+    self.numMissed = 0
+    self.bytesWritten = 0
+    self.panError = []
+    self.tiltError = []
+    self.fault = None
+    self.elapsed = 0.0
+
+  def getSummary(self) :
+    """Return a dictionary of the counts, the bytes per second and the RMS and largest
+    pan and tilt errors in tenths of a degree."""
+    import numpy as np
+
+    summary = {'numCommands' : self.numCommands, 'numMissed' : self.numMissed,
+               'bytesWritten' : self.bytesWritten, 'elapsed' : self.elapsed,
+               'fault' : self.fault is not None}
+    if(self.elapsed > 0) :
+      summary['bytesPerSecond'] = self.bytesWritten/self.elapsed
+    #End of if statement - if(self.elapsed > 0) :
+
+    for name, errors in (('pan', self.panError), ('tilt', self.tiltError)) :
+      if(len(errors) > 0) :
+        errors = np.asarray(errors, dtype = float)
+        summary[name + 'RMSError'] = float(np.sqrt(np.mean(errors**2)))
+        summary[name + 'MaxError'] = float(np.abs(errors).max())
+      #End of if statement - if(len(errors) > 0) :
+    #End of for loop.
+
+    return summary
+
+#End of the class TrackingStats.py
+
+#################################################################################
+
+#################################################################################
+
+class Tracker :
+  """
+
+   NAME: Tracker(session, panRate, tiltRate, period = 0.2, gain = 1.0,
+                 integralGain = 0.2, deadband = 1, commandBits = 0)
+
+   PURPOSE:  Follow a time tagged trajectory by steering the jog speeds from the
+   reported position.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by programs that track a moving target.
+
+   INPUTS:
+           session : The QPTSession that owns the serial port.
+           panRate, tiltRate : The [rate, offset] of each axis from measureJogRate,
+           in tenths of a degree per second.  A single number is taken as the rate of
+           one jog speed step with no offset.
+
+   OPTIONAL INPUTS:
+           period : The time in seconds between commands.  This is raised to
+           QPTHeartbeat.minimumPeriod if it is set any lower.
+           gain : The proportional gain, in tenths of a degree per second for each
+           tenth of a degree of error.
+           integralGain : The integral gain, per second, which takes out a steady lag.
+           deadband : Errors this small(in tenths of a degree) are not corrected, so
+           the head does not hunt around a still target.
+           commandBits : The Get Status/Jog bits to send with every command, such as
+           QPTEncoder.statusJogOSL.  statusJogRU must not be set since the errors are
+           worked out in tenths of a degree.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: A jog stops any automated move the controller is making.  Every
+   command, the final stop included, goes out at least period seconds after the one
+   before it.
+
+   EXAMPLE: panRate = measureJogRate(session, 'pan')
+            tiltRate = measureJogRate(session, 'tilt')
+            tracker = Tracker(session, panRate, tiltRate)
+            stats = tracker.track(dateTime, Az, El)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Added the jog speed offset on October 18, 2026
+             Changed to time each command from when the last one was sent and to
+             wait a period before the final stop on October 18, 2026
+
+  """
+
+  def __init__(self, session, panRate, tiltRate, period = 0.2, gain = 1.0,
+               integralGain = 0.2, deadband = 1, commandBits = 0) :
+    import numpy as np
+    import QPTHeartbeat as QPTH
+
+    self.session = session
+    self.rates = tuple([float(rate), 0.0] if np.isscalar(rate) else
+                       [float(rate[0]), float(rate[1])] for rate in (panRate, tiltRate))
+    self.period = max(period, QPTH.minimumPeriod)
+    self.gain = gain
+    self.integralGain = integralGain
+    self.deadband = deadband
+    self.commandBits = commandBits
+    self.stopEvent = threading.Event()
+
+  def stop(self) :
+    """Stop a track from another thread.  The head is brought to a stop."""
+    self.stopEvent.set()
+
+  def getSpeed(self, rate, axis) :
+    """Turn a rate in tenths of a degree per second into a jog speed for axis 0(pan)
+    or 1(tilt).  Returns [speed, saturated]."""
+    stepRate, offset = self.rates[axis]
+
+    #Rates less than half of the slowest jog are left at a standstill.
+    if(abs(rate) < 0.5*(offset + stepRate)) :
+      return [0, False]
+    #End of if statement - if(abs(rate) < 0.5*(offset + stepRate)) :
+
+    speed = max(1, int(round((abs(rate) - offset)/stepRate)))
+    if(rate < 0) :
+      speed = -speed
+    #End of if statement - if(rate < 0) :
+    if(abs(speed) > maxJogSpeed) :
+      return [maxJogSpeed if speed > 0 else -maxJogSpeed, True]
+    #End of if statement - if(abs(speed) > maxJogSpeed) :
+    return [speed, False]
+
+  def send(self, panSpeed, tiltSpeed, stats) :
+    """Send one Get Status/Jog command and return the QPTStatus.StatusRecord from the
+    reply, or None."""
+    import QPTEncoder as QPTE
+    import QPTStatus as QPTSt
+
+    Command = QPTE.getStatusJogFrame(self.commandBits, panSpeed, tiltSpeed)
+    stats.numCommands += 1
+    stats.bytesWritten += len(Command)
+    reply = self.session.sendCommand(Command)
+    status = None if reply is None else QPTSt.decodeStatus(reply)
+    if(status is None) :
+      stats.numMissed += 1
+    #End of if statement - if(status is None) :
+
+    return status
+
+  def track(self, dateTime, Az, El, absolute = False) :
+    """Follow the trajectory Az, El(tenths of a degree) at the times dateTime(seconds)
+    until its last time has passed.  The times are counted from the start of the track
+    unless absolute is set, when they are Unix times.  The head is stopped at the end,
+    on a fault and when stop is called.  Returns the TrackingStats."""
+    import time
+    import numpy as np
+
+    dateTime = np.asarray(dateTime, dtype = float)
+    targets = (np.asarray(Az, dtype = float), np.asarray(El, dtype = float))
+
+    #The target rates, for the feed forward.  Points with the same time get no rate.
+    if(len(dateTime) > 1) :
+      with np.errstate(divide = 'ignore', invalid = 'ignore') :
+        targetRates = tuple(np.nan_to_num(np.gradient(target, dateTime), posinf = 0.0,
+                                          neginf = 0.0) for target in targets)
+      #End of with statement.
+    else :
+      targetRates = (np.zeros(len(dateTime)), np.zeros(len(dateTime)))
+    #End of if-else clause.
+
+    self.stopEvent.clear()
+    stats = TrackingStats()
+    if(len(dateTime) == 0) :
+      return stats
+    #End of if statement - if(len(dateTime) == 0) :
+
+    #The trajectory time is the clock time plus offset.
+    startTime = time.monotonic()
+    if(absolute) :
+      offset = time.time() - startTime
+    else :
+      offset = dateTime[0] - startTime
+    #End of if-else clause.
+
+    speeds = [0, 0]
+    integrals = [0.0, 0.0]
+    lastTime = None
+    nextTick = startTime
+    try :
+      while(not self.stopEvent.is_set()) :
+        #The next command is due a period after this one actually goes out.
+        nextTick = time.monotonic() + self.period
+        status = self.send(speeds[0], speeds[1], stats)
+        now = time.monotonic()
+        trajectoryTime = now + offset
+        if(trajectoryTime > dateTime[-1]) :
+          break
+        #End of if statement - if(trajectoryTime > dateTime[-1]) :
+
+        if(status is not None) :
+          if(status.hasFault()) :
+            stats.fault = status
+            break
+          #End of if statement - if(status.hasFault()) :
+
+          dt = 0.0 if lastTime is None else now - lastTime
+          lastTime = now
+          for axis, position in enumerate((status.pan, status.tilt)) :
+            target = np.interp(trajectoryTime, dateTime, targets[axis])
+            error = target - position
+            (stats.panError if axis == 0 else stats.tiltError).append(error)
+            if(abs(error) <= self.deadband) :
+              error = 0.0
+            #End of if statement - if(abs(error) <= self.deadband) :
+
+            #Look ahead half a period, since the speed is used until the next command.
+            feedForward = np.interp(trajectoryTime + 0.5*self.period, dateTime,
+                                    targetRates[axis])
+            integral = integrals[axis] + error*dt
+            speed, saturated = self.getSpeed(feedForward + self.gain*error +
+                                             self.integralGain*integral, axis)
+            #Only wind up the integral while the speed has room to follow it.
+            if(not saturated) :
+              integrals[axis] = integral
+            #End of if statement - if(not saturated) :
+            speeds[axis] = speed
+          #End of for loop.
+        #End of if statement - if(status is not None) :
+
+        if(self.stopEvent.wait(max(0.0, nextTick - time.monotonic()))) :
+          break
+        #End of if statement.
+      #End of while loop - while(not self.stopEvent.is_set()) :
+    finally :
+      #Always leave the head still, but not before the controller is ready for the
+      #next command.
+      time.sleep(max(0.0, nextTick - time.monotonic()))
+      self.send(0, 0, stats)
+      stats.elapsed = time.monotonic() - startTime
+    #End of try-finally clause.
+
+    return stats
+
+#End of the class Tracker.py
+
+#################################################################################
+
+#################################################################################
+
+def measureJogRate(session, axis = 'pan', speeds = (16, 64), duration = 2.0, settle = 0.5,
+                   period = 0.2) :
+  """
+
+   NAME: measureJogRate(session, axis = 'pan', speeds = (16, 64), duration = 2.0,
+                        settle = 0.5, period = 0.2)
+
+   PURPOSE:  Measure how fast the jog speeds move an axis.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called before making a Tracker.
+
+   INPUTS:
+           session : The QPTSession that owns the serial port.
+
+   OPTIONAL INPUTS:
+           axis : 'pan' or 'tilt'.
+           speeds : Two or more signed jog speeds to measure with, all in the same
+           direction.
+           duration : How long in seconds to measure each speed for.
+           settle : How long in seconds to let the axis get up to each speed before
+           measuring it.
+           period : The time in seconds between commands.  This is raised to
+           QPTHeartbeat.minimumPeriod if it is set any lower.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A list of [rate, offset] where an axis jogged at speed moves at
+   offset + rate*speed tenths of a degree per second(with the sign of speed).  The
+   jog speeds run between the controller's minimum and maximum motor speeds, so the
+   offset is not zero.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: The axis is jogged for about len(speeds)*(settle + duration) seconds
+   and then stopped.  The jog is sent again every period the whole time, so the
+   controller's communication timeout never runs out.
+
+   RESTRICTIONS: Make sure the axis has room to move.  Raises ValueError if fewer
+   than two different speeds are given and RuntimeError if the controller does not
+   answer or the axis does not move.
+
+   EXAMPLE: panRate = measureJogRate(session, 'pan', speeds = (-16, -64))
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Changed to keep sending the jog every period and to fit an offset and
+             a rate to two or more speeds on October 18, 2026
+
+  """
+
+  import time
+  import numpy as np
+  import QPTEncoder as QPTE
+  import QPTHeartbeat as QPTH
+  import QPTStatus as QPTSt
+
+  speeds = [int(speed) for speed in speeds]
+  if(len(set(abs(speed) for speed in speeds)) < 2) :
+    raise ValueError('At least two different jog speeds are needed.')
+  #End of if statement.
+  period = max(period, QPTH.minimumPeriod)
+
+  def jog(jogSpeed) :
+    panSpeed, tiltSpeed = (jogSpeed, 0) if axis == 'pan' else (0, jogSpeed)
+    reply = session.sendCommand(QPTE.getStatusJogFrame(0, panSpeed, tiltSpeed))
+    status = None if reply is None else QPTSt.decodeStatus(reply)
+    if(status is None) :
+      raise RuntimeError('The controller did not answer the jog command.')
+    #End of if statement - if(status is None) :
+    return [time.monotonic(), status.pan if axis == 'pan' else status.tilt]
+  #End of the function jog.
+
+  #Keep jogging at each speed for settle plus duration seconds, sending the command every
+  #period, and fit the speed to the positions read during the last duration seconds.  The
+  #next speed follows straight on, so the commands never stop.
+  rates = []
+  nextTick = time.monotonic()
+  try :
+    for speed in speeds :
+      speedStart = time.monotonic()
+      times = []
+      positions = []
+      while(True) :
+        #Each command is timed from the one before it, even across a change of speed,
+        #so no two commands are ever closer together than period.
+        time.sleep(max(0.0, nextTick - time.monotonic()))
+        nextTick = time.monotonic() + period
+        now, position = jog(speed)
+        if(now - speedStart >= settle) :
+          times.append(now)
+          positions.append(position)
+        #End of if statement - if(now - speedStart >= settle) :
+        if(now - speedStart >= settle + duration) :
+          break
+        #End of if statement - if(now - speedStart >= settle + duration) :
+      #End of while loop - while(True) :
+
+      if((len(times) < 2) or (positions[-1] == positions[0])) :
+        raise RuntimeError('The ' + axis + ' axis did not move.')
+      #End of if statement.
+      rates.append(np.polyfit(times, positions, 1)[0])
+    #End of for loop - for speed in speeds :
+  finally :
+    time.sleep(max(0.0, nextTick - time.monotonic()))
+    session.sendCommand(QPTE.getStatusJogFrame())
+  #End of try-finally clause.
+
+  #Fit the size of the rate to the size of the speed, so speeds in either direction can
+  #be used.
+  rate, offset = np.polyfit(np.abs(speeds), np.sign(speeds)*np.asarray(rates), 1)
+  if(rate <= 0) :
+    raise RuntimeError('The ' + axis + ' axis did not speed up with the jog speed.')
+  #End of if statement - if(rate <= 0) :
+
+  return [float(rate), float(offset)]
+
+#End of the function measureJogRate.py
+
+#################################################################################
+
+#################################################################################
@@ -0,0 +1,887 @@
+#This module reads planned trajectory(mission) files in blocks.  The file is parsed a fixed
+#number of rows at a time into NumPy arrays, each block is checked and compiled into its
+#Move To Entered Coordinates commands, and a background thread gets the next block ready while
+#the current one is being sent.  The first command goes out as soon as the first block is
+#ready and memory use does not grow with the size of the file.
+
+import dataclasses
+import queue
+import threading
+
+#The number of rows parsed at a time.
+trajectoryBlockSize = 16384
+
+#################################################################################
+
+#################################################################################
+
+def readTrajectoryBlocks(filename, blockSize = trajectoryBlockSize) :
+  """
+
+   NAME: readTrajectoryBlocks(filename, blockSize = trajectoryBlockSize)
+
+   PURPOSE:  Read a trajectory file blockSize rows at a time.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by streamTrajectory.
+
+   INPUTS:
+           filename : The trajectory file.  Each row is the date and time, the azimuth
+           and the elevation, separated by commas, with the angles in degrees.
+
+   OPTIONAL INPUTS:
+           blockSize : The number of rows in each block.  The last block can be short.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A generator of [dateTime, Az, El, firstRow] lists where dateTime is a float
+   array, Az and El are integer arrays of the angles in tenths of a degree and
+   firstRow is the number of the first row of the block in the file.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: for dateTime, Az, El, firstRow in readTrajectoryBlocks(filename) :
+              print(len(Az))
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import itertools
+  import numpy as np
+
+  firstRow = 0
+  with open(filename) as trajectoryFile :
+    while(True) :
+      lines = list(itertools.islice(trajectoryFile, blockSize))
+      if(len(lines) == 0) :
+        break
+      #End of if statement - if(len(lines) == 0) :
+
+      block = np.loadtxt(lines, delimiter = ',', usecols = (0, 1, 2), ndmin = 2)
+
+      #Multiply the values by 10 in order to get the proper precision, then convert the
+      #resulting angle coordinates into integers.
+      yield [block[:, 0], (10.0*block[:, 1]).astype(int), (10.0*block[:, 2]).astype(int),
+             firstRow]
+      firstRow += len(lines)
+    #End of while loop - while(True) :
+  #End of with statement - with open(filename) as trajectoryFile :
+
+#End of the function readTrajectoryBlocks.py
+
+#################################################################################
+
+#################################################################################
+
+@dataclasses.dataclass
+class TrajectoryLimits :
+  """The limits a trajectory is checked against.  The angles are in tenths of a degree,
+  maxStep is the largest change in either angle from one point to the next and
+  maxSlewRate the largest rate in tenths of a degree per second(this needs the point
+  times).  Limits left as None are not checked."""
+  azMin : int = -3600
+  azMax : int = 3600
+  elMin : int = -1800
+  elMax : int = 1800
+  softAzMin : int = None
+  softAzMax : int = None
+  softElMin : int = None
+  softElMax : int = None
+  maxStep : int = None
+  maxSlewRate : float = None
+#End of the TrajectoryLimits class definition.
+
+#################################################################################
+
+#################################################################################
+
+class TrajectoryReport :
+  """
+
+   NAME: TrajectoryReport(numPoints = 0)
+
+   PURPOSE:  Hold the results of checking a trajectory.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by validateTrajectory.
+
+   INPUTS: None
+
+   OPTIONAL INPUTS:
+           numPoints : The number of points checked.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object.  violations is a dictionary of check name to an array of the
+   row numbers that failed it.  The checks are azimuthRange, elevationRange,
+   azimuthSoftLimit, elevationSoftLimit, azimuthStep, elevationStep, time(times that
+   do not increase), azimuthSlewRate and elevationSlewRate.  Checks that every row
+   passed are left out.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: report = validateTrajectory(Az, El)
+            if(not report.isValid()) :
+              print('\n'.join(report.getSummary()))
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self, numPoints = 0) :
+    self.numPoints = numPoints
+    self.violations = {}
+
+  def add(self, name, rows) :
+    """Add the row numbers that failed a check."""
+    import numpy as np
+
+    if(len(rows) == 0) :
+      return
+    #End of if statement - if(len(rows) == 0) :
+
+    if(name in self.violations) :
+      self.violations[name] = np.concatenate((self.violations[name], rows))
+    else :
+      self.violations[name] = rows
+    #End of if-else clause.
+
+  def extend(self, other) :
+    """Add the results of another report, for the next block of the same trajectory."""
+    self.numPoints += other.numPoints
+    for name, rows in other.violations.items() :
+      self.add(name, rows)
+    #End of for loop - for name, rows in other.violations.items() :
+
+  def isValid(self) :
+    """Return True if every row passed every check."""
+    return len(self.violations) == 0
+
+  def getSummary(self) :
+    """Return a list of lines, one for each failed check, giving the number of rows that
+    failed it and the first few of them."""
+    lines = []
+    for name, rows in self.violations.items() :
+      shown = ', '.join(str(row) for row in rows[:10])
+      more = ', ...' if len(rows) > 10 else ''
+      lines.append('{0} : {1} rows({2}{3})'.format(name, len(rows), shown, more))
+    #End of for loop - for name, rows in self.violations.items() :
+
+    return lines
+
+  def __repr__(self) :
+    return 'TrajectoryReport(numPoints={0}, violations={1})'.format(
+      self.numPoints, {name : len(rows) for name, rows in self.violations.items()})
+
+#End of the class TrajectoryReport.py
+
+#################################################################################
+
+#################################################################################
+
+class TrajectoryError(ValueError) :
+  """Raised when a trajectory fails validation.  The TrajectoryReport is in report."""
+
+  def __init__(self, report) :
+    ValueError.__init__(self, 'The trajectory failed validation.\n' +
+                        '\n'.join(report.getSummary()))
+    self.report = report
+
+#End of the class TrajectoryError.py
+
+#################################################################################
+
+#################################################################################
+
+def validateTrajectory(Az, El, dateTime = None, limits = None, checkSoftLimits = True,
+                       firstRow = 0, previous = None) :
+  """
+
+   NAME: validateTrajectory(Az, El, dateTime = None, limits = None,
+                            checkSoftLimits = True, firstRow = 0, previous = None)
+
+   PURPOSE:  Check every point of a trajectory against the range, soft limit, step
+   size and slew rate limits at once.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by moveToEnteredCoords, validateTrajectoryFile and
+   compileTrajectoryBlocks.
+
+   INPUTS:
+           Az, El : Arrays of the azimuth and elevation in tenths of a degree.
+
+   OPTIONAL INPUTS:
+           dateTime : An array of the point times in seconds.  Needed for the slew
+           rate check.
+           limits : A TrajectoryLimits.  Defaults to the controller's range only.
+           checkSoftLimits : Set to 0 to skip the soft limits, as when the controller
+           is told to override them.
+           firstRow : The row number of Az[0].  The report uses row numbers.
+           previous : The (Az, El, dateTime) of the point before Az[0], when checking a
+           trajectory a block at a time, so the steps across blocks are checked.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A TrajectoryReport.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: report = validateTrajectory(Az, El, dateTime,
+                                        TrajectoryLimits(maxStep = 50, maxSlewRate = 100))
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  import numpy as np
+
+  if(limits is None) :
+    limits = TrajectoryLimits()
+  #End of if statement - if(limits is None) :
+
+  Az = np.asarray(Az)
+  El = np.asarray(El)
+  report = TrajectoryReport(len(Az))
+
+  def addBad(name, bad) :
+    report.add(name, np.flatnonzero(bad) + firstRow)
+  #End of the function addBad.
+
+  #The hard range.
+  addBad('azimuthRange', (Az < limits.azMin) | (Az > limits.azMax))
+  addBad('elevationRange', (El < limits.elMin) | (El > limits.elMax))
+
+  #The soft limits.
+  if(checkSoftLimits) :
+    for name, angle, low, high in (('azimuthSoftLimit', Az, limits.softAzMin, limits.softAzMax),
+                                   ('elevationSoftLimit', El, limits.softElMin,
+                                    limits.softElMax)) :
+      if((low is not None) or (high is not None)) :
+        bad = np.zeros(len(angle), dtype = bool)
+        if(low is not None) :
+          bad |= angle < low
+        #End of if statement - if(low is not None) :
+        if(high is not None) :
+          bad |= angle > high
+        #End of if statement - if(high is not None) :
+        addBad(name, bad)
+      #End of if statement.
+    #End of for loop.
+  #End of if statement - if(checkSoftLimits) :
+
+  if((limits.maxStep is None) and ((limits.maxSlewRate is None) or (dateTime is None))) :
+    return report
+  #End of if statement.
+
+  #The steps between points.  Row i is blamed for the step from the point before it.
+  if(previous is not None) :
+    dAz = np.abs(np.diff(Az, prepend = previous[0]))
+    dEl = np.abs(np.diff(El, prepend = previous[1]))
+    stepRow = firstRow
+  else :
+    dAz = np.abs(np.diff(Az))
+    dEl = np.abs(np.diff(El))
+    stepRow = firstRow + 1
+  #End of if-else clause.
+
+  if(limits.maxStep is not None) :
+    report.add('azimuthStep', np.flatnonzero(dAz > limits.maxStep) + stepRow)
+    report.add('elevationStep', np.flatnonzero(dEl > limits.maxStep) + stepRow)
+  #End of if statement - if(limits.maxStep is not None) :
+
+  if((limits.maxSlewRate is not None) and (dateTime is not None)) :
+    dateTime = np.asarray(dateTime, dtype = float)
+    if((previous is not None) and (previous[2] is not None)) :
+      dt = np.diff(dateTime, prepend = previous[2])
+    else :
+      dt = np.diff(dateTime)
+    #End of if-else clause.
+
+    #The rate is only checked where the time moves forward.  Anything else is a time
+    #error of its own.
+    forward = dt > 0
+    report.add('time', np.flatnonzero(~forward) + stepRow)
+    maxMove = limits.maxSlewRate*np.where(forward, dt, np.inf)
+    report.add('azimuthSlewRate', np.flatnonzero(forward & (dAz > maxMove)) + stepRow)
+    report.add('elevationSlewRate', np.flatnonzero(forward & (dEl > maxMove)) + stepRow)
+  #End of if statement.
+
+  return report
+
+#End of the function validateTrajectory.py
+
+#################################################################################
+
+#################################################################################
+
+def validateTrajectoryFile(filename, limits = None, checkSoftLimits = True,
+                           blockSize = trajectoryBlockSize) :
+  """
+
+   NAME: validateTrajectoryFile(filename, limits = None, checkSoftLimits = True,
+                                blockSize = trajectoryBlockSize)
+
+   PURPOSE:  Check a whole trajectory file, a block at a time, before any of it is
+   sent.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by moveToEnteredCoordsFile.
+
+   INPUTS:
+           filename : The trajectory file.
+
+   OPTIONAL INPUTS:
+           limits, checkSoftLimits : As for validateTrajectory.
+           blockSize : The number of rows read at a time.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A TrajectoryReport for the whole file.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: None
+
+   EXAMPLE: report = validateTrajectoryFile(filename, TrajectoryLimits(maxStep = 50))
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  report = TrajectoryReport()
+  previous = None
+  for dateTime, Az, El, firstRow in readTrajectoryBlocks(filename, blockSize) :
+    report.extend(validateTrajectory(Az, El, dateTime, limits, checkSoftLimits, firstRow,
+                                     previous))
+    previous = (Az[-1], El[-1], dateTime[-1])
+  #End of for loop - for dateTime, Az, El, firstRow in readTrajectoryBlocks(...) :
+
+  return report
+
+#End of the function validateTrajectoryFile.py
+
+#################################################################################
+
+#################################################################################
+
+def simplifyTrajectory(Az, El, dateTime = None, maxError = 1, maxStep = None,
+                       maxSlewRate = None) :
+  """
+
+   NAME: simplifyTrajectory(Az, El, dateTime = None, maxError = 1, maxStep = None,
+                            maxSlewRate = None)
+
+   PURPOSE:  Find the points of a trajectory that can be dropped while keeping the
+   pointing error under maxError, with the Ramer-Douglas-Peucker method.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by decimateTrajectory.
+
+   INPUTS:
+           Az, El : Arrays of the azimuth and elevation in tenths of a degree.
+
+   OPTIONAL INPUTS:
+           dateTime : An array of the point times.  The point number is used if this
+           is not given.
+           maxError : The largest pointing error allowed in tenths of a degree.
+           maxStep, maxSlewRate : As for TrajectoryLimits.  A point is kept if
+           dropping it would leave a step or a slew rate(this needs dateTime) between
+           the kept points either side of it larger than these.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A boolean array that is True for the points to keep.  The first and last
+   points are always kept.  If the steps and rates between the points given pass
+   maxStep and maxSlewRate then so do those between the points kept.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: The error of a dropped point is the larger of its azimuth and
+   elevation distance from the straight line, in time, between the kept points either
+   side of it.  Points with the same time as the kept point before them are measured
+   against that point.
+
+   EXAMPLE: keep = simplifyTrajectory(Az, El, dateTime, maxError = 2)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Added maxStep and maxSlewRate on October 18, 2026
+
+  """
+
+  import numpy as np
+
+  n = len(Az)
+  keep = np.zeros(n, dtype = bool)
+  if(n == 0) :
+    return keep
+  #End of if statement - if(n == 0) :
+  keep[0] = keep[-1] = True
+
+  Az = np.asarray(Az, dtype = float)
+  El = np.asarray(El, dtype = float)
+  if(dateTime is None) :
+    t = np.arange(n, dtype = float)
+  else :
+    t = np.asarray(dateTime, dtype = float)
+  #End of if-else clause.
+
+  #Work through the segments with a stack instead of recursion.  Each pass finds the
+  #point furthest from the segment's line and splits the segment there if it is too far.
+  segments = [(0, n - 1)]
+  while(len(segments) > 0) :
+    first, last = segments.pop()
+    if(last - first < 2) :
+      continue
+    #End of if statement - if(last - first < 2) :
+
+    span = t[last] - t[first]
+    if(span > 0) :
+      fraction = (t[first + 1:last] - t[first])/span
+    else :
+      fraction = np.zeros(last - first - 1)
+    #End of if-else clause.
+
+    error = np.maximum(np.abs(Az[first + 1:last] - Az[first] - fraction*(Az[last] - Az[first])),
+                       np.abs(El[first + 1:last] - El[first] - fraction*(El[last] - El[first])))
+    worst = int(np.argmax(error))
+
+    #A segment that would step or slew too far is split even if it is close enough.
+    #Splitting always ends at the points given, which passed the checks.
+    tooFar = error[worst] > maxError
+    move = max(abs(Az[last] - Az[first]), abs(El[last] - El[first]))
+    if((maxStep is not None) and (move > maxStep)) :
+      tooFar = True
+    #End of if statement - if((maxStep is not None) and (move > maxStep)) :
+    if((maxSlewRate is not None) and (dateTime is not None) and (move > maxSlewRate*span)) :
+      tooFar = True
+    #End of if statement.
+
+    if(tooFar) :
+      split = first + 1 + worst
+      keep[split] = True
+      segments.append((first, split))
+      segments.append((split, last))
+    #End of if statement - if(tooFar) :
+  #End of while loop - while(len(segments) > 0) :
+
+  return keep
+
+#End of the function simplifyTrajectory.py
+
+#################################################################################
+
+#################################################################################
+
+def decimateTrajectory(Az, El, dateTime = None, maxError = None, previous = None,
+                       limits = None) :
+  """
+
+   NAME: decimateTrajectory(Az, El, dateTime = None, maxError = None, previous = None,
+                            limits = None)
+
+   PURPOSE:  Drop the points of a trajectory that do not need to be sent.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by decimateTrajectoryBlocks.
+
+   INPUTS:
+           Az, El : Arrays of the azimuth and elevation in tenths of a degree.
+
+   OPTIONAL INPUTS:
+           dateTime : An array of the point times, used by the simplification.
+           maxError : If this is given the points left are also simplified with
+           simplifyTrajectory to within maxError tenths of a degree.
+           previous : The (Az, El) of the last point sent before Az[0], when working a
+           block at a time.
+           limits : A TrajectoryLimits.  The simplification keeps any point it would
+           otherwise drop that is needed to stay within maxStep and maxSlewRate.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A list of [rows, numDuplicates, numSimplified] where rows is an array of
+   the indices of the points to send.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: The positions are already cut to the controller's 0.1 degree
+   resolution, so a point at the same position as the one before it is dropped.  The
+   controller holds the last position it was sent, so this loses nothing.
+
+   EXAMPLE: rows, numDuplicates, numSimplified = decimateTrajectory(Az, El, dateTime, 2)
+            commandBuffer, offsets = QPTE.compileTrajectory(Az[rows], El[rows])
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Added the limits on October 18, 2026
+
+  """
+
+  import numpy as np
+
+  Az = np.asarray(Az)
+  El = np.asarray(El)
+  if(len(Az) == 0) :
+    return [np.zeros(0, dtype = np.intp), 0, 0]
+  #End of if statement - if(len(Az) == 0) :
+
+  #A point is a duplicate if it is where the point before it was.
+  duplicate = np.zeros(len(Az), dtype = bool)
+  duplicate[1:] = (Az[1:] == Az[:-1]) & (El[1:] == El[:-1])
+  if(previous is not None) :
+    duplicate[0] = (Az[0] == previous[0]) and (El[0] == previous[1])
+  #End of if statement - if(previous is not None) :
+  rows = np.flatnonzero(~duplicate)
+  numDuplicates = len(Az) - len(rows)
+
+  if(limits is None) :
+    limits = TrajectoryLimits()
+  #End of if statement - if(limits is None) :
+
+  numSimplified = 0
+  if((maxError is not None) and (len(rows) > 2)) :
+    keep = simplifyTrajectory(Az[rows], El[rows],
+                              None if dateTime is None else np.asarray(dateTime)[rows],
+                              maxError, limits.maxStep, limits.maxSlewRate)
+    numSimplified = len(rows) - int(np.count_nonzero(keep))
+    rows = rows[keep]
+  #End of if statement.
+
+  return [rows, numDuplicates, numSimplified]
+
+#End of the function decimateTrajectory.py
+
+#################################################################################
+
+#################################################################################
+
+def decimateTrajectoryBlocks(blocks, maxError = None, summary = None, limits = None) :
+  """
+
+   NAME: decimateTrajectoryBlocks(blocks, maxError = None, summary = None,
+                                  limits = None)
+
+   PURPOSE:  Drop the points of each block of a trajectory that do not need to be
+   sent.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by streamTrajectory.
+
+   INPUTS:
+           blocks : An iterable of [dateTime, Az, El, firstRow] lists, as from
+           readTrajectoryBlocks.
+
+   OPTIONAL INPUTS:
+           maxError, limits : As for decimateTrajectory.
+           summary : A dictionary.  If this is given the counts are kept in it as the
+           blocks go by(see OPTIONAL OUTPUTS).
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A generator of the same [dateTime, Az, El, firstRow] lists with the
+   dropped points taken out.  firstRow is still the file row of the first point read
+   into the block.
+
+   OPTIONAL OUTPUTS: summary holds numPoints, numKept, numDuplicates, numSimplified
+   and framesSaved, the number of commands that no longer have to be sent.
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Each block is simplified on its own, so the last point of every
+   block is kept.  This is what keeps the steps and rates across blocks within the
+   limits.
+
+   EXAMPLE: summary = {}
+            blocks = decimateTrajectoryBlocks(readTrajectoryBlocks(filename), 2, summary)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Added the limits on October 18, 2026
+
+  """
+
+  if(summary is None) :
+    summary = {}
+  #End of if statement - if(summary is None) :
+  for key in ('numPoints', 'numKept', 'numDuplicates', 'numSimplified', 'framesSaved') :
+    summary[key] = 0
+  #End of for loop.
+
+  previous = None
+  for dateTime, Az, El, firstRow in blocks :
+    rows, numDuplicates, numSimplified = decimateTrajectory(Az, El, dateTime, maxError,
+                                                            previous, limits)
+    summary['numPoints'] += len(Az)
+    summary['numKept'] += len(rows)
+    summary['numDuplicates'] += numDuplicates
+    summary['numSimplified'] += numSimplified
+    summary['framesSaved'] = summary['numPoints'] - summary['numKept']
+    if(len(rows) == 0) :
+      continue
+    #End of if statement - if(len(rows) == 0) :
+
+    previous = (Az[rows[-1]], El[rows[-1]])
+    yield [dateTime[rows], Az[rows], El[rows], firstRow]
+  #End of for loop - for dateTime, Az, El, firstRow in blocks :
+
+#End of the function decimateTrajectoryBlocks.py
+
+#################################################################################
+
+#################################################################################
+
+def compileTrajectoryBlocks(blocks, limits = None, checkSoftLimits = True) :
+  """
+
+   NAME: compileTrajectoryBlocks(blocks, limits = None, checkSoftLimits = True)
+
+   PURPOSE:  Check each block of a trajectory and build its commands.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by streamTrajectory.
+
+   INPUTS:
+           blocks : An iterable of [dateTime, Az, El, firstRow] lists, as from
+           readTrajectoryBlocks.
+
+   OPTIONAL INPUTS:
+           limits, checkSoftLimits : As for validateTrajectory.  The steps and slew
+           rates across blocks are checked too, so the points that are actually sent
+           are checked even after decimateTrajectoryBlocks has dropped some.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A generator of [dateTime, Az, El, firstRow, commandBuffer, offsets] lists
+   where commandBuffer and offsets are from QPTEncoder.compileTrajectory.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: None
+
+   RESTRICTIONS: Raises TrajectoryError if a block has a point that fails the checks.
+   The report row numbers are those of the block's points in the file only when no
+   points have been dropped.
+
+   EXAMPLE: for block in compileTrajectoryBlocks(readTrajectoryBlocks(filename)) :
+              commandBuffer, offsets = block[4:]
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Added the limits and the checks across blocks on October 18, 2026
+
+  """
+
+  import QPTEncoder as QPTE
+
+  previous = None
+  for dateTime, Az, El, firstRow in blocks :
+    report = validateTrajectory(Az, El, dateTime, limits, checkSoftLimits, firstRow,
+                                previous)
+    if(not report.isValid()) :
+      raise TrajectoryError(report)
+    #End of if statement - if(not report.isValid()) :
+    if(len(Az) > 0) :
+      previous = (Az[-1], El[-1], dateTime[-1])
+    #End of if statement - if(len(Az) > 0) :
+    commandBuffer, offsets = QPTE.compileTrajectory(Az, El)
+    yield [dateTime, Az, El, firstRow, commandBuffer, offsets]
+  #End of for loop - for dateTime, Az, El, firstRow in blocks :
+
+#End of the function compileTrajectoryBlocks.py
+
+#################################################################################
+
+#################################################################################
+
+class Prefetcher :
+  """
+
+   NAME: Prefetcher(iterable, depth = 2)
+
+   PURPOSE:  Run an iterable on a background thread, keeping up to depth items ready
+   ahead of the one being used.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Made by streamTrajectory.
+
+   INPUTS:
+           iterable : The iterable to run ahead of the reader.
+
+   OPTIONAL INPUTS:
+           depth : The most items held ready.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: The object, which is iterated over in place of iterable.  An exception
+   raised by iterable is raised again by the iteration, after the items ahead of it.
+
+   OPTIONAL OUTPUTS: None
+
+   SIDE EFFECTS: A daemon thread runs until iterable is used up or close is called.
+
+   RESTRICTIONS: None
+
+   EXAMPLE: for block in Prefetcher(readTrajectoryBlocks(filename)) :
+              send(block)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+
+  """
+
+  def __init__(self, iterable, depth = 2) :
+    self.items = queue.Queue(maxsize = depth)
+    self.stopEvent = threading.Event()
+    self.thread = threading.Thread(target = self.run, args = (iterable,),
+                                   name = 'QPTPrefetcher', daemon = True)
+    self.thread.start()
+
+  def __enter__(self) :
+    return self
+
+  def __exit__(self, excType, excValue, traceback) :
+    self.close()
+
+  def put(self, item) :
+    """Put an item on the queue, giving up if close is called while waiting."""
+    while(not self.stopEvent.is_set()) :
+      try :
+        self.items.put(item, timeout = 0.1)
+        return True
+      except queue.Full :
+        continue
+      #End of try-except clause.
+    #End of while loop - while(not self.stopEvent.is_set()) :
+
+    return False
+
+  def run(self, iterable) :
+    try :
+      for item in iterable :
+        if(not self.put(('item', item))) :
+          return
+        #End of if statement - if(not self.put(('item', item))) :
+      #End of for loop - for item in iterable :
+    except Exception as error :
+      self.put(('error', error))
+      return
+    #End of try-except clause.
+
+    self.put(('done', None))
+
+  def __iter__(self) :
+    while(True) :
+      kind, item = self.items.get()
+      if(kind == 'done') :
+        return
+      elif(kind == 'error') :
+        raise item
+      #End of if-elif clause.
+      yield item
+    #End of while loop - while(True) :
+
+  def close(self) :
+    """Stop the background thread early."""
+    self.stopEvent.set()
+    self.thread.join()
+
+#End of the class Prefetcher.py
+
+#################################################################################
+
+#################################################################################
+
+def streamTrajectory(filename, blockSize = trajectoryBlockSize, depth = 2, decimation = None,
+                     limits = None, checkSoftLimits = True) :
+  """
+
+   NAME: streamTrajectory(filename, blockSize = trajectoryBlockSize, depth = 2,
+                          decimation = None, limits = None, checkSoftLimits = True)
+
+   PURPOSE:  Read, check and compile a trajectory file block by block on a background
+   thread.
+
+   CATEGORY: Machine Control.
+
+   CALLING SEQUENCE:  Called by moveToEnteredCoordsFile.
+
+   INPUTS:
+           filename : The trajectory file.
+
+   OPTIONAL INPUTS:
+           blockSize : The number of rows in each block.
+           depth : The number of blocks made ready ahead of the one being sent.
+           decimation : A dictionary.  If this is given the points that do not need to
+           be sent are dropped with decimateTrajectoryBlocks, using
+           decimation['maxError'] if it is there, and the counts are kept in it.
+           limits, checkSoftLimits : As for validateTrajectory.  The decimation keeps
+           the points needed to stay within limits.maxStep and limits.maxSlewRate, and
+           the points left are checked again before they are compiled.
+
+   KEYWORD PARAMETERS: None
+
+   OUTPUTS: A Prefetcher of the compileTrajectoryBlocks lists.
+
+   OPTIONAL OUTPUTS: The decimation dictionary is filled in as the blocks are read.
+
+   SIDE EFFECTS: A background thread reads the file.
+
+   RESTRICTIONS: A block that fails the checks raises TrajectoryError from the
+   iteration, after the blocks ahead of it.
+
+   EXAMPLE: with streamTrajectory(filename) as blocks :
+              for dateTime, Az, El, firstRow, commandBuffer, offsets in blocks :
+                pipeline.sendFrames(commandBuffer, offsets)
+
+   MODIFICATION HISTORY:
+             Written by jdw on October 18, 2026
+             Added the decimation on October 18, 2026
+             Added the limits on October 18, 2026
+
+  """
+
+  blocks = readTrajectoryBlocks(filename, blockSize)
+  if(decimation is not None) :
+    blocks = decimateTrajectoryBlocks(blocks, decimation.get('maxError'), decimation,
+                                      limits)
+  #End of if statement - if(decimation is not None) :
+
+  return Prefetcher(compileTrajectoryBlocks(blocks, limits, checkSoftLimits), depth)
+
+#End of the function streamTrajectory.py
+
+#################################################################################
+
+#################################################################################
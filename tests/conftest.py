@@ -0,0 +1,7 @@
+#The QPT modules live at the top of the repository rather than in a package, so put the
+#repository on the path for the tests.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
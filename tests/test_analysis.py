@@ -0,0 +1,56 @@
+#Tests for the fault analysis of logged status bytes.
+
+import numpy as np
+
+import QPTAnalysis as QPTAn
+from QPTFunctions import maskOL, maskTO, maskUHL, maskDHL, maskEXEC
+from QPTTelemetry import telemetryDtype
+
+#Eight records ten time units apart.  Pan OL is set twice, the second time until the end of
+#the log, pan TO once inside the first OL run, tilt UHL only in the first record, tilt DHL
+#the whole time and EXEC only in the last record.
+times = np.arange(8)*10
+panStatus = [0, maskOL, maskOL | maskTO, 0, 0, maskOL, maskOL, maskOL]
+tiltStatus = [maskUHL | maskDHL] + 7*[maskDHL]
+genStatus = 7*[0] + [maskEXEC]
+
+
+def test_counts_durations_and_times() :
+  report = QPTAn.analyzeFaults(panStatus, tiltStatus, genStatus, times)
+
+  #The run still open at the end lasts to the last record.
+  assert report['panOL'] == {'count' : 2, 'records' : 5, 'duration' : 20 + 20,
+                             'first' : 10, 'last' : 70}
+  assert report['panTO'] == {'count' : 1, 'records' : 1, 'duration' : 10,
+                             'first' : 20, 'last' : 20}
+  assert report['tiltUHL'] == {'count' : 1, 'records' : 1, 'duration' : 10,
+                               'first' : 0, 'last' : 0}
+  assert report['tiltDHL'] == {'count' : 1, 'records' : 8, 'duration' : 70,
+                               'first' : 0, 'last' : 70}
+  assert report['PRF'] == {'count' : 0, 'records' : 0, 'duration' : 0, 'first' : None,
+                           'last' : None}
+  assert set(report) == set(name for name, byteName, mask in QPTAn.faultFlags)
+
+  #Without times the record numbers are used.
+  report = QPTAn.analyzeFaults(panStatus, tiltStatus, genStatus,
+                               flags = [('EXEC', 'gen', maskEXEC)])
+  assert report == {'EXEC' : {'count' : 1, 'records' : 1, 'duration' : 0, 'first' : 7,
+                              'last' : 7}}
+
+  report = QPTAn.analyzeFaults([], [], [])
+  assert report['panOL']['count'] == 0 and report['panOL']['first'] is None
+
+
+def test_telemetry_in_seconds() :
+  records = np.zeros(len(times), dtype = telemetryDtype)
+  records['wallTime'] = 1700000000*10**9 + times*10**9
+  records['panStatus'] = panStatus
+  records['tiltStatus'] = tiltStatus
+  records['generalStatus'] = genStatus
+
+  report = QPTAn.analyzeTelemetry(records)
+  assert report['panOL']['count'] == 2
+  assert report['panOL']['duration'] == 40.0
+  assert report['panOL']['first'] == 1700000010*10**9
+  assert report['panOL']['last'] == 1700000070*10**9
+  assert report['tiltDHL']['duration'] == 70.0
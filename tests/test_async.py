@@ -0,0 +1,162 @@
+#Tests for the asyncio protocol and coroutines, run on a made up transport that answers the
+#way the controller does.
+
+import asyncio
+import struct
+import sys
+import types
+
+import pytest
+
+import QPTAsync as QPTA
+import QPTDecoder as QPTD
+import QPTEncoder as QPTE
+import QPTTrajectory as QPTTr
+from QPTFunctions import NAK
+from test_decoder import getReply, getStatusReply
+
+
+class FakeTransport :
+  """Hands the protocol a reply to every command it writes, from the event loop.  A move
+  is answered by echoing its destination.  The commands numbered in nakAt are NAK'ed and
+  the ones in dropAt get no reply."""
+
+  def __init__(self, protocol, nakAt = (), dropAt = ()) :
+    self.protocol = protocol
+    self.nakAt = set(nakAt)
+    self.dropAt = set(dropAt)
+    self.decoder = QPTD.FrameDecoder()
+    self.sent = []
+
+  def write(self, Command) :
+    for frame in self.decoder.feed(Command) :
+      self.sent.append(frame)
+      if(len(self.sent) in self.dropAt) :
+        continue
+      #End of if statement - if(len(self.sent) in self.dropAt) :
+      if(len(self.sent) in self.nakAt) :
+        reply = getReply(frame.command, b'', start = NAK)
+      elif(frame.command == QPTE.statusJogNumber) :
+        reply = getStatusReply(12, -34)
+      else :
+        reply = getReply(frame.command, frame.data[0:4] + b'\x00\x00\x00')
+      #End of if-else clause.
+
+      #Split the reply so the protocol has to put it back together.
+      loop = asyncio.get_running_loop()
+      loop.call_soon(self.protocol.data_received, reply[:3])
+      loop.call_soon(self.protocol.data_received, reply[3:])
+    #End of for loop - for frame in self.decoder.feed(Command) :
+
+
+def getProtocol(**keywords) :
+  """Make a QPTProtocol connected to a FakeTransport.  Must be called on the event loop."""
+  protocol = QPTA.QPTProtocol()
+  transport = FakeTransport(protocol, **keywords)
+  protocol.connection_made(transport)
+  return protocol, transport
+
+
+def getPARAMS(Azimuth = 0.0, Elevation = 0.0) :
+  return types.SimpleNamespace(Azimuth = Azimuth, Elevation = Elevation,
+                               overrideSoftLimits = False)
+
+
+def test_data_received_hands_replies_out_in_order() :
+  async def run() :
+    loop = asyncio.get_running_loop()
+    protocol = QPTA.QPTProtocol()
+    first, second = loop.create_future(), loop.create_future()
+    protocol.waiters.extend([(0x31, first), (0x36, second)])
+
+    #A stale reply to some other command is thrown away, and a reply can come in
+    #pieces and several to a chunk.
+    stream = getReply(0x35, b'') + getStatusReply(5, 6) + getReply(0x36, b'')
+    protocol.data_received(stream[:7])
+    protocol.data_received(stream[7:])
+    assert first.result().command == 0x31 and second.result().command == 0x36
+    assert len(protocol.waiters) == 0
+  #End of function run.
+
+  asyncio.run(run())
+
+
+def test_move_syncs_first_then_sends() :
+  async def run() :
+    protocol, transport = getProtocol()
+    reply = await QPTA.moveToEnteredCoords(getPARAMS(12.3, -4.5), protocol)
+    assert reply.isAck() and reply.data[0:4] == struct.pack('<hh', 123, -45)
+    assert [frame.command for frame in transport.sent] == [QPTE.statusJogNumber, 0x33]
+    assert protocol.lastStatus is not None and not protocol.needsSync()
+
+    #Synched up, so the next command goes straight out.
+    await QPTA.moveToHome(getPARAMS(), protocol)
+    assert [frame.command for frame in transport.sent][2:] == [0x36]
+  #End of function run.
+
+  asyncio.run(run())
+
+
+def test_nak_resyncs_and_resends() :
+  async def run() :
+    protocol, transport = getProtocol(nakAt = (2,))
+    reply = await QPTA.moveToZeroZero(getPARAMS(), protocol)
+    assert reply.isAck()
+    assert [frame.command for frame in transport.sent] == [0x31, 0x35, 0x31, 0x35]
+  #End of function run.
+
+  asyncio.run(run())
+
+
+def test_missing_reply_times_out(monkeypatch) :
+  monkeypatch.setitem(QPTA.replyTimeout, 0x36, 0.05)
+
+  async def run() :
+    protocol, transport = getProtocol(dropAt = (2,))
+    reply = await QPTA.moveToHome(getPARAMS(), protocol)
+    assert reply.isAck()
+    assert [frame.command for frame in transport.sent] == [0x31, 0x36, 0x31, 0x36]
+  #End of function run.
+
+  asyncio.run(run())
+
+
+def test_out_of_range_move_is_not_sent() :
+  async def run() :
+    protocol, transport = getProtocol()
+    with pytest.raises(QPTTr.TrajectoryError) as error :
+      await QPTA.moveToEnteredCoords(getPARAMS(400.0, 0.0), protocol)
+    #End of with statement.
+    assert 'azimuthRange' in error.value.report.violations
+    assert transport.sent == []
+
+    limits = QPTTr.TrajectoryLimits(softElMax = 100)
+    with pytest.raises(QPTTr.TrajectoryError) :
+      await QPTA.moveToEnteredCoords(getPARAMS(0.0, 20.0), protocol, limits)
+    #End of with statement.
+    assert transport.sent == []
+  #End of function run.
+
+  asyncio.run(run())
+
+
+def test_closed_port_fails_the_waiters() :
+  async def run() :
+    protocol, transport = getProtocol(dropAt = (1,))
+    task = asyncio.ensure_future(protocol.exchange(QPTE.getStatusJogFrame()))
+    await asyncio.sleep(0)
+    protocol.connection_lost(None)
+    with pytest.raises(ConnectionError) :
+      await task
+    #End of with statement.
+    assert protocol.closed.done()
+  #End of function run.
+
+  asyncio.run(run())
+
+
+def test_open_connection_names_the_missing_package(monkeypatch) :
+  monkeypatch.setitem(sys.modules, 'serial_asyncio', None)
+  with pytest.raises(ImportError, match = 'pyserial-asyncio') :
+    asyncio.run(QPTA.openConnection())
+  #End of with statement.
@@ -0,0 +1,67 @@
+#Tests for recording the serial traffic and playing it back.
+
+import pytest
+
+import QPTCapture as QPTC
+import QPTEncoder as QPTE
+import QPTSession as QPTS
+from test_decoder import getStatusReply
+from test_telemetry import FakeSerial
+
+
+def test_capture_and_replay(tmp_path) :
+  filename = str(tmp_path/'run.qptc')
+  ser = FakeSerial()
+  session = QPTS.QPTSession(ser = ser, capture = filename)
+  for pan in (10, -20, 30) :
+    ser.pan = pan
+    assert session.sendCommand(QPTE.getStatusJogFrame()).isAck()
+  #End of for loop - for pan in (10, -20, 30) :
+
+  #Anything other than read and write goes straight through to the port.
+  session.ser.timeout = 0.25
+  assert ser.timeout == 0.25
+  session.ser.close()
+
+  chunks = QPTC.readCapture(filename)
+  written = b''.join(data for chunkTime, direction, data in chunks
+                     if direction == QPTC.directionWrite)
+  read = b''.join(data for chunkTime, direction, data in chunks
+                  if direction == QPTC.directionRead)
+  assert written == 3*QPTE.getStatusJogFrame()
+  assert read == getStatusReply(10, 0) + getStatusReply(-20, 0) + getStatusReply(30, 0)
+  times = [chunkTime for chunkTime, direction, data in chunks]
+  assert times == sorted(times)
+
+  #The replay decodes the same replies the session saw.
+  pans = []
+  summary = QPTC.replayCapture(filename, onStatus = lambda status : pans.append(status.pan))
+  assert pans == [10, -20, 30]
+  assert summary['numStatus'] == summary['numFrames'] == 3
+  assert summary['numWritten'] == len(written) and summary['numBytes'] == len(read)
+  assert summary['numLRCErrors'] == 0
+
+
+def test_capture_appends_and_drops_a_cut_off_chunk(tmp_path) :
+  filename = str(tmp_path/'run.qptc')
+  for pan in (1, 2) :
+    ser = QPTC.CaptureSerial(FakeSerial(pan = pan), filename)
+    ser.write(QPTE.getStatusJogFrame())
+    ser.read(100)
+    ser.close()
+  #End of for loop - for pan in (1, 2) :
+
+  #A chunk cut off by a crash is left out.
+  with open(filename, 'ab') as f :
+    f.write(QPTC.chunkHeader.pack(0, QPTC.directionRead, 50) + b'\x02\x31')
+  #End of with statement.
+  assert len(QPTC.readCapture(filename)) == 4
+
+  pans = []
+  QPTC.replayCapture(filename, onStatus = lambda status : pans.append(status.pan))
+  assert pans == [1, 2]
+
+  (tmp_path/'other.qptc').write_bytes(b'QPTT\x01\x00')
+  with pytest.raises(ValueError) :
+    QPTC.readCapture(str(tmp_path/'other.qptc'))
+  #End of with statement.
@@ -0,0 +1,74 @@
+#Tests for the incremental frame decoder and the status decoding.
+
+import struct
+
+import QPTDecoder as QPTD
+import QPTStatus as QPTSt
+from QPTFunctions import ACK, NAK, ETX, getCheckSum
+
+
+def getReply(CommandNumber, data, start = ACK) :
+  """Build a reply frame the way the controller does, escapes and all."""
+  import QPTEncoder as QPTE
+
+  body = bytes((CommandNumber,)) + bytes(data)
+  escaped = b''.join(QPTE.getEscapedByte(byte) for byte in body + bytes((getCheckSum(body),)))
+  return bytes((start,)) + escaped + bytes((ETX,))
+
+
+def getStatusReply(pan, tilt, panStatus = 0, tiltStatus = 0, genStatus = 0) :
+  return getReply(0x31, struct.pack('<hhBBB', pan, tilt, panStatus, tiltStatus, genStatus))
+
+
+def test_whole_reply() :
+  frames = QPTD.FrameDecoder().feed(getStatusReply(1234, -567))
+  assert len(frames) == 1
+  assert frames[0].isAck() and frames[0].command == 0x31
+
+
+def test_reply_fed_one_byte_at_a_time() :
+  decoder = QPTD.FrameDecoder()
+  stream = getStatusReply(2, 3) + getStatusReply(-6, 0x1502)
+  frames = []
+  for byte in stream :
+    frames.extend(decoder.feed(bytes((byte,))))
+  #End of for loop - for byte in stream :
+  assert [QPTSt.decodeStatus(frame).pan for frame in frames] == [2, -6]
+  assert not decoder.hasPartialFrame()
+
+
+def test_garbage_is_skipped() :
+  decoder = QPTD.FrameDecoder()
+  frames = decoder.feed(b'\x00\x41\x42' + getStatusReply(10, 20) + b'\x99')
+  assert len(frames) == 1
+  assert decoder.numDiscarded == 4
+
+
+def test_bad_lrc_is_counted() :
+  reply = bytearray(getStatusReply(10, 20))
+  reply[-2] ^= 0x40
+  decoder = QPTD.FrameDecoder()
+  assert decoder.feed(bytes(reply)) == []
+  assert decoder.numLRCErrors == 1
+
+
+def test_nak() :
+  frame = QPTD.FrameDecoder().feed(getReply(0x33, b'', start = NAK))[0]
+  assert frame.isNak()
+  assert QPTSt.decodeStatus(frame) is None
+
+
+def test_status_flags() :
+  status = QPTSt.decodeStatus(QPTD.FrameDecoder().feed(
+    getStatusReply(-3600, 1800, QPTSt.PanFlag.CWHL, 0, QPTSt.GeneralFlag.EXEC))[0])
+  assert (status.pan, status.tilt) == (-3600, 1800)
+  assert status.panFlags == QPTSt.PanFlag.CWHL
+  assert status.generalFlags == QPTSt.GeneralFlag.EXEC
+  assert status.hasFault()
+  assert not status.isMoving()
+
+
+def test_flag_tables_cover_every_byte() :
+  for byte in range(256) :
+    assert int(QPTSt.panFlagTable[byte]) == byte & sum(int(flag) for flag in QPTSt.PanFlag)
+  #End of for loop - for byte in range(256) :
@@ -0,0 +1,91 @@
+#Tests for the frame encoder and the LRC.
+
+import itertools
+import struct
+
+import numpy as np
+import pytest
+
+import QPTDecoder as QPTD
+import QPTEncoder as QPTE
+from QPTFunctions import STX, ETX, ACK, NAK, ESC, getCheckSum, CheckSum
+
+controlCharacters = (STX, ETX, ACK, NAK, ESC)
+
+
+def test_checksum_is_xor() :
+  assert getCheckSum([]) == 0
+  assert getCheckSum([0x33, 0x01, 0x02]) == 0x33 ^ 0x01 ^ 0x02
+  assert getCheckSum(bytes(range(256))) == 0
+
+
+def test_incremental_checksum_matches() :
+  values = [0x33, 0x10, 0xFE, 0x02, 0x80]
+  checkSum = CheckSum()
+  for value in values :
+    checkSum.add(value)
+  #End of for loop - for value in values :
+  assert checkSum.LRC == getCheckSum(values)
+
+
+@pytest.mark.parametrize('value', controlCharacters)
+def test_control_characters_are_escaped(value) :
+  assert QPTE.getEscapedByte(value) == bytes((ESC, value | 0x80))
+
+
+def test_other_bytes_are_not_escaped() :
+  for value in set(range(256)) - set(controlCharacters) :
+    assert QPTE.getEscapedByte(value) == bytes((value,))
+  #End of for loop.
+
+
+def test_frame_body_has_no_control_characters() :
+  #Only the STX and ETX at the ends may be control characters.
+  for Az, El in itertools.product((-3600, -1, 0, 2, 3, 6, 21, 27, 256 + 2, 3600),
+                                  repeat = 2) :
+    frame = QPTE.getPositionFrame(Az, El)
+    assert frame[0] == STX and frame[-1] == ETX
+    assert not any(byte in (STX, ETX, ACK, NAK) for byte in frame[1:-1])
+  #End of for loop.
+
+
+def test_position_frame_round_trip() :
+  #Every coordinate whose low or high byte is a control character, and some others.
+  values = sorted(set(value - 0x10000 if value > 0x7FFF else value
+                      for low, high in itertools.product(list(controlCharacters) + [0, 0x7F, 0xFF],
+                                                         repeat = 2)
+                      for value in [low | (high << 8)]))
+  decoder = QPTD.FrameDecoder()
+  for Az in values :
+    El = -Az
+    frames = decoder.feed(QPTE.getPositionFrame(Az, El))
+    assert len(frames) == 1
+    assert frames[0].command == QPTE.moveToEnteredCoordsNumber
+    assert struct.unpack('<hh', frames[0].data) == (Az, El)
+  #End of for loop - for Az in values :
+  assert decoder.numLRCErrors == 0
+
+
+def test_compiled_trajectory_matches_single_frames() :
+  rng = np.random.default_rng(1)
+  Az = rng.integers(-3600, 3601, 2000)
+  El = rng.integers(-1800, 1801, 2000)
+  commandBuffer, offsets = QPTE.compileTrajectory(Az, El)
+  assert len(offsets) == len(Az) + 1
+  for i in range(len(Az)) :
+    assert bytes(commandBuffer[offsets[i]:offsets[i + 1]]) == \
+      bytes(QPTE.getPositionFrame(int(Az[i]), int(El[i])))
+  #End of for loop - for i in range(len(Az)) :
+
+
+def test_jog_byte() :
+  assert QPTE.getJogByte(0) == 0
+  assert QPTE.getJogByte(40) == (40 << 1) | 1
+  assert QPTE.getJogByte(-40) == 40 << 1
+  assert QPTE.getJogByte(500) == (127 << 1) | 1
+
+
+def test_status_jog_frame_round_trip() :
+  frame = QPTD.FrameDecoder().feed(QPTE.getStatusJogFrame(QPTE.statusJogSTOP, 3, -2))[0]
+  assert frame.command == QPTE.statusJogNumber
+  assert bytes(frame.data) == bytes((QPTE.statusJogSTOP, (3 << 1) | 1, 2 << 1, 0, 0))
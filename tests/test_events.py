@@ -0,0 +1,78 @@
+#Tests for turning the status replies into flag change events.
+
+import asyncio
+import threading
+
+import QPTDecoder as QPTD
+import QPTEvents as QPTEv
+import QPTStatus as QPTSt
+from test_decoder import getReply, getStatusReply
+
+
+def getFrame(panStatus = 0, tiltStatus = 0, genStatus = 0) :
+  return QPTD.FrameDecoder().feed(getStatusReply(0, 0, panStatus, tiltStatus, genStatus))[0]
+
+
+def getChanges(events) :
+  return [(event.axis, event.flag, event.asserted) for event in events]
+
+
+def test_only_the_edges_make_events() :
+  engine = QPTEv.EventEngine()
+  assert engine.feedFrame(getFrame()) == []
+
+  #Flags already set in the first reply show up as asserted.
+  pan = QPTSt.PanFlag.CWHL | QPTSt.PanFlag.TO
+  events = engine.feedFrame(getFrame(pan, 0, QPTSt.GeneralFlag.EXEC))
+  assert sorted(getChanges(events)) == sorted([('pan', QPTSt.PanFlag.CWHL, True),
+                                               ('pan', QPTSt.PanFlag.TO, True),
+                                               ('gen', QPTSt.GeneralFlag.EXEC, True)])
+  assert events[0].status.panFlags == pan
+
+  #A flag that stays set is not reported again.
+  assert engine.feedFrame(getFrame(pan, 0, QPTSt.GeneralFlag.EXEC)) == []
+
+  events = engine.feedFrame(getFrame(QPTSt.PanFlag.CWHL, QPTSt.TiltFlag.UHL,
+                                     QPTSt.GeneralFlag.EXEC))
+  assert sorted(getChanges(events)) == sorted([('pan', QPTSt.PanFlag.TO, False),
+                                               ('tilt', QPTSt.TiltFlag.UHL, True)])
+  assert sorted(event.getMessage() for event in events) == ['pan TO cleared',
+                                                          'tilt UHL asserted']
+
+  #Replies that hold no status leave the last status bytes alone.
+  assert engine.feedFrame(QPTD.FrameDecoder().feed(getReply(0x36, b''))[0]) == []
+  assert engine.feedFrame(getFrame()) != []
+  assert engine.numEvents == 3 + 2 + 3
+
+
+def test_subscribers_get_every_event() :
+  engine = QPTEv.EventEngine()
+  received = []
+  done = threading.Event()
+
+  def callback(event) :
+    received.append(event.getMessage())
+    if(len(received) == 2) :
+      done.set()
+    #End of if statement - if(len(received) == 2) :
+  #End of function callback.
+
+  subscriber = engine.subscribe(callback)
+
+  async def run() :
+    asyncSubscriber = engine.subscribeAsync()
+    engine.feedFrame(getFrame(QPTSt.PanFlag.OL))
+    engine.feedFrame(getFrame())
+    engine.unsubscribe(asyncSubscriber)
+    return [event.getMessage() async for event in asyncSubscriber]
+  #End of function run.
+
+  assert asyncio.run(run()) == ['pan OL asserted', 'pan OL cleared']
+  assert done.wait(2)
+  assert received == ['pan OL asserted', 'pan OL cleared']
+
+  #Once unsubscribed, nothing more is sent.
+  engine.unsubscribe(subscriber)
+  engine.feedFrame(getFrame(QPTSt.PanFlag.OL))
+  subscriber.thread.join(2)
+  assert len(received) == 2
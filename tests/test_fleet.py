@@ -0,0 +1,50 @@
+#Tests for the fleet manager.
+
+import pytest
+
+import QPTDecoder as QPTD
+import QPTFleet as QPTFl
+import QPTSession as QPTS
+
+
+class FakeSession :
+  """Stands in for QPTSession.  Opening the port called 'bad' fails."""
+
+  opened = []
+
+  def __init__(self, port = None) :
+    if(port == 'bad') :
+      raise OSError('No such port.')
+    #End of if statement - if(port == 'bad') :
+    self.port = port
+    self.closed = False
+    self.lastRoundTrip = None
+    FakeSession.opened.append(self)
+
+  def close(self) :
+    self.closed = True
+
+
+def test_ports_closed_when_one_fails(monkeypatch) :
+  monkeypatch.setattr(QPTS, 'QPTSession', FakeSession)
+  FakeSession.opened = []
+  with pytest.raises(OSError) :
+    QPTFl.Fleet({'a' : 'port0', 'b' : 'port1', 'c' : 'bad'})
+  #End of with statement.
+  assert len(FakeSession.opened) == 2
+  assert all(session.closed for session in FakeSession.opened)
+
+
+def test_latency_only_for_ack(monkeypatch) :
+  monkeypatch.setattr(QPTS, 'QPTSession', FakeSession)
+  fleet = QPTFl.Fleet({'a' : 'port0'}, telemetrySize = 1)
+  fleet.sessions['a'].lastRoundTrip = 0.25
+
+  fleet.record('a', QPTD.Frame(0x15, 0x33, b''))
+  assert fleet.latency['a'].getSummary()['count'] == 0
+
+  fleet.record('a', QPTD.Frame(0x06, 0x33, b''))
+  assert fleet.latency['a'].getSummary()['count'] == 1
+
+  #The telemetry queue holds one entry, so the second reply was dropped.
+  assert fleet.numDropped == 1
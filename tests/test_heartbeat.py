@@ -0,0 +1,97 @@
+#Tests for the heartbeat thread.
+
+import time
+
+import QPTEncoder as QPTE
+import QPTHeartbeat as QPTH
+import QPTMetrics as QPTM
+
+
+class FailingSession :
+  """A session whose status commands fail the first few times."""
+
+  def __init__(self, numFailures) :
+    self.numFailures = numFailures
+    self.numCalls = 0
+
+  def sendCommand(self, Command) :
+    self.numCalls += 1
+    if(self.numCalls <= self.numFailures) :
+      raise OSError('The port went away.')
+    #End of if statement.
+    return None
+
+
+def test_heartbeat_survives_errors(capsys) :
+  session = FailingSession(2)
+  metrics = QPTM.Metrics()
+  heartbeat = QPTH.Heartbeat(session, period = QPTH.minimumPeriod, metrics = metrics)
+  heartbeat.start()
+  time.sleep(5*QPTH.minimumPeriod)
+  assert heartbeat.is_alive()
+
+  #Queued commands still go out after the errors.
+  assert heartbeat.submit(b'\x02\x36\x36\x03').result(timeout = 2) is None
+  heartbeat.stop(timeout = 2)
+
+  assert heartbeat.numErrors == 2
+  assert isinstance(heartbeat.lastError, OSError)
+  assert heartbeat.numHeartbeats > 2
+
+  #The errors are counted, not printed from the thread.
+  assert metrics.counters[('heartbeatErrors', QPTE.statusJogNumber)] == 2
+  assert capsys.readouterr().err == ''
+
+
+def test_heartbeat_survives_bad_on_status() :
+  import QPTDecoder as QPTD
+
+  class Session :
+    def sendCommand(self, Command) :
+      return QPTD.Frame(0x06, 0x31, b'\x00'*7)
+
+  def onStatus(reply) :
+    raise ValueError('Bad hook.')
+
+  heartbeat = QPTH.Heartbeat(Session(), period = QPTH.minimumPeriod, onStatus = onStatus,
+                             metrics = QPTM.Metrics())
+  heartbeat.start()
+  time.sleep(3*QPTH.minimumPeriod)
+  heartbeat.stop(timeout = 2)
+  assert heartbeat.numErrors >= 2
+
+
+class RecordingSession :
+  """Keeps every command sent and when it was sent."""
+
+  def __init__(self) :
+    self.sent = []
+
+  def sendCommand(self, Command) :
+    self.sent.append((time.monotonic(), bytes(Command)))
+    return None
+
+
+def test_heartbeat_sends_full_status_frame() :
+  session = RecordingSession()
+  heartbeat = QPTH.Heartbeat(session, period = QPTH.minimumPeriod)
+  heartbeat.start()
+  time.sleep(2*QPTH.minimumPeriod)
+  heartbeat.stop(timeout = 2)
+  assert session.sent[0][1] == QPTE.getStatusJogFrame()
+
+
+def test_every_write_is_spaced_out() :
+  session = RecordingSession()
+  heartbeat = QPTH.Heartbeat(session, period = 0.3)
+  heartbeat.start()
+  futures = [heartbeat.submit(QPTE.getFrame(0x36)) for i in range(4)]
+  for future in futures :
+    future.result(timeout = 5)
+  #End of for loop - for future in futures :
+  heartbeat.stop(timeout = 2)
+
+  #The queued commands do not go out on the heels of a status command or of each other.
+  times = [sendTime for sendTime, Command in session.sent]
+  assert len(times) >= 5
+  assert min(b - a for a, b in zip(times, times[1:])) >= QPTH.minimumPeriod - 0.005
@@ -0,0 +1,108 @@
+#Tests for the command pipeline.
+
+import time
+
+import QPTDecoder as QPTD
+import QPTEncoder as QPTE
+import QPTMetrics as QPTM
+import QPTPipeline as QPTP
+import QPTSession as QPTS
+from QPTFunctions import NAK
+from test_decoder import getReply
+
+
+class FakeController :
+  """Answers every command the way the controller does.  A move is answered by echoing
+  its destination.  The commands numbered in nakAt are NAK'ed the first time."""
+
+  def __init__(self, nakAt = ()) :
+    self.nakAt = set(nakAt)
+    self.decoder = QPTD.FrameDecoder()
+    self.numMoves = 0
+    self.timeout = 1
+    self.buffer = b''
+    self.writeTimes = []
+
+  @property
+  def in_waiting(self) :
+    return len(self.buffer)
+
+  def write(self, Command) :
+    self.writeTimes.append(time.monotonic())
+    for frame in self.decoder.feed(Command) :
+      if(frame.command == QPTP.moveToEnteredCoordsNumber) :
+        self.numMoves += 1
+        if(self.numMoves in self.nakAt) :
+          self.nakAt.discard(self.numMoves)
+          self.buffer += getReply(frame.command, b'', start = NAK)
+          continue
+        #End of if statement - if(self.numMoves in self.nakAt) :
+      #End of if statement.
+      self.buffer += getReply(frame.command, frame.data[0:4] + b'\x00\x00\x00')
+    #End of for loop - for frame in self.decoder.feed(Command) :
+    return len(Command)
+
+  def read(self, numBytes) :
+    chunk = self.buffer[:numBytes]
+    self.buffer = self.buffer[numBytes:]
+    return chunk
+
+  def reset_input_buffer(self) :
+    self.buffer = b''
+
+
+def getMoves(numMoves) :
+  Az = list(range(0, 10*numMoves, 10))
+  El = list(range(numMoves))
+  return QPTE.compileTrajectory(Az, El)
+
+
+def test_pipeline_keeps_metrics() :
+  metrics = QPTM.Metrics()
+  session = QPTS.QPTSession(ser = FakeController(), metrics = metrics)
+  commandBuffer, offsets = getMoves(10)
+  pipeline = QPTP.CommandPipeline(session, window = 4)
+  pipeline.sendFrames(commandBuffer, offsets)
+
+  number = QPTP.moveToEnteredCoordsNumber
+  assert pipeline.numCompleted == 10
+  assert metrics.counters[('commands', number)] == 10
+  assert metrics.counters[('bytesWritten', number)] == len(commandBuffer)
+  assert metrics.counters[('bytesRead', number)] > 0
+  for phase in ('write', 'frame') :
+    assert metrics.histograms[(phase, number)].count == 10
+  #End of for loop - for phase in ('write', 'frame') :
+
+  #Replies that came in with an earlier read have no first byte time of their own.
+  assert 1 <= metrics.histograms[('firstByte', number)].count <= 10
+
+
+def test_pipeline_counts_naks_and_retries() :
+  metrics = QPTM.Metrics()
+  session = QPTS.QPTSession(ser = FakeController(nakAt = (3,)), metrics = metrics)
+  commandBuffer, offsets = getMoves(6)
+  pipeline = QPTP.CommandPipeline(session, window = 4)
+  pipeline.sendFrames(commandBuffer, offsets)
+
+  number = QPTP.moveToEnteredCoordsNumber
+  assert pipeline.numCompleted == 6
+  assert metrics.counters[('naks', number)] == 1
+  assert metrics.counters[('retries', number)] == pipeline.numResent
+  assert metrics.counters[('commands', number)] == 6 + pipeline.numResent
+  assert metrics.histograms[('frame', number)].count == 6
+
+
+def test_pipeline_spaces_out_the_writes() :
+  import QPTHeartbeat as QPTH
+
+  ser = FakeController(nakAt = (4,))
+  session = QPTS.QPTSession(ser = ser, metrics = QPTM.Metrics())
+  commandBuffer, offsets = getMoves(6)
+  pipeline = QPTP.CommandPipeline(session, window = 4)
+  assert pipeline.minimumGap == QPTH.minimumPeriod
+  pipeline.sendFrames(commandBuffer, offsets)
+  assert pipeline.numCompleted == 6
+
+  #The window never sends the moves back to back, not even the resends after the sync.
+  gaps = [b - a for a, b in zip(ser.writeTimes, ser.writeTimes[1:])]
+  assert min(gaps) >= QPTH.minimumPeriod - 0.005
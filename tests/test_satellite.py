@@ -0,0 +1,58 @@
+#Tests for the satellite pass prediction and tracking.
+
+import calendar
+import types
+
+import numpy as np
+import pytest
+
+import QPTEncoder as QPTE
+import QPTSatellite as QPTSa
+
+issTLE = ('ISS (ZARYA)',
+          '1 25544U 98067A   20029.54791435  .00001264  00000-0  29621-4 0  9993',
+          '2 25544  51.6456 302.8224 0005281 161.8464 198.2888 15.49166130210875')
+
+
+def getParams() :
+  return types.SimpleNamespace(latitude = 38.9983, longitude = -104.8613,
+                               altitude = 2068.982, overrideSoftLimits = False)
+
+
+def test_find_passes() :
+  pytest.importorskip('sgp4')
+
+  PARAMS = getParams()
+  startTime = calendar.timegm((2020, 1, 29, 12, 0, 0))
+  passes = QPTSa.findPasses([issTLE], PARAMS, startTime)
+  assert len(passes) > 0
+  assert [satPass.riseTime for satPass in passes] == sorted(satPass.riseTime
+                                                            for satPass in passes)
+  for satPass in passes :
+    assert satPass.riseTime < satPass.maxTime < satPass.setTime
+    assert satPass.maxElevation > 10.0
+
+    #The rise and set are interpolated to about where the elevation crosses the mask.
+    El = QPTSa.getLookAngles([issTLE], [satPass.riseTime, satPass.setTime], PARAMS)[1]
+    assert np.allclose(El, 10.0, atol = 1.0)
+  #End of for loop - for satPass in passes :
+
+  #A finer search finds the same passes.
+  finer = QPTSa.findPasses([issTLE], PARAMS, startTime, step = 10.0)
+  assert len(finer) == len(passes)
+  assert np.allclose([satPass.riseTime for satPass in finer],
+                     [satPass.riseTime for satPass in passes], atol = 5.0)
+
+
+def test_track_pass_rounds_the_angles(monkeypatch) :
+  class Scheduler :
+    def run(self, blocks, send) :
+      self.blocks = list(blocks)
+
+  monkeypatch.setattr(QPTSa, 'getPassTrajectory',
+                      lambda *args : (np.array([0.0, 1.0]), np.array([12.36, 12.44]),
+                                      np.array([-3.47, 45.06])))
+  scheduler = Scheduler()
+  QPTSa.trackPass(getParams(), None, issTLE, None, scheduler = scheduler)
+  commandBuffer = scheduler.blocks[0][1]
+  assert commandBuffer == QPTE.compileTrajectory([124, 124], [-35, 451])[0]
@@ -0,0 +1,110 @@
+#Tests for the time tagged trajectory scheduler and its late point policies.  The policies
+#are run on a made up clock, so the send times do not depend on how busy the machine is.
+
+import numpy as np
+import pytest
+
+import QPTScheduler as QPTSc
+
+
+def getBlocks(numPoints, spacing) :
+  """One block of numPoints one byte commands, each holding its point number."""
+  return [(np.arange(numPoints)*spacing, bytes(range(numPoints)), list(range(numPoints + 1)))]
+
+
+class FakeClock :
+  """A clock in nanoseconds that only moves when something sleeps on it."""
+
+  def __init__(self) :
+    self.now = 0
+
+  def clock(self) :
+    return self.now
+
+  def sleep(self, seconds) :
+    self.now += int(round(seconds*1.0e9))
+    return False
+
+
+class Sender :
+  """Records when each point is sent.  The sends of the points in slow take delay
+  seconds on the clock."""
+
+  def __init__(self, clock, slow = (), delay = 0.0) :
+    self.clock = clock
+    self.slow = set(slow)
+    self.delay = delay
+    self.points = []
+    self.times = []
+
+  def __call__(self, Command) :
+    self.points.append(Command[0])
+    self.times.append(self.clock.now*1.0e-9)
+    if(Command[0] in self.slow) :
+      self.clock.sleep(self.delay)
+    #End of if statement - if(Command[0] in self.slow) :
+
+
+def getScheduler(clock, latePolicy = 'catchup', **keywords) :
+  return QPTSc.Scheduler(latePolicy, spinThreshold = 0.0, clock = clock.clock,
+                         sleep = clock.sleep, **keywords)
+
+
+def test_unknown_policy() :
+  with pytest.raises(ValueError) :
+    QPTSc.Scheduler(latePolicy = 'panic')
+  #End of with statement.
+
+
+def test_points_sent_on_time() :
+  clock = FakeClock()
+  sender = Sender(clock)
+  stats = getScheduler(clock).run(getBlocks(10, 0.02), sender)
+  assert sender.points == list(range(10))
+  assert stats.numSent == 10
+  assert max(stats.lateness) == 0
+
+  #The points are spaced out by their time tags, not sent as fast as possible.
+  assert np.allclose(np.diff(sender.times), 0.02)
+
+
+def test_real_clock_sends_every_point() :
+  sender = []
+  stats = QPTSc.Scheduler().run(getBlocks(5, 0.01), sender.append)
+  assert [Command[0] for Command in sender] == list(range(5))
+  assert stats.numSent == 5
+
+
+def test_catchup_sends_every_point() :
+  clock = FakeClock()
+  sender = Sender(clock, slow = range(20), delay = 0.02)
+  stats = getScheduler(clock, 'catchup').run(getBlocks(20, 0.005), sender)
+  assert sender.points == list(range(20))
+  assert stats.numSkipped == 0
+
+
+def test_skip_drops_late_points() :
+  clock = FakeClock()
+  sender = Sender(clock, slow = range(20), delay = 0.02)
+  stats = getScheduler(clock, 'skip').run(getBlocks(20, 0.005), sender)
+  assert stats.numSkipped > 0
+  assert stats.numSent + stats.numSkipped == 20
+
+  #The last point is never skipped, so the head always ends up at the end.
+  assert sender.points[-1] == 19
+
+
+def test_compress_spreads_out_the_backlog() :
+  #The first send holds things up for five points' worth of time.  Catching up sends the
+  #backlog back to back, while compress keeps the points apart.
+  gaps = {}
+  for latePolicy in ('catchup', 'compress') :
+    clock = FakeClock()
+    sender = Sender(clock, slow = (0,), delay = 0.1)
+    getScheduler(clock, latePolicy, compressFactor = 0.5).run(getBlocks(20, 0.02), sender)
+    assert sender.points == list(range(20))
+    gaps[latePolicy] = np.diff(sender.times[1:])
+  #End of for loop - for latePolicy in ('catchup', 'compress') :
+
+  assert gaps['catchup'].min() == 0.0
+  assert gaps['compress'].min() == pytest.approx(0.01)
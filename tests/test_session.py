@@ -0,0 +1,107 @@
+#Tests for the session's sync and for reading the replies.
+
+import time
+
+import QPTDecoder as QPTD
+import QPTEncoder as QPTE
+import QPTFunctions as QPTF
+import QPTSession as QPTS
+from test_decoder import getReply, getStatusReply
+
+statusFrame = bytes((0x02, 0x31, 0x00, 0x00, 0x00, 0x00, 0x00, 0x31, 0x03))
+
+
+class RecordingSerial :
+  """Keeps everything written and answers each Get Status/Jog with a status reply."""
+
+  def __init__(self) :
+    self.timeout = 1
+    self.buffer = b''
+    self.written = []
+
+  @property
+  def in_waiting(self) :
+    return len(self.buffer)
+
+  def write(self, Command) :
+    self.written.append(bytes(Command))
+    self.buffer += getStatusReply(0, 0) if Command[1] == 0x31 else b''
+    return len(Command)
+
+  def read(self, numBytes) :
+    chunk = self.buffer[:numBytes]
+    self.buffer = self.buffer[numBytes:]
+    return chunk
+
+
+def test_simple_status_command_is_full_frame() :
+  assert QPTE.getStatusJogFrame() == statusFrame
+  assert bytes(QPTF.getSimpleStatusCommand()) == statusFrame
+
+
+def test_session_syncs_with_full_frame() :
+  ser = RecordingSerial()
+  session = QPTS.QPTSession(ser = ser)
+  assert session.sync()
+  assert ser.written == [statusFrame]
+
+
+def test_send_command_syncs_with_full_frame(monkeypatch) :
+  monkeypatch.setattr(QPTF, 'writePanTiltValues', lambda *args : None)
+  ser = RecordingSerial()
+  QPTF.sendCommand(None, ser, QPTE.getStatusJogFrame(0, 1, 0))
+  assert ser.written[0] == statusFrame
+
+
+
+class SlowSerial :
+  """Reads like pyserial.  A read for more bytes than are in waits out the whole port
+  timeout before handing back what there is.  numWaits counts those reads."""
+
+  def __init__(self, buffer, timeout = 1.0) :
+    self.buffer = buffer
+    self.timeout = timeout
+    self.numReads = 0
+    self.numWaits = 0
+
+  @property
+  def in_waiting(self) :
+    return len(self.buffer)
+
+  def read(self, numBytes) :
+    self.numReads += 1
+    if(len(self.buffer) < numBytes) :
+      self.numWaits += 1
+      time.sleep(self.timeout)
+    #End of if statement - if(len(self.buffer) < numBytes) :
+    chunk = self.buffer[:numBytes]
+    self.buffer = self.buffer[numBytes:]
+    return chunk
+
+
+def test_read_response_stops_at_etx() :
+  #A stale reply to another command, an escaped reply, the next reply and the start of
+  #one more.
+  ser = SlowSerial(getReply(0x35, b'') + getStatusReply(0x0203, 0x1B) +
+                   getStatusReply(7, 8) + getReply(0x36, b'')[:2])
+  decoder = QPTD.FrameDecoder()
+  reply = QPTF.readResponse(ser, 0x31, decoder)
+  assert reply.command == 0x31 and reply.data[0:4] == bytes((0x03, 0x02, 0x1B, 0x00))
+  assert ser.timeout == 1.0
+
+  #The frame that came in behind it is kept for the next call, without reading again.
+  numReads = ser.numReads
+  reply = QPTF.readResponse(ser, 0x31, decoder)
+  assert reply.data[0:4] == bytes((7, 0, 8, 0))
+  assert ser.numReads == numReads
+
+  #Every read was for bytes that were already in, so none waited on the port timeout.
+  assert ser.numWaits == 0
+
+
+def test_read_response_gives_up_at_reply_timeout() :
+  ser = SlowSerial(getStatusReply(1, 2)[:5], timeout = 5.0)
+  startTime = time.monotonic()
+  assert QPTF.readResponse(ser, 0x31) is None
+  assert time.monotonic() - startTime < 1.0
+  assert ser.timeout == 5.0
@@ -0,0 +1,62 @@
+#Tests for the shared memory status ring.
+
+import os
+
+import pytest
+
+import QPTSharedMemory as QPTSM
+
+
+def getRing(capacity = 4) :
+  return QPTSM.StatusRing('qpt_test_%d' % os.getpid(), capacity)
+
+
+def writeRecords(ring, first, last) :
+  for n in range(first, last) :
+    ring.write(n, 1000 + n, n, -n, 0, 0, 0, 0x31)
+  #End of for loop - for n in range(first, last) :
+
+
+def setSlotSequence(ring, slot, sequence) :
+  offset = QPTSM.ringHeaderDtype.itemsize + slot*QPTSM.slotDtype.itemsize
+  QPTSM.sequenceStruct.pack_into(ring.buffer, offset, sequence)
+
+
+def test_reader_sees_the_newest_records() :
+  with getRing() as ring :
+    reader = QPTSM.StatusRing(ring.sharedMemory.name)
+    assert reader.getLatest() is None
+    writeRecords(ring, 0, 6)
+    assert reader.getSequence() == 6
+    assert reader.getLatest() == (5, 1005, 5, -5, 0, 0, 0, 0x31)
+
+    #Only the last lap of the ring is still there.
+    assert list(reader.getRecent(10)['pan']) == [2, 3, 4, 5]
+    assert list(reader.getRecent(2)['pan']) == [4, 5]
+    reader.close()
+  #End of with statement - with getRing() as ring :
+
+
+def test_torn_records_are_left_out() :
+  with getRing() as ring :
+    writeRecords(ring, 0, 6)
+
+    #The writer has started on record 5's slot again(odd) but not finished.
+    setSlotSequence(ring, 5 % 4, 2*6 + 1)
+    assert ring.getLatest() is None
+    assert list(ring.getRecent(4)['pan']) == [2, 3, 4]
+
+    #A slot already holding a record from the next lap is not the one asked for.
+    setSlotSequence(ring, 3 % 4, 2*7 + 2)
+    assert list(ring.getRecent(4)['pan']) == [2, 4]
+
+    #Once the write finishes the record is read again.
+    setSlotSequence(ring, 5 % 4, 2*5 + 2)
+    assert ring.getLatest()[2] == 5
+  #End of with statement - with getRing() as ring :
+
+
+def test_attach_needs_a_ring() :
+  with pytest.raises(FileNotFoundError) :
+    QPTSM.StatusRing('qpt_test_missing_%d' % os.getpid())
+  #End of with statement.
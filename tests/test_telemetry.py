@@ -0,0 +1,169 @@
+#Tests for the telemetry writers and the telemetry written from live replies.
+
+import time
+import types
+
+import pytest
+
+import QPTFunctions as QPTF
+import QPTSession as QPTS
+import QPTTelemetry as QPTT
+from test_decoder import getStatusReply
+
+
+class FakeSerial :
+  """Answers every Get Status/Jog command with a status reply."""
+
+  def __init__(self, pan = 0, tilt = 0) :
+    self.pan = pan
+    self.tilt = tilt
+    self.timeout = 1
+    self.buffer = b''
+
+  @property
+  def in_waiting(self) :
+    return len(self.buffer)
+
+  def write(self, Command) :
+    if(Command[1] == 0x31) :
+      self.buffer += getStatusReply(self.pan, self.tilt)
+    #End of if statement - if(Command[1] == 0x31) :
+    return len(Command)
+
+  def read(self, numBytes) :
+    chunk = self.buffer[:numBytes]
+    self.buffer = self.buffer[numBytes:]
+    return chunk
+
+  def close(self) :
+    pass
+
+
+class BrokenWriter(QPTT.TelemetryWriter) :
+  """A writer whose file can never be opened."""
+
+  def getFilename(self) :
+    return 'broken'
+
+  def openFile(self, filename) :
+    raise OSError('The disk is full.')
+
+
+def getParams(tmp_path) :
+  return types.SimpleNamespace(saveDir = str(tmp_path) + '/', location = 'Test',
+                               latitude = 0.0, longitude = 0.0, altitude = 0.0)
+
+
+def test_writer_survives_file_error(tmp_path) :
+  PARAMS = getParams(tmp_path)
+  writer = QPTT.getTelemetryWriter(PARAMS, BrokenWriter)
+  try :
+    for i in range(5) :
+      writer.write((i, i))
+    #End of for loop - for i in range(5) :
+    time.sleep(0.3)
+
+    #The same writer is handed out again instead of a new thread for every row.
+    assert writer.is_alive()
+    assert isinstance(writer.error, OSError)
+    assert QPTT.getTelemetryWriter(PARAMS, BrokenWriter) is writer
+  finally :
+    writer.close(timeout = 2)
+  #End of try-finally clause.
+  assert writer.numDropped == 5
+  assert writer.numWritten == 0
+
+
+def test_session_writes_telemetry(tmp_path, monkeypatch) :
+  rows = []
+  monkeypatch.setattr(QPTF, 'writePanTiltValues',
+                      lambda PARAMS, pan, tilt, *args : rows.append((pan, tilt)))
+
+  session = QPTS.QPTSession(ser = FakeSerial(123, -45), PARAMS = getParams(tmp_path))
+  reply = session.sendCommand(QPTF.getSimpleStatusCommand())
+  assert reply.isAck()
+  assert rows == [(123, -45)]
+
+  #sendCommand leaves the writing to a session that has PARAMS, so nothing is doubled.
+  QPTF.sendCommand(session.PARAMS, session, QPTF.getSimpleStatusCommand())
+  assert rows == [(123, -45), (123, -45)]
+
+
+def test_send_command_writes_telemetry(tmp_path, monkeypatch) :
+  rows = []
+  monkeypatch.setattr(QPTF, 'writePanTiltValues',
+                      lambda PARAMS, pan, tilt, *args : rows.append((pan, tilt)))
+
+  session = QPTS.QPTSession(ser = FakeSerial(-7, 900))
+  QPTF.sendCommand(getParams(tmp_path), session, QPTF.getSimpleStatusCommand())
+  QPTF.sendCommand(getParams(tmp_path), FakeSerial(8, 9), QPTF.getSimpleStatusCommand())
+  assert rows == [(-7, 900), (8, 9)]
+
+
+def writeRecords(PARAMS, filename, wallTimes) :
+  writer = QPTT.BinaryTelemetryWriter(PARAMS, filename = filename)
+  writer.start()
+  for wallTime in wallTimes :
+    writer.write((0, wallTime, 1, 2, 0, 0, 0, 0x31))
+  #End of for loop - for wallTime in wallTimes :
+  writer.close(timeout = 5)
+
+
+def test_index_query(tmp_path) :
+  PARAMS = getParams(tmp_path)
+  for day in range(3) :
+    writeRecords(PARAMS, str(tmp_path/('Test%d.qpt' % day)), range(100*day, 100*day + 100))
+  #End of for loop - for day in range(3) :
+
+  index = QPTT.TelemetryIndex(PARAMS.saveDir, PARAMS.location)
+  assert list(index.query(150, 250)['wallTime']) == list(range(150, 250))
+  assert len(index.query(1000, 2000)) == 0
+
+  #A query does not read any file again while the newest one has not grown.
+  numLoads = []
+  loadFile = index.loadFile
+  index.loadFile = lambda filename : numLoads.append(filename) or loadFile(filename)
+  index.query(0, 300)
+  assert numLoads == []
+
+  writeRecords(PARAMS, str(tmp_path/'Test2.qpt'), range(300, 310))
+  assert list(index.query(295, 400)['wallTime']) == list(range(295, 310))
+  assert numLoads == [str(tmp_path/'Test2.qpt')]
+
+
+def test_binary_round_trip(tmp_path) :
+  PARAMS = types.SimpleNamespace(saveDir = str(tmp_path) + '/', location = 'Rooftop',
+                                 latitude = 38.5, longitude = -77.25, altitude = 12.0)
+  filename = str(tmp_path/'Rooftop.qpt')
+  rows = [(i, 1000 + i, -3600 + 7*i, 1800 - 3*i, i % 256, 255 - i, 0x81, 0x31 + i % 6)
+          for i in range(20)]
+  writer = QPTT.BinaryTelemetryWriter(PARAMS, filename = filename)
+  writer.start()
+  for row in rows[:10] :
+    writer.write(row)
+  #End of for loop - for row in rows[:10] :
+  writer.close(timeout = 5)
+
+  #A record cut off by a crash is dropped when the file is opened again.
+  with open(filename, 'ab') as f :
+    f.write(b'\x01\x02\x03')
+  #End of with statement.
+  writer = QPTT.BinaryTelemetryWriter(PARAMS, filename = filename)
+  writer.start()
+  for row in rows[10:] :
+    writer.write(row)
+  #End of for loop - for row in rows[10:] :
+  writer.close(timeout = 5)
+
+  header, records = QPTT.readTelemetry(filename)
+  assert header['location'] == b'Rooftop'
+  assert header['latitude'] == 38.5 and header['longitude'] == -77.25
+  assert records.tolist() == rows
+  assert QPTT.readTelemetryIndex(filename)[1]['count'].sum() == len(rows)
+
+  #Anything else is turned away.
+  other = tmp_path/'other.qpt'
+  other.write_bytes(b'CSV!' + bytes(QPTT.headerDtype.itemsize))
+  with pytest.raises(ValueError) :
+    QPTT.readTelemetry(str(other))
+  #End of with statement.
@@ -0,0 +1,81 @@
+#Tests for the jog rate measurement and the tracker's jog speeds.
+
+import struct
+import time
+
+import pytest
+
+import QPTDecoder as QPTD
+import QPTHeartbeat as QPTH
+import QPTTracking as QPTTk
+
+
+class JogSession :
+  """Stands in for a QPTSession on a head whose pan axis moves at offset + rate*speed
+  tenths of a degree per second while it is jogged."""
+
+  def __init__(self, rate, offset) :
+    self.rate = rate
+    self.offset = offset
+    self.position = 0.0
+    self.speed = 0
+    self.lastTime = time.monotonic()
+    self.sendTimes = []
+
+  def sendCommand(self, Command) :
+    now = time.monotonic()
+    if(self.speed != 0) :
+      velocity = self.offset + self.rate*abs(self.speed)
+      self.position += (velocity if self.speed > 0 else -velocity)*(now - self.lastTime)
+    #End of if statement - if(self.speed != 0) :
+    self.lastTime = now
+    self.sendTimes.append(now)
+
+    jogByte = QPTD.FrameDecoder().feed(Command)[0].data[1]
+    self.speed = (jogByte >> 1) if (jogByte & 1) else -(jogByte >> 1)
+    return QPTD.Frame(0x06, 0x31, struct.pack('<hhBBB', round(self.position), 0, 0, 0, 0))
+
+
+def test_jog_rate_has_offset_and_keeps_refreshing() :
+  session = JogSession(rate = 2.0, offset = 15.0)
+  rate, offset = QPTTk.measureJogRate(session, speeds = (10, 40), duration = 0.6,
+                                      settle = 0.2, period = QPTH.minimumPeriod)
+  assert rate == pytest.approx(2.0, rel = 0.1)
+  assert offset == pytest.approx(15.0, abs = 5.0)
+  assert session.speed == 0
+
+  #The jog is refreshed the whole time, never faster than the controller allows and
+  #never slowly enough to let its communication timeout run out.
+  gaps = [b - a for a, b in zip(session.sendTimes, session.sendTimes[1:])]
+  assert min(gaps) >= QPTH.minimumPeriod - 0.01
+  assert max(gaps) < 0.5
+
+
+def test_jog_rate_needs_two_speeds() :
+  with pytest.raises(ValueError) :
+    QPTTk.measureJogRate(JogSession(2.0, 15.0), speeds = (32, -32))
+  #End of with statement.
+
+
+def test_tracker_speed_with_offset() :
+  tracker = QPTTk.Tracker(None, [2.0, 15.0], 3.0)
+  assert tracker.getSpeed(35.0, 0) == [10, False]
+  assert tracker.getSpeed(-35.0, 0) == [-10, False]
+  assert tracker.getSpeed(5.0, 0) == [0, False]
+  assert tracker.getSpeed(10.0, 0) == [1, False]
+  assert tracker.getSpeed(1000.0, 0) == [QPTTk.maxJogSpeed, True]
+
+  #A plain rate has no offset.
+  assert tracker.getSpeed(30.0, 1) == [10, False]
+
+
+def test_track_spaces_every_command() :
+  session = JogSession(rate = 2.0, offset = 15.0)
+  tracker = QPTTk.Tracker(session, [2.0, 15.0], [2.0, 15.0], period = QPTH.minimumPeriod)
+  stats = tracker.track([0.0, 0.5], [0, 50], [0, 0])
+  assert stats.numCommands == len(session.sendTimes) >= 4
+  assert session.speed == 0
+
+  #The stop at the end waits its turn like every other command.
+  gaps = [b - a for a, b in zip(session.sendTimes, session.sendTimes[1:])]
+  assert min(gaps) >= QPTH.minimumPeriod - 0.005
@@ -0,0 +1,143 @@
+#Tests for the trajectory validation, simplification and decimation.
+
+import numpy as np
+import pytest
+
+import QPTEncoder as QPTE
+import QPTTrajectory as QPTTr
+
+
+def test_range_and_soft_limits() :
+  limits = QPTTr.TrajectoryLimits(softAzMin = -100, softElMax = 500)
+  Az = np.array([0, 3601, -200, 10])
+  El = np.array([0, 0, 600, -1801])
+  report = QPTTr.validateTrajectory(Az, El, limits = limits, firstRow = 10)
+  assert list(report.violations['azimuthRange']) == [11]
+  assert list(report.violations['elevationRange']) == [13]
+  assert list(report.violations['azimuthSoftLimit']) == [12]
+  assert list(report.violations['elevationSoftLimit']) == [12]
+
+  report = QPTTr.validateTrajectory(Az, El, limits = limits, checkSoftLimits = False)
+  assert set(report.violations) == {'azimuthRange', 'elevationRange'}
+
+
+def test_step_and_slew_rate() :
+  limits = QPTTr.TrajectoryLimits(maxStep = 50, maxSlewRate = 100)
+  Az = np.array([0, 40, 100, 100, 120])
+  El = np.array([0, 0, 0, 30, 30])
+  dateTime = np.array([0.0, 1.0, 2.0, 2.1, 2.1])
+  report = QPTTr.validateTrajectory(Az, El, dateTime, limits)
+  assert list(report.violations['azimuthStep']) == [2]
+  assert list(report.violations['elevationSlewRate']) == [3]
+  assert list(report.violations['time']) == [4]
+  assert not report.isValid()
+
+
+def test_step_across_blocks() :
+  limits = QPTTr.TrajectoryLimits(maxStep = 50)
+  report = QPTTr.validateTrajectory([100, 110], [0, 0], limits = limits, firstRow = 5,
+                                    previous = (0, 0, None))
+  assert list(report.violations['azimuthStep']) == [5]
+  assert QPTTr.validateTrajectory([100, 110], [0, 0], limits = limits).isValid()
+
+
+def test_simplify_straight_line() :
+  t = np.arange(100, dtype = float)
+  keep = QPTTr.simplifyTrajectory(3*t, -2*t, t, maxError = 1)
+  assert list(np.flatnonzero(keep)) == [0, 99]
+
+
+def test_simplify_error_bound() :
+  t = np.linspace(0.0, 10.0, 500)
+  Az = np.round(600*np.sin(t)).astype(int)
+  El = np.round(300*np.cos(0.5*t)).astype(int)
+  keep = QPTTr.simplifyTrajectory(Az, El, t, maxError = 2)
+  assert keep[0] and keep[-1] and (np.count_nonzero(keep) < len(t)//2)
+
+  #Every dropped point is within maxError of the line between the kept points.
+  kept = np.flatnonzero(keep)
+  assert np.abs(np.interp(t, t[kept], Az[kept]) - Az).max() <= 2
+  assert np.abs(np.interp(t, t[kept], El[kept]) - El).max() <= 2
+
+
+def test_decimation_keeps_step_and_slew_limits() :
+  limits = QPTTr.TrajectoryLimits(maxStep = 20, maxSlewRate = 150)
+  t = np.arange(400)*0.1
+  Az = 5*np.arange(400)
+  El = np.zeros(400, dtype = int)
+  assert QPTTr.validateTrajectory(Az, El, t, limits).isValid()
+
+  #A straight line would be cut down to its end points without the limits.
+  rows = QPTTr.decimateTrajectory(Az, El, t, maxError = 5)[0]
+  assert len(rows) == 2
+  rows, numDuplicates, numSimplified = QPTTr.decimateTrajectory(Az, El, t, maxError = 5,
+                                                                limits = limits)
+  assert numSimplified > 0
+  assert QPTTr.validateTrajectory(Az[rows], El[rows], t[rows], limits).isValid()
+
+
+def test_decimated_blocks_pass_the_limits(tmp_path) :
+  limits = QPTTr.TrajectoryLimits(maxStep = 30, maxSlewRate = 200)
+  t = np.arange(1000)*0.1
+  Az = 500*np.sin(0.02*np.arange(1000))
+  El = np.repeat(np.arange(100), 10)*0.1
+  filename = str(tmp_path/'trajectory.csv')
+  np.savetxt(filename, np.column_stack((t, Az/10.0, El/10.0)), delimiter = ',')
+  assert QPTTr.validateTrajectoryFile(filename, limits, blockSize = 128).isValid()
+
+  decimation = {'maxError' : 3}
+  Azs = []
+  with QPTTr.streamTrajectory(filename, 128, decimation = decimation,
+                              limits = limits) as blocks :
+    for dateTime, Az, El, firstRow, commandBuffer, offsets in blocks :
+      assert commandBuffer == QPTE.compileTrajectory(Az, El)[0]
+      Azs.append(Az)
+    #End of for loop.
+  #End of with statement.
+  assert decimation['numDuplicates'] > 0 and decimation['numSimplified'] > 0
+  assert sum(len(Az) for Az in Azs) == decimation['numKept']
+
+
+def test_compile_checks_across_blocks() :
+  limits = QPTTr.TrajectoryLimits(maxStep = 50)
+  blocks = [[np.array([0.0, 1.0]), np.array([0, 40]), np.array([0, 0]), 0],
+            [np.array([2.0, 3.0]), np.array([100, 120]), np.array([0, 0]), 2]]
+  compiled = QPTTr.compileTrajectoryBlocks(blocks, limits)
+  next(compiled)
+  with pytest.raises(QPTTr.TrajectoryError) as error :
+    next(compiled)
+  #End of with statement.
+  assert list(error.value.report.violations['azimuthStep']) == [2]
+
+
+def writeTrajectory(filename, Az, El) :
+  np.savetxt(filename, np.column_stack((np.arange(len(Az)), Az, El)), delimiter = ',')
+
+
+def test_file_checked_first_only_when_asked(tmp_path, monkeypatch) :
+  import types
+  import QPTFunctions as QPTF
+
+  sent = []
+  monkeypatch.setattr(QPTF, 'sendCommand', lambda PARAMS, ser, Command : sent.append(Command))
+  PARAMS = types.SimpleNamespace(overrideSoftLimits = False)
+  filename = str(tmp_path/'trajectory.csv')
+
+  #The whole file is only read ahead of the sends when validateFirst is set.
+  writeTrajectory(filename, [1.0, 2.0, 3.0], [0.0, 0.5, 1.0])
+  monkeypatch.setattr(QPTTr, 'validateTrajectoryFile', None)
+  QPTF.moveToEnteredCoordsFile(PARAMS, None, filename)
+  assert len(sent) == 3
+  monkeypatch.undo()
+
+  #A bad row stops the run either way, but with validateFirst nothing is sent.
+  monkeypatch.setattr(QPTF, 'sendCommand', lambda PARAMS, ser, Command : sent.append(Command))
+  writeTrajectory(filename, [1.0, 2.0, 400.0], [0.0, 0.5, 1.0])
+  del sent[:]
+  with pytest.raises(QPTTr.TrajectoryError) :
+    QPTF.moveToEnteredCoordsFile(PARAMS, None, filename, validateFirst = True)
+  #End of with statement.
+  assert sent == []
+  with pytest.raises(QPTTr.TrajectoryError) :
+    QPTF.moveToEnteredCoordsFile(PARAMS, None, filename)
+  #End of with statement.